@@ -1,11 +1,26 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import pickle
 import os
-from sklearn.metrics.pairwise import cosine_similarity
-from tensorflow import keras
-from PIL import Image
+import time
+from recommender import ImageIndex, RecommenderService, ThumbnailCache, artifact_version
+from recommender.facets import SKIN_TYPES
+from recommender.hybrid import DEFAULT_WEIGHTS
+from recommender.pagination import PAGE_SIZES, ResultPages
+from recommender.routine import GROUP_LABELS, STEP_LABELS
+from recommender.metrics import (METRICS, profiler, start_metrics_server, start_trace,
+                                 stop_trace, timed)
+
+PAGE_START = time.perf_counter()
+# Trace run ini hanya jika diaktifkan di panel Debug (hasilnya tampil di run berikutnya)
+if st.session_state.get('debug_trace'):
+    RUN_SPANS = start_trace()
+else:
+    RUN_SPANS = None
+    stop_trace()
+
+# Endpoint Prometheus opsional untuk app Streamlit: SKINCARE_METRICS_PORT=9100
+if os.environ.get('SKINCARE_METRICS_PORT'):
+    start_metrics_server(int(os.environ['SKINCARE_METRICS_PORT']))
 
 # Page config
 st.set_page_config(
@@ -175,91 +190,219 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-@st.cache_resource
-def load_models_and_data():
+# `version` berubah saat deployment_files/ dibangun ulang -> data + registry dimuat ulang
+@st.cache_resource(max_entries=1)
+def load_models_and_data(version):
     try:
-        # Load DataFrame
-        df = pd.read_csv('deployment_files/skincare_products.csv')
-        
-        # Load similarity matrix
-        similarity_matrix = np.load('deployment_files/similarity_matrix.npy')
-        
-        # Load model
-        model = keras.models.load_model('deployment_files/skincare_model.h5')
-        
-        return df, similarity_matrix, model
+        # Data, registry artefak (lazy), engine, indeks bahan aktif dan cache hasil
+        # ada di RecommenderService; objek yang sama dipakai server HTTP
+        service = RecommenderService('deployment_files', version=version)
+        return service.df, service
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        st.info("💡 Tip: Jalankan cell terakhir di notebook untuk export data ke folder deployment_files")
-        return None, None, None
+        st.info("💡 Tip: Jalankan `python -m recommender.build` atau cell terakhir di notebook untuk export data ke folder deployment_files")
+        return None, None
+
+# Indeks gambar + cache thumbnail, dibangun sekali per proses
+@st.cache_resource(max_entries=1)
+def get_thumbnail_cache(_df, version):
+    image_index = ImageIndex(_df['brand'].dropna().unique(), '.')
+    return ThumbnailCache(image_index, os.path.join('deployment_files', 'thumbnails'))
 
 # Fungsi untuk mencari gambar produk
 def get_product_image(product_name, brand):
-    """Mencari gambar produk di folder brand"""
+    """Bytes thumbnail produk (jpg/png/webp di folder brand), None jika tidak ada"""
     try:
-        brand_folder = brand.lower()
-        image_path = os.path.join(brand_folder, f"{product_name}.jpg")
-        
-        # Cek jika file ada
-        if os.path.exists(image_path):
-            return image_path
-        
-        # Coba format png
-        image_path_png = os.path.join(brand_folder, f"{product_name}.png")
-        if os.path.exists(image_path_png):
-            return image_path_png
-            
-        return None
+        return get_thumbnail_cache(df, service.version).get(product_name, brand)
     except Exception as e:
         return None
 
-# Fungsi rekomendasi
-def recommend_products(df, similarity_matrix, product_idx, top_n=5, 
-                      filter_brand=None, filter_product_type=None, 
-                      same_brand_only=False, different_brand_only=False):
-    
-    if product_idx >= len(df):
-        return None
-    
-    target_product = df.iloc[product_idx]
-    target_brand = target_product['brand']
-    
-    sim_scores = list(enumerate(similarity_matrix[product_idx]))
-    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-    
-    recommendations = []
-    for idx, score in sim_scores[1:]:
-        product = df.iloc[idx]
-        
-        # Apply filters
-        if same_brand_only and product['brand'] != target_brand:
-            continue
-        if different_brand_only and product['brand'] == target_brand:
-            continue
-        if filter_brand and product['brand'] != filter_brand:
-            continue
-        if filter_product_type and 'product_type' in df.columns:
-            if product.get('product_type', '') != filter_product_type:
-                continue
-        
-        recommendations.append({
-            'index': idx,
-            'similarity': score,
-            'product_name': product['product_name'],
-            'brand': product['brand'],
-            'product_type': product.get('product_type', 'N/A'),
-            'skin_type': product.get('skin_type', 'N/A'),
-            'active_ingredients': product.get('active_ingredients', 'N/A'),
-            'benefits': product.get('benefits', 'N/A')
-        })
-        
-        if len(recommendations) >= top_n:
-            break
+# Pencarian bahan aktif: hasil berupa array posisi di session_state
+def run_ingredient_search(query):
+    """Cari bahan aktif dan simpan posisi hasil (belum difilter) di session_state"""
+    # Search in active ingredients or product name (AND / OR / NOT didukung)
+    positions, corrected, suggestions = service.search_ingredients(query)
+    search = {'query': query, 'version': service.version, 'positions': positions,
+              'corrected': corrected, 'suggestions': suggestions}
+    st.session_state['ingredient_search'] = search
+    st.session_state['ingredient_page'] = 1
+    return search
+
+def filter_search_positions(positions, brand_filter_option, specific_brand, skin_type_filter):
+    """Filter brand / jenis kulit pada posisi hasil lewat bitmap facet (tanpa mencari ulang)"""
+    brand = None
+    if brand_filter_option == "Brand yang Sama" and len(positions) > 0:
+        brand = service.products(positions[:1]).iloc[0]['brand']
+    elif brand_filter_option == "Pilih Brand Spesifik":
+        brand = specific_brand
+    return service.filter_positions(positions, {'brand': brand, 'skin_type': skin_type_filter})
+
+def facet_label(counts, facet):
+    """format_func widget filter: nilai + jumlah produk yang cocok, mis. 'Serum (60)'"""
+    def label(value):
+        if value == 'Semua':
+            return value
+        return f"{value} ({counts.get(facet, {}).get(value, 0)})"
+    return label
+
+def _move_ingredient_page(step):
+    st.session_state['ingredient_page'] = st.session_state.get('ingredient_page', 1) + step
+
+# Satu halaman hasil pencarian bahan aktif
+@timed('render_seconds', view='search_page')
+def render_search_results(positions):
+    """Tampilkan satu halaman hasil pencarian; hanya produk di halaman ini yang dirender"""
+    col_size, col_label = st.columns([1, 3])
+    with col_size:
+        page_size = st.selectbox("Per halaman", PAGE_SIZES, key='ingredient_page_size')
+    pages = ResultPages(positions, page_size)
+    # Ukuran halaman bisa berubah: batasi nomor halaman sebelum widget dibuat
+    st.session_state['ingredient_page'] = pages.clamp(st.session_state.get('ingredient_page', 1))
+    page = st.session_state['ingredient_page']
+    with col_label:
+        st.caption(pages.label(page))
+
+    # Show matches
+    st.markdown("#### Produk yang Ditemukan:")
+    for idx, row in service.products(pages.page(page)).iterrows():
+        with st.expander(f"💄 {row['product_name']} - {row['brand'].upper()}"):
+            # Cari gambar produk
+            search_img = get_product_image(row['product_name'], row['brand'])
+
+            if search_img:
+                col_img, col_info = st.columns([1, 2])
+                with col_img:
+                    try:
+                        st.image(search_img, use_container_width=True)
+                    except:
+                        pass
+                with col_info:
+                    st.markdown(f"**Brand:** {row['brand'].upper()}")
+                    st.markdown(f"**Jenis Produk:** {row.get('product_type', 'N/A')}")
+                    st.markdown(f"**Jenis Kulit:** {row.get('skin_type', 'N/A')}")
+                    st.markdown(f"**Bahan Aktif:** {row['active_ingredients']}")
+                    st.markdown(f"**Manfaat:** {row['benefits']}")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(f"**Brand:** {row['brand'].upper()}")
+                    st.markdown(f"**Jenis Produk:** {row.get('product_type', 'N/A')}")
+                    st.markdown(f"**Jenis Kulit:** {row.get('skin_type', 'N/A')}")
+                with col2:
+                    st.markdown(f"**Bahan Aktif:** {row['active_ingredients']}")
+                    st.markdown(f"**Manfaat:** {row['benefits']}")
+
+    if pages.n_pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("⬅️ Sebelumnya", disabled=page <= 1, use_container_width=True,
+                      on_click=_move_ingredient_page, args=(-1,))
+        with col_page:
+            st.number_input(f"Halaman (dari {pages.n_pages})", min_value=1,
+                            max_value=pages.n_pages, step=1, key='ingredient_page')
+        with col_next:
+            st.button("Berikutnya ➡️", disabled=page >= pages.n_pages, use_container_width=True,
+                      on_click=_move_ingredient_page, args=(1,))
+
+# Kartu satu produk hasil rekomendasi (dipakai daftar produk dan pencarian teks bebas)
+@timed('render_seconds', view='card')
+def render_recommendation_card(i, row):
+    similarity_percent = row['similarity'] * 100
     
-    return pd.DataFrame(recommendations)
+    # Color based on similarity
+    if similarity_percent >= 80:
+        color = "#d63384"
+    elif similarity_percent >= 60:
+        color = "#ff9a9e"
+    else:
+        color = "#fecfef"
+
+    # Cari gambar produk
+    rec_img = get_product_image(row['product_name'], row['brand'])
+
+    if rec_img:
+        col_img, col_info = st.columns([1, 2])
+        with col_img:
+            try:
+                st.image(rec_img, use_container_width=True)
+            except:
+                pass
+        with col_info:
+            st.markdown(f"""
+            <div class="product-card">
+                <div style="display: flex; justify-content: space-between; align-items: center;">
+                    <div>
+                        <div class="product-name">#{i+1} {row['product_name']}</div>
+                        <div class="product-brand">🏷️ {row['brand'].upper()}</div>
+                    </div>
+                    <div class="similarity-badge" style="background: linear-gradient(135deg, {color}, #fecfef);">
+                        {similarity_percent:.1f}% Match
+                    </div>
+                </div>
+                <hr style="border: 1px solid #fecfef; margin: 1rem 0;">
+                <div class="info-label">📦 Jenis Produk:</div>
+                <div class="info-value">{row['product_type']}</div>
+                <div class="info-label">🧴 Jenis Kulit:</div>
+                <div class="info-value">{row['skin_type']}</div>
+                <div class="info-label">🧪 Bahan Aktif:</div>
+                <div class="info-value">{row['active_ingredients']}</div>
+                <div class="info-label">✨ Manfaat:</div>
+                <div class="info-value">{row['benefits']}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.markdown(f"""
+        <div class="product-card">
+            <div style="display: flex; justify-content: space-between; align-items: center;">
+                <div>
+                    <div class="product-name">#{i+1} {row['product_name']}</div>
+                    <div class="product-brand">🏷️ {row['brand'].upper()}</div>
+                </div>
+                <div class="similarity-badge" style="background: linear-gradient(135deg, {color}, #fecfef);">
+                    {similarity_percent:.1f}% Match
+                </div>
+            </div>
+            <hr style="border: 1px solid #fecfef; margin: 1rem 0;">
+            <div class="info-label">📦 Jenis Produk:</div>
+            <div class="info-value">{row['product_type']}</div>
+            <div class="info-label">🧴 Jenis Kulit:</div>
+            <div class="info-value">{row['skin_type']}</div>
+            <div class="info-label">🧪 Bahan Aktif:</div>
+            <div class="info-value">{row['active_ingredients']}</div>
+            <div class="info-label">✨ Manfaat:</div>
+            <div class="info-value">{row['benefits']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Bahan aktif yang sama (mode Irisan Bahan Aktif)
+    if 'shared_ingredients' in row:
+        st.caption(f"🤝 Bahan aktif yang sama: {row['shared_ingredients']}")
+
+    # Rincian skor per kolom (mode Hybrid per Kolom)
+    if 'score_ingredients' in row:
+        st.caption(f"🧪 Bahan aktif {row['score_ingredients'] * 100:.0f}% · "
+                   f"✨ Manfaat {row['score_benefits'] * 100:.0f}% · "
+                   f"🧴 Jenis kulit {row['score_skin_type'] * 100:.0f}%")
+    # Langkah rutinitas (Lengkapi Rutinitas)
+    if 'routine_step' in row:
+        st.caption(f"🧴 Langkah: {STEP_LABELS[row['routine_step']]}")
+
+
+def format_avoided(avoided):
+    """[(aktif acuan, aktif dihindari)] -> 'Retinoid ✕ AHA, BHA'"""
+    by_active = {}
+    for active, avoid in avoided:
+        by_active.setdefault(GROUP_LABELS[active], []).append(GROUP_LABELS[avoid])
+    return '; '.join(f"{active} ✕ {', '.join(avoids)}" for active, avoids in by_active.items())
 
 # Load models
-df, similarity_matrix, model = load_models_and_data()
+ARTIFACT_VERSION = artifact_version('deployment_files')
+df, service = load_models_and_data(ARTIFACT_VERSION)
+if service is not None:
+    # Update incremental (catalog_delta.pkl) diterapkan tanpa memuat ulang artefak;
+    # produk yang dihapus tidak ditampilkan, label index tetap = posisi produk
+    service.refresh()
+    df = service.live_frame()
 
 if df is not None:
     # Sidebar
@@ -269,38 +412,76 @@ if df is not None:
         # Search method
         search_method = st.radio(
             "Pilih Metode:",
-            ["🔍 Cari Berdasarkan Bahan Aktif", "📋 Pilih dari Daftar Produk"],
+            ["🔍 Cari Berdasarkan Bahan Aktif", "📋 Pilih dari Daftar Produk",
+             "📝 Deskripsikan Kebutuhan Kulit"],
             label_visibility="visible"
         )
         
         st.markdown("---")
         
+        # Jumlah produk per brand / jenis produk / jenis kulit dari bitmap facet, dihitung
+        # sekali per rerun dengan pilihan filter yang sedang aktif. Pada pencarian bahan
+        # aktif jumlahnya dihitung di dalam hasil pencarian terakhir.
+        is_ingredient_search = search_method == "🔍 Cari Berdasarkan Bahan Aktif"
+        last_search = st.session_state.get('ingredient_search')
+        if is_ingredient_search:
+            facet_selections = {
+                'brand': (st.session_state.get('facet_brand')
+                          if st.session_state.get('brand_filter_option_widget') == "Pilih Brand Spesifik"
+                          else None),
+                'skin_type': st.session_state.get('facet_skin_type'),
+            }
+            base_positions = (last_search['positions']
+                              if last_search and last_search['version'] == service.version else None)
+        else:
+            selected_type = st.session_state.get('facet_product_type')
+            facet_selections = {
+                'product_type': None if selected_type in (None, 'Semua') else selected_type,
+                'skin_type': st.session_state.get('facet_skin_type'),
+            }
+            base_positions = None
+        facet_counts = service.facet_counts(facet_selections, base_positions)
+
         # Conditional filters based on search method
-        if search_method == "🔍 Cari Berdasarkan Bahan Aktif":
+        if is_ingredient_search:
             # Brand filter only
             st.markdown("#### Filter Brand")
             brand_filter_option = st.selectbox(
                 "Pilihan Brand:",
-                ["Semua Brand", "Brand yang Sama", "Pilih Brand Spesifik"]
+                ["Semua Brand", "Brand yang Sama", "Pilih Brand Spesifik"],
+                key='brand_filter_option_widget'
             )
             
             specific_brand = None
             if brand_filter_option == "Pilih Brand Spesifik":
-                brands = sorted(df['brand'].unique().tolist())
-                specific_brand = st.selectbox("Nama Brand:", brands)
+                brands = sorted(service.engine.facets.values('brand'))
+                specific_brand = st.selectbox("Nama Brand:", brands, key='facet_brand',
+                                              format_func=facet_label(facet_counts, 'brand'))
             
             top_n = None  # No limit for ingredient search
+            mmr_lambda = None
             product_type_filter = None
             
-        else:  # Pilih dari Daftar Produk
+        else:  # Pilih dari Daftar Produk / Deskripsikan Kebutuhan Kulit
             # Number of recommendations and product type filter
             st.markdown("#### Jumlah Rekomendasi")
-            top_n = st.slider("Tampilkan:", 3, 10, 5)
+            col_top_n, col_lambda = st.columns(2)
+            with col_top_n:
+                top_n = st.slider("Tampilkan:", 3, 10, 5)
+            with col_lambda:
+                # MMR: λ = 1 urutan relevansi biasa; lebih kecil = varian / lini produk yang sama
+                # tidak memenuhi daftar
+                mmr_lambda = st.slider(
+                    "Keragaman (λ):", 0.0, 1.0, 1.0, 0.1,
+                    help="1 = paling relevan; turunkan agar produk yang hampir sama (varian ukuran, "
+                         "satu lini dari brand yang sama) tidak mendominasi daftar"
+                )
             
-            if 'product_type' in df.columns:
+            if 'product_type' in service.engine.facets:
                 st.markdown("#### Filter Jenis Produk")
-                product_types = ['Semua'] + sorted([pt for pt in df['product_type'].unique() if pd.notna(pt)])
-                product_type_filter = st.selectbox("Jenis Produk:", product_types)
+                product_types = ['Semua'] + sorted(service.engine.facets.values('product_type'))
+                product_type_filter = st.selectbox("Jenis Produk:", product_types, key='facet_product_type',
+                                                   format_func=facet_label(facet_counts, 'product_type'))
                 if product_type_filter == 'Semua':
                     product_type_filter = None
             else:
@@ -308,6 +489,44 @@ if df is not None:
             
             brand_filter_option = "Semua Brand"
             specific_brand = None
+
+        # Jenis kulit: satu produk bisa cocok untuk beberapa jenis kulit (OR antar pilihan)
+        skin_type_filter = None
+        if 'skin_type' in service.engine.facets:
+            st.markdown("#### Filter Jenis Kulit")
+            skin_types = [skin for skin in SKIN_TYPES if skin in service.engine.facets.values('skin_type')]
+            skin_type_filter = st.multiselect(
+                "Jenis Kulit:", skin_types, key='facet_skin_type',
+                format_func=facet_label(facet_counts, 'skin_type'),
+                placeholder="Semua jenis kulit"
+            ) or None
+
+        # Daftar produk: kemiripan deskripsi (default), gabungan berbobot per kolom,
+        # atau irisan himpunan bahan aktif
+        similarity_mode = "📝 Deskripsi Produk"
+        hybrid_weights = None
+        ingredient_measure = None
+        if search_method == "📋 Pilih dari Daftar Produk":
+            st.markdown("#### Metode Kemiripan")
+            similarity_mode = st.radio(
+                "Urutkan berdasarkan:",
+                ["📝 Deskripsi Produk", "⚖️ Hybrid per Kolom", "🧪 Irisan Bahan Aktif"],
+                label_visibility="collapsed"
+            )
+            if similarity_mode == "🧪 Irisan Bahan Aktif":
+                ingredient_measure = st.radio(
+                    "Skor irisan:",
+                    ["jaccard", "weighted"],
+                    format_func=lambda m: {"jaccard": "Jaccard (jumlah bahan sama)",
+                                           "weighted": "Berbobot (bahan langka lebih berarti)"}[m]
+                )
+            if similarity_mode == "⚖️ Hybrid per Kolom":
+                # Bobot hanya mengubah vektor query; urutan dihitung ulang tanpa build ulang
+                hybrid_weights = {
+                    'ingredients': st.slider("🧪 Bahan Aktif", 0, 100, int(DEFAULT_WEIGHTS['ingredients'] * 100), 5),
+                    'benefits': st.slider("✨ Manfaat", 0, 100, int(DEFAULT_WEIGHTS['benefits'] * 100), 5),
+                    'skin_type': st.slider("🧴 Jenis Kulit", 0, 100, int(DEFAULT_WEIGHTS['skin_type'] * 100), 5),
+                }
         
         # Statistics
         st.markdown("---")
@@ -338,6 +557,50 @@ if df is not None:
             </p>
         </div>
         """, unsafe_allow_html=True)
+        
+        # Status artefak yang sudah dimuat (lazy loading)
+        with st.expander("⚙️ Status Artefak", expanded=False):
+            st.dataframe(pd.DataFrame(service.registry.report()), hide_index=True, use_container_width=True)
+            heavy = service.registry.heavy_modules()
+            st.caption("Framework terimpor: " + (", ".join(heavy) if heavy else "hanya NumPy & pandas"))
+            cache_stats = service.cache.stats()
+            st.caption(f"Cache hasil: {cache_stats['entries']}/{cache_stats['max_items']} entri, "
+                       f"hit {cache_stats['hits']} / miss {cache_stats['misses']} "
+                       f"({cache_stats['hit_rate']:.0%}), eviction {cache_stats['evictions']}")
+            st.caption(f"Versi artefak: {service.version}")
+            vectors = service.vector_footprint()
+            if vectors is not None:
+                st.caption(f"Vektor {vectors['mode']}: {vectors['code_bytes'] / 2**20:.1f} MB "
+                           f"({vectors['ratio']:.1f}x lebih kecil dari float32), "
+                           f"re-ranking {vectors['rerank']} kandidat")
+            if service.delta is not None:
+                st.caption(f"Update incremental #{service.delta['seq']}: "
+                           f"{len(service.delta['rows'])} produk ditambahkan, "
+                           f"{len(service.delta['tombstones'])} tombstone")
+
+        # Timer per tahap, trace run sebelumnya dan sampling profiler (opt-in)
+        with st.expander("🩺 Debug & Metrics", expanded=False):
+            st.checkbox("Trace run berikutnya", key='debug_trace')
+            last = st.session_state.get('last_trace')
+            if last:
+                st.caption(f"Run terakhir: {last['page_ms']:.1f} ms")
+                if last['spans']:
+                    st.dataframe(pd.DataFrame(last['spans']), hide_index=True,
+                                 use_container_width=True)
+            run_profiler = st.toggle("Sampling profiler", value=profiler().running)
+            if run_profiler and not profiler().running:
+                profiler().start()
+            elif not run_profiler and profiler().running:
+                profiler().stop()
+            if profiler().samples:
+                st.caption(f"{profiler().samples} sampel stack")
+                st.dataframe(pd.DataFrame(profiler().report(15)), hide_index=True,
+                             use_container_width=True)
+            summary = METRICS.summary()
+            if summary:
+                st.dataframe(pd.DataFrame(summary), hide_index=True, use_container_width=True)
+            if os.environ.get('SKINCARE_METRICS_PORT'):
+                st.caption(f"Prometheus: http://127.0.0.1:{os.environ['SKINCARE_METRICS_PORT']}/metrics")
     
     # Main content
     if search_method == "🔍 Cari Berdasarkan Bahan Aktif":
@@ -375,62 +638,65 @@ if df is not None:
         with col1:
             search_ingredient = st.text_input(
                 "Masukkan bahan aktif:",
-                placeholder="Contoh: niacinamide, vitamin c, hyaluronic acid, retinol...",
+                placeholder="Contoh: niacinamide, vitamin c, niacinamide AND NOT fragrance...",
                 label_visibility="collapsed"
             )
         with col2:
             search_button = st.button("🔍 Cari", use_container_width=True)
         
         if search_button and search_ingredient:
-            # Search in active ingredients or product name
-            mask = (df['active_ingredients'].str.contains(search_ingredient, case=False, na=False) | 
-                   df['product_name'].str.contains(search_ingredient, case=False, na=False))
-            matches = df[mask]
-            
-            # Apply brand filter
-            if brand_filter_option == "Brand yang Sama" and len(matches) > 0:
-                first_brand = matches.iloc[0]['brand']
-                matches = matches[matches['brand'] == first_brand]
-            elif brand_filter_option == "Pilih Brand Spesifik" and specific_brand:
-                matches = matches[matches['brand'] == specific_brand]
-            
-            if len(matches) > 0:
-                st.success(f"✨ Ditemukan {len(matches)} produk dengan '{search_ingredient}'")
-                
-                # Show matches
-                st.markdown("#### Produk yang Ditemukan:")
-                for idx, row in matches.iterrows():
-                    with st.expander(f"💄 {row['product_name']} - {row['brand'].upper()}"):
-                        # Cari gambar produk
-                        search_img = get_product_image(row['product_name'], row['brand'])
-                        
-                        if search_img:
-                            col_img, col_info = st.columns([1, 2])
-                            with col_img:
-                                try:
-                                    img = Image.open(search_img)
-                                    st.image(img, use_container_width=True)
-                                except:
-                                    pass
-                            with col_info:
-                                st.markdown(f"**Brand:** {row['brand'].upper()}")
-                                st.markdown(f"**Jenis Produk:** {row.get('product_type', 'N/A')}")
-                                st.markdown(f"**Jenis Kulit:** {row.get('skin_type', 'N/A')}")
-                                st.markdown(f"**Bahan Aktif:** {row['active_ingredients']}")
-                                st.markdown(f"**Manfaat:** {row['benefits']}")
-                        else:
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.markdown(f"**Brand:** {row['brand'].upper()}")
-                                st.markdown(f"**Jenis Produk:** {row.get('product_type', 'N/A')}")
-                                st.markdown(f"**Jenis Kulit:** {row.get('skin_type', 'N/A')}")
-                            with col2:
-                                st.markdown(f"**Bahan Aktif:** {row['active_ingredients']}")
-                                st.markdown(f"**Manfaat:** {row['benefits']}")
+            run_ingredient_search(search_ingredient)
+            # Rerun agar jumlah per facet di sidebar dihitung dari hasil pencarian baru
+            st.rerun()
+
+        # Hasil disimpan sebagai array posisi; pindah halaman / ganti filter tidak menjalankan ulang pencarian
+        search = st.session_state.get('ingredient_search')
+        if search and search['query'] == search_ingredient:
+            if search['version'] != service.version:
+                # Katalog berubah (update incremental): posisi lama bisa sudah dihapus
+                search = run_ingredient_search(search_ingredient)
+            if search['corrected']:
+                st.info(f"🔎 Menampilkan hasil untuk '{search['corrected']}'")
+                if search['suggestions']:
+                    st.caption("Mungkin maksud Anda: " + ", ".join(search['suggestions']))
+
+            positions = filter_search_positions(search['positions'], brand_filter_option,
+                                                specific_brand, skin_type_filter)
+            if len(positions) > 0:
+                st.success(f"✨ Ditemukan {len(positions)} produk dengan '{search_ingredient}'")
+                render_search_results(positions)
+            elif len(search['positions']) > 0:
+                st.warning(f"❌ {len(search['positions'])} produk dengan '{search_ingredient}' "
+                           f"tidak lolos filter brand / jenis kulit")
             else:
                 st.warning(f"❌ Tidak ditemukan produk dengan bahan aktif '{search_ingredient}'")
                 st.info("💡 Coba kata kunci lain atau pilih dari daftar produk")
     
+    elif search_method == "📝 Deskripsikan Kebutuhan Kulit":
+        st.markdown("### 📝 Deskripsikan Kebutuhan Kulit Anda")
+        st.info("💡 Tulis kondisi dan keinginan kulit Anda, sistem akan mencari produk dengan bahan aktif dan manfaat paling mirip")
+        
+        skin_query = st.text_area(
+            "Kebutuhan kulit:",
+            placeholder="Contoh: kulit berminyak, jerawat, ingin mencerahkan",
+            label_visibility="collapsed"
+        )
+        
+        if st.button("✨ Cari Produk", use_container_width=True) and skin_query.strip():
+            # Query diproses seperti clean_text (stemming di-cache), lalu dibandingkan dengan vektor produk
+            recommendations = service.search_text(
+                skin_query, top_n, filter_product_type=product_type_filter,
+                filter_skin_type=skin_type_filter, mmr_lambda=mmr_lambda
+            )
+            
+            if len(recommendations) > 0:
+                st.markdown(f"## 🌟 Top {len(recommendations)} Produk untuk Kebutuhan Anda")
+                for i, row in recommendations.iterrows():
+                    render_recommendation_card(i, row)
+            else:
+                st.warning("❌ Tidak ada produk yang cocok dengan deskripsi tersebut")
+                st.info("💡 Coba gunakan kata lain, misalnya nama bahan aktif atau manfaat (jerawat, kusam, kering)")
+    
     else:  # Pilih dari daftar
         st.markdown("### 📋 Pilih Produk dari Daftar")
         
@@ -440,13 +706,13 @@ if df is not None:
         # Group by brand for display only
         selected_brand_for_list = st.selectbox(
             "Filter tampilan berdasarkan brand:",
-            ['Semua Brand'] + sorted(df['brand'].unique().tolist())
+            ['Semua Brand'] + sorted(service.engine.facets.values('brand'))
         )
         
         if selected_brand_for_list == 'Semua Brand':
             filtered_df = df
         else:
-            filtered_df = df[df['brand'] == selected_brand_for_list]
+            filtered_df = service.products(service.engine.facets.positions({'brand': selected_brand_for_list}))
         
         # Product selection
         product_options = [f"{row['product_name']} - {row['brand'].upper()}" 
@@ -463,6 +729,7 @@ if df is not None:
             st.session_state['show_recommendations'] = True
             st.session_state['search_method_used'] = 'product_list'  # Mark as from product list
             st.session_state['product_type_filter'] = product_type_filter
+            st.session_state['skin_type_filter'] = skin_type_filter
             st.session_state['top_n'] = top_n
             st.session_state['brand_filter_option'] = 'Semua Brand'  # No brand filter for product list
             st.session_state['specific_brand'] = None
@@ -473,7 +740,7 @@ if df is not None:
         # Only show if search method was 'product_list'
         if st.session_state.get('search_method_used') == 'product_list':
             product_idx = st.session_state['selected_product_idx']
-            target_product = df.iloc[product_idx]
+            target_product = service.products(product_idx)
             
             st.markdown("---")
             st.markdown("## 💖 Produk yang Anda Pilih")
@@ -485,8 +752,7 @@ if df is not None:
             col_img, col_info = st.columns([1, 2])
             with col_img:
                 try:
-                    img = Image.open(target_img)
-                    st.image(img, use_container_width=True)
+                    st.image(target_img, use_container_width=True)
                 except:
                     pass
             with col_info:
@@ -524,6 +790,7 @@ if df is not None:
         
         # Get filter parameters from session_state or use defaults
         saved_product_type_filter = st.session_state.get('product_type_filter', None)
+        saved_skin_type_filter = st.session_state.get('skin_type_filter', None)
         saved_top_n = st.session_state.get('top_n', 5)
         saved_brand_filter = st.session_state.get('brand_filter_option', 'Semua Brand')
         saved_specific_brand = st.session_state.get('specific_brand', None)
@@ -532,86 +799,41 @@ if df is not None:
         same_brand = (saved_brand_filter == "Brand yang Sama")
         use_specific_brand = saved_specific_brand if saved_brand_filter == "Pilih Brand Spesifik" else None
         
-        recommendations = recommend_products(
-            df, similarity_matrix, product_idx, saved_top_n,
-            filter_brand=use_specific_brand,
-            filter_product_type=saved_product_type_filter,
-            same_brand_only=same_brand,
-            different_brand_only=False  # Removed "Brand Berbeda" option
-        )
+        if ingredient_measure is not None:
+            recommendations = service.recommend_by_ingredients(
+                product_idx, saved_top_n, ingredient_measure,
+                filter_brand=use_specific_brand,
+                filter_product_type=saved_product_type_filter,
+                filter_skin_type=saved_skin_type_filter,
+                same_brand_only=same_brand,
+                mmr_lambda=mmr_lambda
+            )
+        elif hybrid_weights is not None:
+            recommendations = service.recommend_hybrid(
+                product_idx, hybrid_weights, saved_top_n,
+                filter_brand=use_specific_brand,
+                filter_product_type=saved_product_type_filter,
+                filter_skin_type=saved_skin_type_filter,
+                same_brand_only=same_brand,
+                mmr_lambda=mmr_lambda
+            )
+        else:
+            recommendations = service.recommend(
+                product_idx, saved_top_n,
+                filter_brand=use_specific_brand,
+                filter_product_type=saved_product_type_filter,
+                filter_skin_type=saved_skin_type_filter,
+                same_brand_only=same_brand,
+                different_brand_only=False,  # Removed "Brand Berbeda" option
+                mmr_lambda=mmr_lambda
+            )
         
         if recommendations is not None and len(recommendations) > 0:
             st.markdown(f"## 🌟 Top {len(recommendations)} Rekomendasi Produk Serupa")
             st.markdown("*Berdasarkan kesamaan bahan aktif dan manfaat*")
             
             for i, row in recommendations.iterrows():
-                similarity_percent = row['similarity'] * 100
-                
-                # Color based on similarity
-                if similarity_percent >= 80:
-                    color = "#d63384"
-                elif similarity_percent >= 60:
-                    color = "#ff9a9e"
-                else:
-                    color = "#fecfef"
-                
-                # Cari gambar produk
-                rec_img = get_product_image(row['product_name'], row['brand'])
-                
-                if rec_img:
-                    col_img, col_info = st.columns([1, 2])
-                    with col_img:
-                        try:
-                            img = Image.open(rec_img)
-                            st.image(img, use_container_width=True)
-                        except:
-                            pass
-                    with col_info:
-                        st.markdown(f"""
-                        <div class="product-card">
-                            <div style="display: flex; justify-content: space-between; align-items: center;">
-                                <div>
-                                    <div class="product-name">#{i+1} {row['product_name']}</div>
-                                    <div class="product-brand">🏷️ {row['brand'].upper()}</div>
-                                </div>
-                                <div class="similarity-badge" style="background: linear-gradient(135deg, {color}, #fecfef);">
-                                    {similarity_percent:.1f}% Match
-                                </div>
-                            </div>
-                            <hr style="border: 1px solid #fecfef; margin: 1rem 0;">
-                            <div class="info-label">📦 Jenis Produk:</div>
-                            <div class="info-value">{row['product_type']}</div>
-                            <div class="info-label">🧴 Jenis Kulit:</div>
-                            <div class="info-value">{row['skin_type']}</div>
-                            <div class="info-label">🧪 Bahan Aktif:</div>
-                            <div class="info-value">{row['active_ingredients']}</div>
-                            <div class="info-label">✨ Manfaat:</div>
-                            <div class="info-value">{row['benefits']}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="product-card">
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <div>
-                                <div class="product-name">#{i+1} {row['product_name']}</div>
-                                <div class="product-brand">🏷️ {row['brand'].upper()}</div>
-                            </div>
-                            <div class="similarity-badge" style="background: linear-gradient(135deg, {color}, #fecfef);">
-                                {similarity_percent:.1f}% Match
-                            </div>
-                        </div>
-                        <hr style="border: 1px solid #fecfef; margin: 1rem 0;">
-                        <div class="info-label">📦 Jenis Produk:</div>
-                        <div class="info-value">{row['product_type']}</div>
-                        <div class="info-label">🧴 Jenis Kulit:</div>
-                        <div class="info-value">{row['skin_type']}</div>
-                        <div class="info-label">🧪 Bahan Aktif:</div>
-                        <div class="info-value">{row['active_ingredients']}</div>
-                        <div class="info-label">✨ Manfaat:</div>
-                        <div class="info-value">{row['benefits']}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                render_recommendation_card(i, row)
         else:
             st.warning("❌ Tidak ada rekomendasi yang sesuai dengan filter yang dipilih")
             st.info("💡 Coba ubah filter atau pilih produk lain")
@@ -621,17 +843,41 @@ if df is not None:
                 st.session_state['show_recommendations'] = False
                 st.rerun()
 
+        # Produk pelengkap per langkah (pembersih, toner, serum, pelembap, sunscreen)
+        # tanpa bahan aktif yang bertentangan dengan produk pilihan
+        routine = service.routine(
+            product_idx,
+            filter_brand=use_specific_brand,
+            filter_skin_type=saved_skin_type_filter,
+            same_brand_only=same_brand
+        )
+        if routine is not None and len(routine[0]) > 0:
+            routine_steps, avoided = routine
+            st.markdown("## 🧴 Lengkapi Rutinitas")
+            st.markdown("*Produk untuk langkah lain yang bahannya sering dipakai bersama bahan aktif produk pilihan Anda*")
+            if avoided:
+                st.caption(f"⚠️ Kombinasi bahan aktif yang dihindari: {format_avoided(avoided)}")
+            for i, row in routine_steps.iterrows():
+                render_recommendation_card(i, row)
+
 else:
     st.error("❌ Gagal memuat data. Pastikan semua file yang dibutuhkan tersedia.")
     st.markdown("""
     ### 📝 File yang Dibutuhkan:
-    1. `skincare_data.pkl` - Data produk skincare
-    2. `similarity_matrix.npy` - Matriks similarity
-    3. `skincare_model.h5` - Model TensorFlow
+    1. `skincare_products.csv` (atau `catalog.bin`) - Data produk skincare
+    2. `vectorizer.pkl` & `pca_model.pkl` - Vektorisasi produk untuk similarity
+    3. `skincare_model.pkl`, `tokenizer.pkl`, `label_encoder.pkl` - Model klasifikasi (dimuat saat dibutuhkan)
     
     Jalankan notebook terlebih dahulu untuk menghasilkan file-file ini.
     """)
 
+# Waktu satu run script penuh; trace disimpan untuk panel Debug di run berikutnya
+page_seconds = time.perf_counter() - PAGE_START
+METRICS.observe('render_seconds', page_seconds, view='page')
+if RUN_SPANS is not None:
+    st.session_state['last_trace'] = {'page_ms': page_seconds * 1e3, 'spans': list(RUN_SPANS)}
+    stop_trace()
+
 # Footer
 st.markdown("---")
 st.markdown("""
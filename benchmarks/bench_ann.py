@@ -0,0 +1,82 @@
+"""Benchmark recall@k vs latensi indeks IVF terhadap cosine_similarity exact.
+
+Katalog sintetis berupa campuran cluster Gaussian 128 dimensi (sama dengan output PCA).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_ann
+    python -m benchmarks.bench_ann --sizes 10000 1000000 --nprobe 1 4 16
+"""
+import argparse
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from recommender import IVFIndex
+from recommender.similarity import l2_normalize
+
+
+def synthetic_vectors(n_products, dim=128, n_clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n_products)
+    vectors = centers[labels] + 0.6 * rng.standard_normal((n_products, dim)).astype(np.float32)
+    return l2_normalize(vectors)
+
+
+def exact_top_k(vectors, queries, k, block_size=100_000):
+    """Ground truth via sklearn cosine_similarity, dihitung per blok katalog"""
+    best_ids = np.empty((len(queries), 0), dtype=np.int64)
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        scores = cosine_similarity(queries, vectors[start:start + block_size]).astype(np.float32)
+        ids = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+        best_ids = np.hstack([best_ids, ids])
+        best_scores = np.hstack([best_scores, scores])
+        keep = np.argsort(-best_scores, axis=1)[:, :k]
+        best_ids = np.take_along_axis(best_ids, keep, axis=1)
+        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+    return best_ids
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(np.intersect1d(f, t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def run(sizes, nprobes, k, n_queries):
+    print(f"{'produk':>9} {'lists':>6} {'build (s)':>10} {'nprobe':>7} "
+          f"{'recall@' + str(k):>10} {'ms/query':>9} {'exact ms/q':>11}")
+    for n_products in sizes:
+        vectors = synthetic_vectors(n_products)
+        rng = np.random.default_rng(1)
+        queries = vectors[rng.choice(n_products, n_queries, replace=False)]
+
+        start = time.perf_counter()
+        truth = exact_top_k(vectors, queries, k)
+        exact_ms = (time.perf_counter() - start) / n_queries * 1e3
+
+        start = time.perf_counter()
+        index = IVFIndex.build(vectors)
+        build_time = time.perf_counter() - start
+
+        for nprobe in nprobes:
+            start = time.perf_counter()
+            found, _ = index.search_batch(queries, k, nprobe)
+            query_ms = (time.perf_counter() - start) / n_queries * 1e3
+            print(f"{n_products:>9} {index.n_lists:>6} {build_time:>10.2f} {nprobe:>7} "
+                  f"{recall_at_k(found, truth):>10.3f} {query_ms:>9.3f} {exact_ms:>11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.nprobe, args.k, args.queries)
+
+
+if __name__ == '__main__':
+    main()
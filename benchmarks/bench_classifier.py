@@ -0,0 +1,96 @@
+"""Benchmark inferensi classifier ber-micro-batch untuk ukuran batch 1-256 (CPU).
+
+Untuk setiap `max_batch` diukur:
+    model ms/teks  fitur + model dipanggil langsung per potongan sebesar batch
+    req/s, p50/p99 burst `--requests` teks unik dikirim sekaligus dari beberapa
+                   thread klien lewat MicroBatcher (tanpa cache), latensi per request
+
+Target `brand` memakai model yang dikirim di deployment_files/ (skincare_model.pkl +
+label_encoder.pkl + vectorizer/PCA); `product_type` di-fit dari katalog sintetis.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_classifier
+    python -m benchmarks.bench_classifier --target product_type --requests 4096
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.bench_load import synthetic_products
+from recommender.classifier import TARGETS, MicroBatcher, TextClassifier
+from recommender.registry import default_registry
+
+BATCH_SIZES = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def load_classifier(target, artifact_dir, df):
+    if target == 'brand':
+        return default_registry(artifact_dir).get('brand_classifier')
+    return TextClassifier.for_product_type(df)
+
+
+def burst(batcher, texts, clients):
+    """Kirim semua teks dari `clients` thread sekaligus, tunggu semua hasil"""
+    futures = [None] * len(texts)
+
+    def client(offset):
+        for i in range(offset, len(texts), clients):
+            futures[i] = batcher.submit(texts[i])
+
+    threads = [threading.Thread(target=client, args=(c,)) for c in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for future in futures:
+        future.result()
+    return time.perf_counter() - start
+
+
+def run(target, artifact_dir, n_requests, clients, max_latency, batch_sizes):
+    df = synthetic_products(max(n_requests, 2_000))
+    classifier = load_classifier(target, artifact_dir, df)
+    if target == 'brand':
+        texts = (df['product_name'] + ' ' + df['active_ingredients'] + ' ' + df['benefits']).tolist()
+    else:
+        texts = df['product_name'].tolist()
+    texts = [f'{text} #{i}' for i, text in enumerate(texts[:n_requests])]
+    # Pemanasan: cache stem per kata (text.py) terisi agar semua ukuran batch setara
+    classifier.featurize(texts)
+
+    print(f"target={target}, {n_requests} request, {clients} klien, "
+          f"max_latency={max_latency * 1e3:.0f} ms")
+    print(f"{'batch':>6} {'model ms/teks':>14} {'req/s':>9} {'rata batch':>11} "
+          f"{'p50 ms':>9} {'p99 ms':>9}")
+    for batch_size in batch_sizes:
+        sample = texts[:max(batch_size * 4, 64)]
+        start = time.perf_counter()
+        for i in range(0, len(sample), batch_size):
+            classifier.predict_batch(sample[i:i + batch_size])
+        direct_ms = (time.perf_counter() - start) / len(sample) * 1e3
+
+        batcher = MicroBatcher(classifier.predict_batch, max_batch=batch_size,
+                               max_latency=max_latency, name=target)
+        seconds = burst(batcher, texts, clients)
+        stats = batcher.stats()
+        batcher.close()
+        print(f"{batch_size:>6} {direct_ms:>14.3f} {n_requests / seconds:>9.0f} "
+              f"{stats['mean_batch_size']:>11.1f} {stats['p50_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target', choices=TARGETS, default='brand')
+    parser.add_argument('--artifact-dir', default='deployment_files')
+    parser.add_argument('--requests', type=int, default=2048)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--max-latency-ms', type=float, default=5.0)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES))
+    args = parser.parse_args()
+    run(args.target, args.artifact_dir, args.requests, args.clients, args.max_latency_ms / 1e3,
+        args.batch_sizes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark re-ranking keragaman (MMR) pada pool kandidat rekomendasi.
+
+Katalog sintetis bench_ann (cluster Gaussian 128 dimensi) ditambah "varian": sebagian
+produk adalah salinan produk lain dengan sedikit noise (ukuran kemasan berbeda). Diukur:
+    top-n ms      rekomendasi biasa (engine.recommend, baris penuh)
+    pool ms       top-`pool` kandidat dengan filter yang sama
+    mmr ms        MMR tervektorisasi (satu matriks pool x pool + update inkremental)
+    naif ms       MMR yang menghitung ulang kemiripan ke semua produk terpilih tiap langkah
+    ILS / varian  rata-rata cosine antar hasil dan jumlah pasangan hampir identik (> 0.95)
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_diversity
+    python -m benchmarks.bench_diversity --sizes 100000 --pool 100 200 500 --lambdas 1 0.7 0.3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_ann import synthetic_vectors
+from benchmarks.bench_load import synthetic_products
+from recommender.diversity import intra_list_similarity, mmr
+from recommender.engine import RecommendationEngine
+from recommender.similarity import l2_normalize
+
+
+def with_variants(vectors, share=0.3, seed=0):
+    """Ganti `share` produk dengan varian (salinan + noise kecil) dari produk lain"""
+    rng = np.random.default_rng(seed)
+    n = len(vectors)
+    variants = rng.choice(n, int(n * share), replace=False)
+    sources = rng.integers(0, n, len(variants))
+    vectors = vectors.copy()
+    noise = 0.02 * rng.standard_normal((len(variants), vectors.shape[1])).astype(np.float32)
+    vectors[variants] = vectors[sources] + noise
+    return l2_normalize(vectors)
+
+
+def naive_mmr(relevance, vectors, top_n, mmr_lambda):
+    chosen = [int(np.argmax(relevance))]
+    available = np.ones(len(relevance), dtype=bool)
+    available[chosen[0]] = False
+    for _ in range(1, top_n):
+        penalty = (vectors @ vectors[chosen].T).max(axis=1)
+        scores = np.where(available, mmr_lambda * relevance - (1 - mmr_lambda) * penalty, -np.inf)
+        pick = int(np.argmax(scores))
+        chosen.append(pick)
+        available[pick] = False
+    return np.array(chosen)
+
+
+def near_duplicates(vectors, threshold=0.95):
+    pairwise = vectors @ vectors.T
+    return int((np.triu(pairwise, 1) > threshold).sum())
+
+
+def run(sizes, pools, lambdas, top_n, n_queries):
+    print(f"{'produk':>9} {'pool':>5} {'λ':>4} {'top-n ms':>9} {'pool ms':>8} {'mmr ms':>7} "
+          f"{'naif ms':>8} {'ILS':>6} {'varian':>7}")
+    for n_products in sizes:
+        vectors = with_variants(synthetic_vectors(n_products))
+        engine = RecommendationEngine(synthetic_products(n_products))
+        queries = np.random.default_rng(1).choice(n_products, n_queries, replace=False)
+
+        start = time.perf_counter()
+        for idx in queries:
+            engine.recommend(vectors @ vectors[idx], int(idx), top_n)
+        top_n_ms = (time.perf_counter() - start) / n_queries * 1e3
+
+        for pool in pools:
+            start = time.perf_counter()
+            results = [engine.recommend(vectors @ vectors[idx], int(idx), pool) for idx in queries]
+            pool_ms = (time.perf_counter() - start) / n_queries * 1e3
+            for mmr_lambda in lambdas:
+                timings = {'mmr': 0.0, 'naif': 0.0}
+                ils, duplicates = [], []
+                for result in results:
+                    relevance = result['similarity'].to_numpy()
+                    candidates = vectors[result['index'].to_numpy()]
+                    start = time.perf_counter()
+                    order = mmr(relevance, candidates, top_n, mmr_lambda)
+                    timings['mmr'] += time.perf_counter() - start
+                    start = time.perf_counter()
+                    naive_mmr(relevance, candidates, top_n, mmr_lambda)
+                    timings['naif'] += time.perf_counter() - start
+                    ils.append(intra_list_similarity(candidates[order]))
+                    duplicates.append(near_duplicates(candidates[order]))
+                print(f"{n_products:>9} {pool:>5} {mmr_lambda:>4.1f} {top_n_ms:>9.3f} "
+                      f"{pool_ms:>8.3f} {timings['mmr'] / n_queries * 1e3:>7.3f} "
+                      f"{timings['naif'] / n_queries * 1e3:>8.3f} {np.mean(ils):>6.3f} "
+                      f"{np.mean(duplicates):>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--pool', type=int, nargs='+', default=[200])
+    parser.add_argument('--lambdas', type=float, nargs='+', default=[1.0, 0.7, 0.5, 0.3])
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=100)
+    args = parser.parse_args()
+    run(args.sizes, args.pool, args.lambdas, args.top_n, args.queries)
+
+
+if __name__ == '__main__':
+    main()
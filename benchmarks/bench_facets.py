@@ -0,0 +1,69 @@
+"""Benchmark indeks facet (bitmap) vs filter + value_counts pandas.
+
+Untuk setiap ukuran katalog diukur ukuran bitmap, waktu build, dan latensi satu
+"rerun sidebar": filter brand + product_type + skin_type lalu jumlah per nilai
+facet. Baseline pandas memakai mask perbandingan per kolom dan value_counts (tanpa
+skin_type multi-nilai, yang tidak bisa dihitung langsung dari kolom mentah). Katalog
+sintetis bench_load diukur dalam urutan acak dan terurut per brand (seperti hasil
+recommender.build, yang menggabungkan workbook per brand).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_facets
+    python -m benchmarks.bench_facets --sizes 100000 1000000 --repeat 50
+"""
+import argparse
+import time
+
+from benchmarks.bench_load import synthetic_products
+from recommender.facets import FacetIndex
+
+
+def timed(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def pandas_sidebar(df, brand, product_type):
+    mask = (df['brand'] == brand) & (df['product_type'] == product_type)
+    filtered = df[mask]
+    counts = {'brand': df.loc[df['product_type'] == product_type, 'brand'].value_counts(),
+              'product_type': df.loc[df['brand'] == brand, 'product_type'].value_counts()}
+    return filtered.index.to_numpy(), counts
+
+
+def run(sizes, repeat):
+    print(f"{'produk':>9} {'urutan':>7} {'build ms':>9} {'bitmap KB':>10} {'penuh KB':>9} "
+          f"{'facet ms':>9} {'pandas ms':>10}")
+    for n_products in sizes:
+        df = synthetic_products(n_products)
+        brand, product_type = df['brand'].iloc[0], df['product_type'].iloc[0]
+        for order in ('acak', 'brand'):
+            if order == 'brand':
+                df = df.sort_values('brand', kind='stable').reset_index(drop=True)
+            start = time.perf_counter()
+            facets = FacetIndex(df)
+            build_ms = (time.perf_counter() - start) * 1e3
+            # Pembanding ukuran: satu bitmap tanpa kompresi (1 bit per produk) per nilai facet
+            full_kb = sum(len(facets.bitmaps[f]) for f in facets.bitmaps) * n_products / 8 / 1024
+
+            selections = {'brand': brand, 'product_type': product_type,
+                          'skin_type': ['kering', 'sensitif']}
+            facet_ms = timed(lambda: facets.query(selections), repeat)
+            pandas_ms = timed(lambda: pandas_sidebar(df, brand, product_type), repeat)
+            print(f"{n_products:>9} {order:>7} {build_ms:>9.1f} {facets.nbytes / 1024:>10.1f} "
+                  f"{full_kb:>9.1f} {facet_ms:>9.3f} {pandas_ms:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
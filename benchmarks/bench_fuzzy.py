@@ -0,0 +1,79 @@
+"""Benchmark pencarian toleran typo: FuzzyMatcher.suggest dan correct_query.
+
+Query dibuat dari nama bahan / nama produk katalog sintetis bench_load dengan satu
+typo acak (huruf dihapus, diganti atau ditukar). `hit@1` = kandidat teratas sama dengan
+teks aslinya. correct_query diukur dengan klausa tambahan (`<typo> AND NOT retinol`),
+termasuk pencarian exact untuk memastikan term memang tidak punya hasil.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_fuzzy
+    python -m benchmarks.bench_fuzzy --sizes 10000 100000 --queries 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_load import summarize, synthetic_products, timed
+from recommender import IngredientIndex
+from recommender.fuzzy import FuzzyMatcher
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def typo(text, rng):
+    """Satu typo acak di posisi huruf (bukan spasi / angka)"""
+    positions = [i for i, char in enumerate(text) if char.isalpha()]
+    i = positions[rng.integers(len(positions))]
+    kind = rng.integers(3)
+    if kind == 0:
+        return text[:i] + text[i + 1:]
+    if kind == 1:
+        return text[:i] + LETTERS[rng.integers(len(LETTERS))] + text[i + 1:]
+    j = min(i + 1, len(text) - 1)
+    return text[:i] + text[j] + text[i] + text[j + 1:]
+
+
+def make_queries(index, n_queries, seed):
+    rng = np.random.default_rng(seed)
+    sources = [term for term in index.vocabulary if len(term) >= 6]
+    sources += [index.names[i] for i in rng.choice(len(index.names), len(sources), replace=False)]
+    picks = rng.choice(len(sources), n_queries, replace=False)
+    return [(sources[i], typo(sources[i], rng)) for i in picks]
+
+
+def run(sizes, n_queries, seed):
+    print(f"{'produk':>9} {'istilah':>8} {'build (s)':>10} {'hit@1':>6} "
+          f"{'suggest p50':>12} {'p99 ms':>8} {'correct p50':>12} {'p99 ms':>8}")
+    for n_products in sizes:
+        index = IngredientIndex(synthetic_products(n_products, seed))
+        start = time.perf_counter()
+        matcher = FuzzyMatcher(index)
+        build_time = time.perf_counter() - start
+        queries = make_queries(index, min(n_queries, len(index.vocabulary)), seed + 1)
+
+        suggest_stats = summarize(timed(matcher.suggest, [query for _, query in queries]))
+        correct_stats = summarize(timed(lambda query: matcher.correct_query(query, index),
+                                        [f'{query} AND NOT retinol' for _, query in queries]))
+        hits = 0
+        for original, query in queries:
+            suggestions = matcher.suggest(query)
+            hits += int(bool(suggestions) and suggestions[0][0] == original)
+
+        print(f"{n_products:>9} {len(matcher.terms):>8} {build_time:>10.2f} "
+              f"{hits / len(queries):>6.2f} {suggest_stats['p50_ms']:>12.3f} "
+              f"{suggest_stats['p99_ms']:>8.3f} {correct_stats['p50_ms']:>12.3f} "
+              f"{correct_stats['p99_ms']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Benchmark ranking hybrid per kolom: re-ranking dengan bobot acak per request.
+
+Vektor per kolom dibangun dari katalog sintetis bench_load (bahan aktif, manfaat,
+jenis kulit). Setiap panggilan memakai bobot baru, jadi yang diukur adalah satu
+perkalian matriks-vektor + top-k + rincian skor per kolom, tanpa cache.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_hybrid
+    python -m benchmarks.bench_hybrid --sizes 10000 100000 --repeat 500 --batch 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_load import summarize, synthetic_products, timed
+from recommender import RecommendationEngine
+from recommender.hybrid import FIELDS, HybridRanker, recommend_hybrid
+
+
+def run(sizes, repeat, top_n, batch):
+    print(f"{'produk':>9} {'dim':>5} {'build (s)':>10} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'batch ms/produk':>16}")
+    for n_products in sizes:
+        df = synthetic_products(n_products)
+        start = time.perf_counter()
+        ranker = HybridRanker.build(df)
+        build_time = time.perf_counter() - start
+        engine = RecommendationEngine(df)
+
+        rng = np.random.default_rng(1)
+        calls = [(int(i), dict(zip(FIELDS, rng.random(len(FIELDS)))))
+                 for i in rng.integers(0, n_products, repeat)]
+        stats = summarize(timed(
+            lambda call: recommend_hybrid(engine, ranker, call[0], call[1], top_n), calls))
+
+        products = rng.integers(0, n_products, batch)
+        start = time.perf_counter()
+        ranker.scores(products, calls[0][1])
+        batch_ms = (time.perf_counter() - start) / batch * 1e3
+
+        print(f"{n_products:>9} {ranker.matrix.shape[1]:>5} {build_time:>10.2f} "
+              f"{stats['p50_ms']:>8.3f} {stats['p95_ms']:>8.3f} {stats['p99_ms']:>8.3f} "
+              f"{batch_ms:>16.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--batch', type=int, default=32,
+                        help='Jumlah produk acuan untuk satu GEMM batch')
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.top_n, args.batch)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Benchmark beban: cold start, rekomendasi, pencarian bahan aktif dan batch scoring.
+
+Untuk setiap ukuran dibuat katalog sintetis berbentuk skincare_products.csv (brand,
+product_type, daftar bahan aktif dipisah koma) beserta catalog.bin + vektor produk,
+lalu diukur di proses terpisah agar peak RSS per ukuran tidak saling tercampur.
+Hasil (p50/p95/p99 dalam ms, peak RSS dalam MB) ditulis sebagai JSON agar hasil
+antar commit bisa di-diff.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_load --output bench_load.json
+    python -m benchmarks.bench_load --sizes 1000 10000 --repeat 200
+Ukuran 1M produk butuh sekitar 4-5 GB RAM dan beberapa menit.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_ann import synthetic_vectors
+from benchmarks.bench_recommend import BRANDS, PRODUCT_TYPES
+from recommender import BatchRecommender, RecommenderService, write_catalog
+from recommender.similarity import VECTORS_FILE
+
+INGREDIENTS = [
+    'Aqua', 'Glycerin', 'Niacinamide', 'Butylene Glycol', 'Hyaluronic Acid', 'Sodium Hyaluronate',
+    'Panthenol', 'Ceramide NP', 'Centella Asiatica Extract', 'Salicylic Acid', 'Retinol',
+    'Ascorbic Acid', 'Alpha Arbutin', 'Tranexamic Acid', 'Allantoin', 'Tocopherol', 'Zinc PCA',
+    'Madecassoside', 'Lactic Acid', 'Glycolic Acid', 'Mandelic Acid', 'Squalane', 'Adenosine',
+    'Peptide', 'Bakuchiol', 'Licorice Root Extract', 'Tea Tree Leaf Oil', 'Aloe Barbadensis Leaf Extract',
+    'Galactomyces Ferment Filtrate', 'Propanediol', 'Phenoxyethanol', 'Fragrance', 'Dimethicone',
+    'Titanium Dioxide', 'Zinc Oxide', 'Ethylhexyl Methoxycinnamate', 'Kojic Acid', 'Azelaic Acid',
+    'Polyglutamic Acid', 'Beta Glucan', 'Mugwort Extract', 'Green Tea Extract', 'Cholesterol',
+]
+SKIN_TYPES = ['Semua Jenis Kulit', 'Kulit Berminyak', 'Kulit Kering', 'Kulit Sensitif',
+              'Kulit Normal, Kulit Berminyak', 'Berjerawat', 'Kusam']
+BENEFITS = ['Mencerahkan kulit', 'Melembapkan kulit', 'Mengontrol minyak', 'Mengatasi jerawat',
+            'Menenangkan kulit', 'Memperkuat skin barrier', 'Menyamarkan noda hitam']
+SCENARIOS = {
+    'tanpa filter': {},
+    'brand': {'filter_brand': 'wardah'},
+    'product_type': {'filter_product_type': 'Toner'},
+    'brand + product_type': {'filter_brand': 'wardah', 'filter_product_type': 'Serum'},
+    'brand sama': {'same_brand_only': True},
+    'brand berbeda': {'different_brand_only': True},
+    'brand sama + product_type': {'same_brand_only': True, 'filter_product_type': 'Eye Cream'},
+}
+QUERIES = ['niacinamide', 'vitamin c', 'hyaluronic acid', 'salicylic acid AND NOT fragrance',
+           'retinol OR bakuchiol', '(ceramide OR panthenol) AND centella', 'niacinamde',
+           'hyaluronik', 'extract 17']
+
+
+def synthetic_products(n_products, seed=0):
+    """Katalog sintetis dengan kolom seperti skincare_products.csv"""
+    rng = np.random.default_rng(seed)
+    # Kosakata tumbuh dengan ukuran katalog (ekstrak tanaman / varian), frekuensi ala Zipf
+    n_extra = max(100, n_products // 50)
+    vocabulary = np.array(INGREDIENTS + [f'Plant Extract {i}' for i in range(n_extra)], dtype=object)
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    weights /= weights.sum()
+
+    counts = rng.integers(4, 13, n_products)
+    picks = rng.choice(len(vocabulary), counts.sum(), p=weights)
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    ingredients = [', '.join(dict.fromkeys(vocabulary[picks[bounds[i]:bounds[i + 1]]]))
+                   for i in range(n_products)]
+
+    brands = rng.choice(BRANDS, n_products)
+    product_types = rng.choice(PRODUCT_TYPES, n_products)
+    return pd.DataFrame({
+        'product_name': [f'{b.title()} {vocabulary[picks[s]]} {t} {i}'
+                         for i, (b, t, s) in enumerate(zip(brands, product_types, bounds[:-1]))],
+        'product_type': product_types,
+        'active_ingredients': ingredients,
+        'skin_type': rng.choice(SKIN_TYPES, n_products),
+        'benefits': rng.choice(BENEFITS, n_products),
+        'brand': brands,
+    })
+
+
+def write_artifacts(directory, n_products, seed=0):
+    df = synthetic_products(n_products, seed)
+    vectors = synthetic_vectors(n_products, seed=seed)
+    df.to_csv(os.path.join(directory, 'skincare_products.csv'), index=False)
+    np.save(os.path.join(directory, VECTORS_FILE), vectors)
+    write_catalog(os.path.join(directory, 'catalog.bin'), df, vectors)
+
+
+def summarize(timings):
+    ms = np.asarray(timings) * 1e3
+    return {
+        'count': len(ms),
+        'mean_ms': round(float(ms.mean()), 4),
+        'p50_ms': round(float(np.percentile(ms, 50)), 4),
+        'p95_ms': round(float(np.percentile(ms, 95)), 4),
+        'p99_ms': round(float(np.percentile(ms, 99)), 4),
+        'max_ms': round(float(ms.max()), 4),
+    }
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((usage if sys.platform == 'darwin' else usage * 1024) / 2**20, 1)
+
+
+def timed(fn, calls):
+    timings = []
+    for call in calls:
+        start = time.perf_counter()
+        fn(call)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def probe_cold_start(directory):
+    """Dijalankan di proses baru: load_models_and_data + rekomendasi pertama"""
+    start = time.perf_counter()
+    service = RecommenderService(directory, cache_items=0)
+    loaded = time.perf_counter()
+    service.recommend(0)
+    first = time.perf_counter()
+    return {'load_models_and_data': loaded - start, 'first_recommendation': first - loaded,
+            'peak_rss_mb': peak_rss_mb()}
+
+
+def bench_size(directory, n_products, repeat, top_n, cold_repeat, batch_products, seed):
+    result = {'n_products': n_products}
+    start = time.perf_counter()
+    write_artifacts(directory, n_products, seed)
+    result['generate_seconds'] = round(time.perf_counter() - start, 2)
+
+    probes = []
+    for _ in range(cold_repeat):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_load', '--probe-cold-start', directory],
+            check=True, capture_output=True, text=True).stdout
+        probes.append(json.loads(output))
+    result['cold_start'] = {
+        'load_models_and_data': summarize([p['load_models_and_data'] for p in probes]),
+        'first_recommendation': summarize([p['first_recommendation'] for p in probes]),
+        'peak_rss_mb': max(p['peak_rss_mb'] or 0 for p in probes),
+    }
+
+    # Cache hasil dimatikan (cache_items=0) agar setiap panggilan benar-benar dihitung
+    service = RecommenderService(directory, cache_items=0)
+    service.similarity
+    rng = np.random.default_rng(seed + 1)
+    products = rng.integers(0, n_products, repeat).tolist()
+    result['recommend'] = {
+        name: summarize(timed(lambda idx: service.recommend(idx, top_n, **filters), products))
+        for name, filters in SCENARIOS.items()
+    }
+
+    start = time.perf_counter()
+    service.fuzzy_matcher
+    build_seconds = time.perf_counter() - start
+    queries = [QUERIES[i % len(QUERIES)] for i in range(repeat)]
+    result['ingredient_search'] = {
+        'index_build_seconds': round(build_seconds, 3),
+        'all_queries': summarize(timed(service.search_ingredients, queries)),
+        **{query: summarize(timed(service.search_ingredients, [query] * max(repeat // 10, 5)))
+           for query in QUERIES},
+    }
+
+    batch = BatchRecommender(service.engine, service.similarity.vectors)
+    sources = rng.choice(n_products, min(batch_products, n_products), replace=False)
+    start = time.perf_counter()
+    n_rows = sum(len(frame) for frame in batch.iter_batches(sources, top_n))
+    seconds = time.perf_counter() - start
+    result['batch'] = {'products': len(sources), 'rows': n_rows, 'seconds': round(seconds, 3),
+                       'products_per_second': round(len(sources) / seconds, 1)}
+    result['peak_rss_mb'] = peak_rss_mb()
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = []
+    for n_products in args.sizes:
+        # Satu proses per ukuran agar peak RSS tidak terbawa dari ukuran sebelumnya
+        command = [sys.executable, '-m', 'benchmarks.bench_load', '--single-size', str(n_products),
+                   '--repeat', str(args.repeat), '--top-n', str(args.top_n),
+                   '--cold-repeat', str(args.cold_repeat), '--batch-products',
+                   str(args.batch_products), '--seed', str(args.seed)]
+        if args.work_dir:
+            command += ['--work-dir', args.work_dir]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output)
+        results.append(result)
+        print(f"{n_products:>9} produk: cold start "
+              f"{result['cold_start']['load_models_and_data']['p50_ms']:.0f} ms, recommend p95 "
+              f"{result['recommend']['tanpa filter']['p95_ms']:.2f} ms, search p95 "
+              f"{result['ingredient_search']['all_queries']['p95_ms']:.2f} ms, batch "
+              f"{result['batch']['products_per_second']:.0f} produk/s, peak RSS "
+              f"{result['peak_rss_mb']} MB", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': args.repeat,
+            'top_n': args.top_n,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f"Hasil ditulis ke {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=100, help='Jumlah panggilan per skenario')
+    parser.add_argument('--top-n', type=int, default=5)
+    parser.add_argument('--cold-repeat', type=int, default=3, help='Jumlah proses cold start')
+    parser.add_argument('--batch-products', type=int, default=2_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--work-dir', default=None, help='Folder katalog sintetis (default: temp)')
+    parser.add_argument('--output', default=None, help='File JSON hasil (default: stdout)')
+    parser.add_argument('--single-size', type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--probe-cold-start', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe_cold_start:
+        print(json.dumps(probe_cold_start(args.probe_cold_start)))
+    elif args.single_size:
+        directory = tempfile.mkdtemp(prefix=f'bench-{args.single_size}-', dir=args.work_dir)
+        try:
+            result = bench_size(directory, args.single_size, args.repeat, args.top_n,
+                                args.cold_repeat, args.batch_products, args.seed)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(json.dumps(result))
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
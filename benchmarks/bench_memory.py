@@ -0,0 +1,132 @@
+"""Benchmark memori per worker untuk tiga layout katalog runtime.
+
+    csv       read_csv semua kolom sebagai object (12 kolom, termasuk text,
+              normalized_text dan clean_text) + vektor dari product_vectors.npy
+    decoded   catalog.bin dengan teks didekode ke string Python (layout sebelumnya)
+    compact   catalog.bin: kode kategori, teks Arrow di atas mmap, vektor float32 mmap
+
+Katalog sintetis bench_load dilengkapi kolom turunan seperti hasil text.py (tanpa
+stemming). Setiap layout diukur di proses baru: pertambahan RSS dan memori anonim
+(private, tidak bisa dibagi antar worker; dari /proc/self/smaps_rollup) setelah
+DataFrame, engine dan similarity siap dan beberapa rekomendasi dijalankan, plus byte
+per produk DataFrame + vektor.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_ann import synthetic_vectors
+from benchmarks.bench_load import synthetic_products
+from recommender import RecommendationEngine, VectorSimilarity, load_catalog, recommend_with_backend
+from recommender.catalog import frame_footprint, write_catalog
+from recommender.registry import current_rss
+from recommender.similarity import VECTORS_FILE
+
+LAYOUTS = ('csv', 'decoded', 'compact')
+
+
+def anonymous_memory():
+    """Memori anonim proses (byte) dari smaps_rollup, None di luar Linux"""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Anonymous:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def write_artifacts(directory, n_products, seed=0):
+    df = synthetic_products(n_products, seed)
+    df['product_name_clean'] = df['product_name'].str.lower()
+    df['active_ingredients_clean'] = df['active_ingredients'].str.lower().str.replace(',', '')
+    df['benefits_clean'] = df['benefits'].str.lower()
+    df['text'] = (df['product_name_clean'] + ' ' + df['active_ingredients_clean'] + ' '
+                  + df['benefits_clean'])
+    df['normalized_text'] = df['text'].str.replace(r'[^a-z ]', '', regex=True)
+    df['clean_text'] = df['normalized_text']
+    vectors = synthetic_vectors(n_products, seed=seed)
+    df.to_csv(os.path.join(directory, 'skincare_products.csv'), index=False)
+    np.save(os.path.join(directory, VECTORS_FILE), vectors)
+    write_catalog(os.path.join(directory, 'catalog.bin'), df, vectors)
+
+
+def probe(directory, layout):
+    """Dijalankan di proses baru: muat satu layout, ukur pertambahan memori"""
+    rss_before, anon_before = current_rss(), anonymous_memory()
+    if layout == 'csv':
+        df = pd.read_csv(os.path.join(directory, 'skincare_products.csv'), dtype=object)
+        vectors = np.load(os.path.join(directory, VECTORS_FILE))
+        similarity = VectorSimilarity(vectors)
+    else:
+        catalog = load_catalog(os.path.join(directory, 'catalog.bin'))
+        df = catalog.to_frame(strings='object' if layout == 'decoded' else None)
+        similarity = VectorSimilarity(catalog.vectors, normalized=True)
+    engine = RecommendationEngine(df)
+    for idx in np.random.default_rng(0).integers(0, len(df), 20):
+        recommend_with_backend(engine, similarity, int(idx), 5)
+
+    rss_after, anon_after = current_rss(), anonymous_memory()
+    footprint = frame_footprint(df, similarity.vectors)
+    return {
+        'layout': layout,
+        'rss_mb': (rss_after - rss_before) / 2**20,
+        'private_mb': (anon_after - anon_before) / 2**20 if anon_before is not None else None,
+        'bytes_per_product': footprint['bytes_per_product'],
+        'columns': footprint['columns'],
+    }
+
+
+def run(sizes, work_dir):
+    print(f"{'produk':>9} {'layout':>8} {'byte/produk':>12} {'RSS (MB)':>9} "
+          f"{'private (MB)':>13} {'private/produk':>15}")
+    for n_products in sizes:
+        directory = tempfile.mkdtemp(prefix=f'bench-memory-{n_products}-', dir=work_dir)
+        try:
+            write_artifacts(directory, n_products)
+            results = {}
+            for layout in LAYOUTS:
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_memory', '--probe', layout, directory],
+                    check=True, capture_output=True, text=True).stdout
+                results[layout] = result = json.loads(output)
+                private = result['private_mb']
+                print(f"{n_products:>9} {layout:>8} {result['bytes_per_product']:>12.0f} "
+                      f"{result['rss_mb']:>9.1f} "
+                      f"{private if private is not None else float('nan'):>13.1f} "
+                      f"{(private or 0) * 2**20 / n_products:>15.0f}")
+            base, compact = results['csv'], results['compact']
+            if base['private_mb'] and compact['private_mb']:
+                print(f"{'':>9} csv -> compact: memori private per worker "
+                      f"{base['private_mb'] / compact['private_mb']:.1f}x lebih kecil, "
+                      f"RSS {base['rss_mb'] / max(compact['rss_mb'], 1e-9):.1f}x")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--work-dir', default=None, help='Folder katalog sintetis (default: temp)')
+    parser.add_argument('--probe', nargs=2, metavar=('LAYOUT', 'DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        print(json.dumps(probe(args.probe[1], args.probe[0])))
+    else:
+        run(args.sizes, args.work_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Benchmark kemiripan irisan bahan aktif: kandidat MinHash/LSH vs scan exact.
+
+Daftar bahan berasal dari katalog sintetis bench_load. Recall@k dihitung per skor
+(bukan per ID) karena skor Jaccard banyak yang seri: hasil LSH dianggap benar jika
+skornya minimal skor ke-k hasil exact.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_minhash
+    python -m benchmarks.bench_minhash --sizes 10000 100000 --bands 32 48 64
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_load import summarize, synthetic_products, timed
+from recommender import IngredientIndex, IngredientLSH
+from recommender.minhash import MEASURES
+
+
+def top_scores(scores, k):
+    return np.sort(scores)[::-1][:k]
+
+
+def run(sizes, band_options, rows, k, n_queries, measure):
+    print(f"{'produk':>9} {'bands':>6} {'build (s)':>10} {'recall@' + str(k):>10} "
+          f"{'kandidat':>9} {'p50 ms':>8} {'p99 ms':>8} {'exact p50':>10}")
+    for n_products in sizes:
+        index = IngredientIndex(synthetic_products(n_products))
+        rng = np.random.default_rng(1)
+        queries = [int(i) for i in rng.choice(n_products, n_queries, replace=False)]
+        for bands in band_options:
+            start = time.perf_counter()
+            lsh = IngredientLSH(index, bands=bands, rows=rows)
+            build_time = time.perf_counter() - start
+
+            def approximate(idx):
+                candidates = lsh.candidates(idx)
+                candidates = candidates[candidates != idx]
+                return top_scores(lsh.scores(idx, candidates, measure), k), len(candidates)
+
+            def exact(idx):
+                scores = lsh.scores(idx, None, measure)
+                scores[idx] = -1
+                return top_scores(scores, k)
+
+            approx_stats = summarize(timed(approximate, queries))
+            exact_stats = summarize(timed(exact, queries))
+            hits, n_candidates = 0, 0
+            for idx in queries:
+                found, size = approximate(idx)
+                truth = exact(idx)
+                hits += int(np.sum(found >= truth[-1] - 1e-12)) if len(found) else 0
+                n_candidates += size
+            recall = min(hits, k * len(queries)) / (k * len(queries))
+
+            print(f"{n_products:>9} {bands:>6} {build_time:>10.2f} {recall:>10.3f} "
+                  f"{n_candidates / len(queries):>9.0f} {approx_stats['p50_ms']:>8.3f} "
+                  f"{approx_stats['p99_ms']:>8.3f} {exact_stats['p50_ms']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--bands', type=int, nargs='+', default=[16, 48])
+    parser.add_argument('--rows', type=int, default=3)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--measure', choices=MEASURES, default='jaccard')
+    args = parser.parse_args()
+    run(args.sizes, args.bands, args.rows, args.k, args.queries, args.measure)
+
+
+if __name__ == '__main__':
+    main()
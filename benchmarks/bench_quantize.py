@@ -0,0 +1,77 @@
+"""Benchmark vektor terkuantisasi (float16 / int8 / PQ) terhadap cosine_similarity exact.
+
+Untuk setiap mode diukur byte per produk, memori yang dihemat dibanding float32,
+kesesuaian top-k dengan ranking exact (scan kode saja, dan setelah re-ranking
+`--rerank` kandidat dengan vektor penuh), latensi per query dan waktu build.
+Katalog sintetis sama dengan bench_ann (campuran cluster Gaussian 128 dimensi).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_quantize
+    python -m benchmarks.bench_quantize --sizes 100000 1000000 --rerank 50 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_ann import exact_top_k, recall_at_k, synthetic_vectors
+from recommender.engine import top_k
+from recommender.quantize import MODES, quantize
+from recommender.similarity import QuantizedSimilarity
+
+
+def search(similarity, queries, k):
+    """(id top-k per query, ms per query) lewat jalur kandidat re-ranking"""
+    found = np.empty((len(queries), k), dtype=np.int64)
+    start = time.perf_counter()
+    for i, idx in enumerate(queries):
+        indices, _ = similarity.candidates(idx)
+        found[i] = indices[:k]
+    return found, (time.perf_counter() - start) / len(queries) * 1e3
+
+
+def run(sizes, modes, reranks, k, n_queries, subspaces):
+    print(f"{'produk':>9} {'mode':>8} {'byte/produk':>12} {'hemat MB':>9} {'build (s)':>10} "
+          f"{'rerank':>7} {'top-' + str(k) + ' kode':>11} {'top-' + str(k) + ' rerank':>13} "
+          f"{'ms/query':>9} {'exact ms/q':>11}")
+    for n_products in sizes:
+        vectors = synthetic_vectors(n_products)
+        full_bytes = vectors.nbytes
+        queries = np.random.default_rng(1).choice(n_products, n_queries, replace=False)
+        # Produk acuan ikut dalam ground truth (skor 1.0) di semua mode
+        truth = exact_top_k(vectors, vectors[queries], k)
+
+        start = time.perf_counter()
+        for idx in queries:
+            top_k(vectors @ vectors[idx], k)
+        exact_ms = (time.perf_counter() - start) / n_queries * 1e3
+
+        for mode in modes:
+            start = time.perf_counter()
+            codes = quantize(vectors, mode, subspaces)
+            build_time = time.perf_counter() - start
+            coarse = np.array([top_k(codes.score(vectors[idx]), k) for idx in queries])
+            coarse_recall = recall_at_k(coarse, truth)
+            for rerank in reranks:
+                similarity = QuantizedSimilarity(codes, vectors, rerank=rerank)
+                found, query_ms = search(similarity, queries, k)
+                print(f"{n_products:>9} {mode:>8} {codes.nbytes / n_products:>12.1f} "
+                      f"{(full_bytes - codes.nbytes) / 2**20:>9.1f} {build_time:>10.2f} "
+                      f"{rerank:>7} {coarse_recall:>11.3f} {recall_at_k(found, truth):>13.3f} "
+                      f"{query_ms:>9.3f} {exact_ms:>11.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--modes', choices=MODES, nargs='+', default=list(MODES))
+    parser.add_argument('--rerank', type=int, nargs='+', default=[50, 100, 200])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--subspaces', type=int, default=16)
+    args = parser.parse_args()
+    run(args.sizes, args.modes, args.rerank, args.k, args.queries, args.subspaces)
+
+
+if __name__ == '__main__':
+    main()
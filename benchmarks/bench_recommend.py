@@ -0,0 +1,135 @@
+"""Micro-benchmark: recommend_products lama (loop per baris) vs RecommendationEngine.
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_recommend
+    python -m benchmarks.bench_recommend --sizes 600 50000 --repeat 5
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from recommender import RecommendationEngine
+
+BRANDS = ['avoskin', 'emina', 'glad2glow', 'originote', 'scarlett', 'somethinc', 'wardah', 'whitelab']
+PRODUCT_TYPES = ['Serum', 'Moisturizer', 'Toner', 'Cleanser', 'Mask', 'Sunscreen', 'Essence', 'Eye Cream']
+
+
+def legacy_recommend_products(df, similarity_matrix, product_idx, top_n=5,
+                              filter_brand=None, filter_product_type=None,
+                              same_brand_only=False, different_brand_only=False):
+    """Salinan recommend_products sebelum vektorisasi, sebagai baseline"""
+    if product_idx >= len(df):
+        return None
+
+    target_product = df.iloc[product_idx]
+    target_brand = target_product['brand']
+
+    sim_scores = list(enumerate(similarity_matrix[product_idx]))
+    sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+
+    recommendations = []
+    for idx, score in sim_scores[1:]:
+        product = df.iloc[idx]
+
+        if same_brand_only and product['brand'] != target_brand:
+            continue
+        if different_brand_only and product['brand'] == target_brand:
+            continue
+        if filter_brand and product['brand'] != filter_brand:
+            continue
+        if filter_product_type and 'product_type' in df.columns:
+            if product.get('product_type', '') != filter_product_type:
+                continue
+
+        recommendations.append({
+            'index': idx,
+            'similarity': score,
+            'product_name': product['product_name'],
+            'brand': product['brand'],
+            'product_type': product.get('product_type', 'N/A'),
+            'skin_type': product.get('skin_type', 'N/A'),
+            'active_ingredients': product.get('active_ingredients', 'N/A'),
+            'benefits': product.get('benefits', 'N/A')
+        })
+
+        if len(recommendations) >= top_n:
+            break
+
+    return pd.DataFrame(recommendations)
+
+
+class RowSource:
+    """Pengganti matriks N x N: hanya menghasilkan baris similarity yang diminta"""
+
+    def __init__(self, n_products, seed=0):
+        self.n_products = n_products
+        self.seed = seed
+
+    def __getitem__(self, idx):
+        rng = np.random.default_rng(self.seed + int(idx))
+        row = rng.random(self.n_products)
+        row[idx] = 1.0
+        return row
+
+
+def synthetic_catalog(n_products, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'product_name': [f'Produk {i}' for i in range(n_products)],
+        'brand': rng.choice(BRANDS, n_products),
+        'product_type': rng.choice(PRODUCT_TYPES, n_products),
+        'skin_type': 'Semua Jenis Kulit',
+        'active_ingredients': 'Aqua, Glycerin, Niacinamide',
+        'benefits': 'Melembapkan kulit',
+    })
+
+
+def time_call(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes, repeat, top_n):
+    scenarios = [
+        ('tanpa filter', {}),
+        ('product_type', {'filter_product_type': 'Toner'}),
+        ('brand sama + type', {'same_brand_only': True, 'filter_product_type': 'Eye Cream'}),
+    ]
+    print(f"{'produk':>9} {'skenario':<20} {'lama (ms)':>12} {'engine (ms)':>12} {'speedup':>9}")
+    for n_products in sizes:
+        df = synthetic_catalog(n_products)
+        rows = RowSource(n_products)
+        engine = RecommendationEngine(df)
+        product_idx = n_products // 2
+        row = rows[product_idx]
+
+        for name, filters in scenarios:
+            legacy = legacy_recommend_products(df, rows, product_idx, top_n, **filters)
+            fast = engine.recommend(row, product_idx, top_n, **filters)
+            assert legacy['index'].tolist() == fast['index'].tolist(), name
+
+            legacy_time = time_call(
+                lambda: legacy_recommend_products(df, rows, product_idx, top_n, **filters), repeat)
+            fast_time = time_call(
+                lambda: engine.recommend(rows[product_idx], product_idx, top_n, **filters), repeat)
+            print(f"{n_products:>9} {name:<20} {legacy_time * 1e3:>12.2f} "
+                  f"{fast_time * 1e3:>12.2f} {legacy_time / fast_time:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[600, 50_000, 500_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top-n', type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.top_n)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark "Lengkapi Rutinitas" (RoutineBuilder) pada katalog sintetis bench_load.
+
+Untuk setiap ukuran katalog diukur waktu build (indeks bahan + array CSR), ukuran
+array (nnz X dan co-occurrence C, MB), latensi satu rutinitas (p50/p95, semua langkah)
+serta rata-rata langkah yang terisi. Setiap rutinitas (termasuk produk acuan) diperiksa
+ulang: tidak boleh ada dua produk berbeda dengan bahan aktif yang bertentangan (kolom
+"konflik" harus 0; satu produk boleh membawa pasangan aktifnya sendiri).
+
+Jalankan dari root repo:
+    python -m benchmarks.bench_routine
+    python -m benchmarks.bench_routine --sizes 100000 1000000 --queries 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_load import synthetic_products
+from recommender.engine import RecommendationEngine
+from recommender.ingredients import IngredientIndex
+from recommender.routine import CONFLICTS, RoutineBuilder, complete_routine
+
+
+def builder_mb(builder):
+    arrays = (builder.offsets, builder.ingredients, builder.rows, builder.values,
+              builder.cooccurrence_offsets, builder.cooccurrence_columns,
+              builder.cooccurrence_values, builder.actives, builder.active_bits)
+    return sum(array.nbytes for array in arrays) / 2**20
+
+
+def violations(builder, positions):
+    """Pasangan aktif bertentangan yang berasal dari dua produk berbeda dalam satu rutinitas"""
+    groups = [set(builder.active_groups(position)) for position in positions]
+    return sum(1 for i, first in enumerate(groups) for second in groups[i + 1:]
+               for a, b in CONFLICTS
+               if (a in first and b in second) or (b in first and a in second))
+
+
+def run(sizes, n_queries):
+    print(f"{'produk':>9} {'build s':>8} {'nnz X':>9} {'nnz C':>9} {'MB':>7} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'langkah':>8} {'konflik':>8}")
+    for n_products in sizes:
+        df = synthetic_products(n_products)
+        engine = RecommendationEngine(df)
+        start = time.perf_counter()
+        builder = RoutineBuilder(df, IngredientIndex(df))
+        build_time = time.perf_counter() - start
+
+        queries = np.random.default_rng(1).choice(n_products, n_queries, replace=False)
+        timings, steps, conflicts = [], [], 0
+        for idx in queries:
+            start = time.perf_counter()
+            result, _ = complete_routine(engine, builder, int(idx))
+            timings.append(time.perf_counter() - start)
+            steps.append(len(result))
+            conflicts += violations(builder, [int(idx)] + result['index'].tolist())
+
+        ms = np.asarray(timings) * 1e3
+        print(f"{n_products:>9} {build_time:>8.2f} {len(builder.values):>9} "
+              f"{len(builder.cooccurrence_values):>9} {builder_mb(builder):>7.1f} "
+              f"{np.percentile(ms, 50):>8.2f} {np.percentile(ms, 95):>8.2f} "
+              f"{np.mean(steps):>8.2f} {conflicts:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Inti sistem rekomendasi skincare yang dipakai oleh app.py
+
+Nama publik dimuat saat pertama diakses (PEP 562): `import recommender` tidak mengimpor
+submodule apa pun, sehingga `python -m recommender.<cli>` tidak mengimpor modul CLI itu
+lebih dulu lalu menjalankannya lagi sebagai __main__.
+"""
+import importlib
+
+_EXPORTS = {
+    'IVFIndex': 'ann',
+    'BatchRecommender': 'batch',
+    'write_batches': 'batch',
+    'ResultCache': 'cache',
+    'artifact_version': 'cache',
+    'Catalog': 'catalog',
+    'load_catalog': 'catalog',
+    'write_catalog': 'catalog',
+    'MicroBatcher': 'classifier',
+    'TextClassifier': 'classifier',
+    'RecommendationEngine': 'engine',
+    'top_k': 'engine',
+    'FuzzyMatcher': 'fuzzy',
+    'HybridRanker': 'hybrid',
+    'ImageIndex': 'images',
+    'ThumbnailCache': 'images',
+    'IngredientIndex': 'ingredients',
+    'METRICS': 'metrics',
+    'start_metrics_server': 'metrics',
+    'timer': 'metrics',
+    'trace': 'metrics',
+    'IngredientLSH': 'minhash',
+    'ResultPages': 'pagination',
+    'QueryEmbedder': 'query',
+    'search_by_text': 'query',
+    'ModelRegistry': 'registry',
+    'default_registry': 'registry',
+    'RoutineBuilder': 'routine',
+    'RecommenderService': 'service',
+    'QuantizedSimilarity': 'similarity',
+    'VectorSimilarity': 'similarity',
+    'build_neighbor_table': 'similarity',
+    'recommend_with_backend': 'similarity',
+    'Compactor': 'updates',
+    'apply_updates': 'updates',
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+__all__ = [
+    'BatchRecommender',
+    'Catalog',
+    'Compactor',
+    'FuzzyMatcher',
+    'HybridRanker',
+    'IVFIndex',
+    'ImageIndex',
+    'IngredientIndex',
+    'IngredientLSH',
+    'METRICS',
+    'MicroBatcher',
+    'ModelRegistry',
+    'QuantizedSimilarity',
+    'QueryEmbedder',
+    'RecommendationEngine',
+    'RecommenderService',
+    'ResultCache',
+    'ResultPages',
+    'RoutineBuilder',
+    'TextClassifier',
+    'ThumbnailCache',
+    'VectorSimilarity',
+    'apply_updates',
+    'artifact_version',
+    'build_neighbor_table',
+    'default_registry',
+    'load_catalog',
+    'recommend_with_backend',
+    'search_by_text',
+    'start_metrics_server',
+    'timer',
+    'top_k',
+    'trace',
+    'write_batches',
+    'write_catalog',
+]
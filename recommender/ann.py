@@ -0,0 +1,147 @@
+"""Indeks approximate nearest neighbour (IVF) untuk vektor produk, murni NumPy.
+
+Vektor dikelompokkan dengan spherical k-means; saat query hanya `nprobe` cluster
+terdekat yang dipindai. `nprobe` adalah knob recall vs latensi: makin besar makin
+akurat, makin lambat (nprobe = n_lists sama dengan pencarian exact).
+
+Membuat indeks untuk katalog di deployment_files:
+    python -m recommender.ann --nprobe 8
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .engine import top_k
+
+ANN_FILE = 'ann_index.npz'
+
+
+def _assign(vectors, centroids, block_size=65536):
+    """Cluster terdekat (cosine) untuk setiap vektor, dihitung per blok"""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start:start + block_size] @ centroids.T
+        labels[start:start + block_size] = block.argmax(axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=10, sample_size=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    else:
+        sample = vectors
+    centroids = sample[rng.choice(len(sample), n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Cluster kosong diisi ulang dengan titik acak
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted file index: centroid + daftar id produk per cluster (layout CSR).
+
+    `vectors` (ternormalisasi, mis. view mmap catalog.bin) tidak disalin: baris kandidat
+    dibaca lewat `list_ids` saat query, jadi page-nya tetap dibagi antar worker.
+    """
+
+    def __init__(self, centroids, list_offsets, list_ids, vectors, nprobe=8):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.list_offsets = np.asarray(list_offsets, dtype=np.int64)
+        self.list_ids = np.asarray(list_ids, dtype=np.int32)
+        self.vectors = vectors
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def __len__(self):
+        return len(self.list_ids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, nprobe=8, n_iter=10, seed=0):
+        """Vektor harus sudah dinormalisasi L2"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        centroids = spherical_kmeans(vectors, n_lists, n_iter=n_iter, seed=seed)
+        labels = _assign(vectors, centroids)
+        list_ids = np.argsort(labels, kind='stable').astype(np.int32)
+        counts = np.bincount(labels, minlength=n_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(centroids, list_offsets, list_ids, vectors, nprobe=min(nprobe, n_lists))
+
+    def _probe(self, query, nprobe):
+        probes = top_k(self.centroids @ query, nprobe)
+        starts = self.list_offsets[probes]
+        ends = self.list_offsets[probes + 1]
+        positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        return positions
+
+    def search(self, query, k=10, nprobe=None):
+        """(id, skor) k tetangga terdekat dari `query` (vektor ternormalisasi)"""
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        query = np.asarray(query, dtype=np.float32)
+        # id dalam satu cluster terurut naik: baris mmap dibaca dalam urutan file
+        ids = self.list_ids[self._probe(query, nprobe)]
+        scores = self.vectors[ids] @ query
+        best = top_k(scores, k)
+        return ids[best], scores[best]
+
+    def search_batch(self, queries, k=10, nprobe=None):
+        ids = np.full((len(queries), k), -1, dtype=np.int32)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for i, query in enumerate(queries):
+            found, found_scores = self.search(query, k, nprobe)
+            ids[i, :len(found)] = found
+            scores[i, :len(found)] = found_scores
+        return ids, scores
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets,
+                 list_ids=self.list_ids, nprobe=self.nprobe)
+
+    @classmethod
+    def load(cls, path, vectors):
+        data = np.load(path)
+        if len(data['list_ids']) != len(vectors):
+            return None
+        return cls(data['centroids'], data['list_offsets'], data['list_ids'], vectors,
+                   nprobe=int(data['nprobe']))
+
+
+def main():
+    from .similarity import ARTIFACT_DIR, VectorSimilarity
+
+    parser = argparse.ArgumentParser(description='Bangun indeks IVF untuk vektor produk')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--n-lists', type=int, default=None,
+                        help='Jumlah cluster (default: akar jumlah produk)')
+    parser.add_argument('--nprobe', type=int, default=8,
+                        help='Cluster yang dipindai per query (recall vs latensi)')
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(args.artifact_dir, 'skincare_products.csv'))
+    similarity = VectorSimilarity.from_artifacts(df, args.artifact_dir)
+    index = IVFIndex.build(similarity.vectors, args.n_lists, args.nprobe)
+    path = os.path.join(args.artifact_dir, ANN_FILE)
+    index.save(path)
+    print(f"Indeks IVF ({index.n_lists} cluster, nprobe={index.nprobe}) "
+          f"untuk {len(index)} produk disimpan ke {path}")
+
+
+if __name__ == '__main__':
+    main()
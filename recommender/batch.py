@@ -0,0 +1,292 @@
+"""Rekomendasi massal (offline) untuk semua produk atau daftar produk tertentu.
+
+Skor dihitung per blok baris (`vectors[blok] @ vectors.T`) dengan ukuran blok yang
+disesuaikan dengan anggaran memori, beberapa blok diproses paralel di thread pool
+(perkalian matriks dan argpartition NumPy melepas GIL), dan hasil top-k setiap blok
+langsung ditulis ke file. Matriks N x N tidak pernah ada utuh di memori. Semantik
+filter sama dengan `recommend_products` (brand, product_type, brand sama/berbeda,
+produk sumber selalu dikeluarkan).
+
+    python -m recommender.batch --output similar.csv --top-n 10
+    python -m recommender.batch --output similar.parquet --product-type Serum --different-brand
+    python -m recommender.batch --output similar.jsonl --products skus.txt --memory-mb 512 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .similarity import ARTIFACT_DIR
+
+# Skor float32 + indeks hasil argpartition (int64) + salinan sementara per sel blok
+BYTES_PER_CELL = 16
+TARGET_COLUMNS = ['index', 'similarity', 'product_name', 'brand', 'product_type']
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet'}
+
+
+def block_rows(n_products, memory_mb=256, workers=1):
+    """Jumlah baris per blok agar semua blok yang berjalan bersamaan muat di anggaran memori"""
+    budget = memory_mb * 2**20 // max(workers, 1)
+    return int(max(1, min(n_products, budget // (max(n_products, 1) * BYTES_PER_CELL))))
+
+
+def block_top_k(scores, k):
+    """top_k per baris matriks skor: (posisi kolom, skor), tiap baris terurut menurun.
+
+    Skor -inf berarti tidak lolos filter dan selalu berada di ujung baris.
+    """
+    n_rows, n = scores.shape
+    k = min(k, n)
+    if k < n:
+        part = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+    else:
+        part = np.broadcast_to(np.arange(n), (n_rows, n))
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    # Urut per baris: skor menurun, tie -> indeks kecil dulu (sama dengan top_k)
+    rows = np.repeat(np.arange(n_rows), k)
+    order = np.lexsort((part.ravel(), -part_scores.ravel(), rows))
+    return part.ravel()[order].reshape(n_rows, k), part_scores.ravel()[order].reshape(n_rows, k)
+
+
+class BatchRecommender:
+    """Top-k tetangga untuk banyak produk sekaligus di atas RecommendationEngine + vektor produk"""
+
+    def __init__(self, engine, vectors):
+        self.engine = engine
+        # Vektor sudah ternormalisasi L2 (VectorSimilarity.vectors / catalog.bin)
+        self.vectors = vectors
+
+    def _candidate_sets(self, base_mask, same_brand_only):
+        """{kode brand atau None: (indeks kandidat, vektornya)}, dibuat sekali per run.
+
+        Perkalian matriks hanya dilakukan terhadap kandidat yang lolos filter, sehingga
+        filter tidak perlu diterapkan per sel skor.
+        """
+        cols = np.flatnonzero(base_mask)
+        if not same_brand_only:
+            matrix = self.vectors if len(cols) == len(self.vectors) else self.vectors[cols]
+            return {None: (cols, matrix)}
+        codes = self.engine.brand_codes[cols]
+        return {code: (cols[codes == code], self.vectors[cols[codes == code]])
+                for code in np.unique(codes)}
+
+    def _score_group(self, rows, cols, matrix, top_n, exclude_brand=None):
+        scores = self.vectors[rows] @ matrix.T
+        if exclude_brand is not None:
+            scores[:, self.engine.brand_codes[cols] == exclude_brand] = -np.inf
+        # Produk sumber dikeluarkan dari hasilnya sendiri
+        pos = np.minimum(np.searchsorted(cols, rows), max(len(cols) - 1, 0))
+        hit = np.flatnonzero(cols[pos] == rows) if len(cols) else pos[:0]
+        scores[hit, pos[hit]] = -np.inf
+        positions, selected = block_top_k(scores, top_n)
+        return cols[positions], selected
+
+    def _score_block(self, rows, top_n, candidate_sets, same_brand_only, different_brand_only):
+        indices = np.zeros((len(rows), top_n), dtype=np.int64)
+        scores = np.full((len(rows), top_n), -np.inf, dtype=np.float32)
+        if same_brand_only or different_brand_only:
+            row_codes = self.engine.brand_codes[rows]
+            groups = [(row_codes == code, code) for code in np.unique(row_codes)]
+        else:
+            groups = [(slice(None), None)]
+
+        for selector, code in groups:
+            if same_brand_only:
+                if code not in candidate_sets:
+                    continue
+                cols, matrix = candidate_sets[code]
+            else:
+                cols, matrix = candidate_sets[None]
+            group_indices, group_scores = self._score_group(
+                rows[selector], cols, matrix, top_n,
+                exclude_brand=code if different_brand_only else None)
+            k = group_indices.shape[1]
+            indices[selector, :k] = group_indices
+            scores[selector, :k] = group_scores
+        return self._to_frame(rows, indices, scores)
+
+    def _to_frame(self, rows, indices, scores):
+        keep = np.isfinite(scores)
+        sources = np.broadcast_to(rows[:, None], indices.shape)[keep]
+        ranks = np.broadcast_to(np.arange(1, indices.shape[1] + 1), indices.shape)[keep]
+        targets = self.engine.to_frame(indices[keep], scores[keep])[TARGET_COLUMNS]
+        frame = pd.DataFrame({
+            'source_index': sources,
+            'source_product_name': self.engine.df['product_name'].to_numpy()[sources],
+            'source_brand': self.engine.df['brand'].to_numpy()[sources],
+            'rank': ranks,
+        })
+        return pd.concat([frame, targets], axis=1)
+
+    def iter_batches(self, product_indices=None, top_n=10, filter_brand=None,
+                     filter_product_type=None, same_brand_only=False,
+                     different_brand_only=False, memory_mb=256, workers=None):
+        """Generator DataFrame per blok (format long: satu baris per pasangan sumber-rekomendasi)"""
+        n_products = len(self.vectors)
+        if product_indices is None:
+            product_indices = np.arange(n_products)
+        product_indices = np.asarray(product_indices, dtype=np.int64)
+        workers = workers or os.cpu_count() or 1
+        candidate_sets = self._candidate_sets(
+            self.engine.filter_mask(None, filter_brand, filter_product_type), same_brand_only)
+
+        size = block_rows(n_products, memory_mb, workers)
+        blocks = [product_indices[start:start + size]
+                  for start in range(0, len(product_indices), size)]
+
+        def run(rows):
+            return self._score_block(rows, top_n, candidate_sets, same_brand_only,
+                                     different_brand_only)
+
+        if workers == 1:
+            yield from map(run, blocks)
+            return
+        # Paling banyak `workers` blok dikirim ke pool sekaligus (bukan semua blok di awal
+        # seperti executor.map), jadi hasil yang menunggu ditulis tetap sebatas anggaran memori;
+        # hasil diambil berurutan sehingga urutan blok terjaga
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            try:
+                for rows in blocks:
+                    if len(pending) >= workers:
+                        yield pending.popleft().result()
+                    pending.append(pool.submit(run, rows))
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Output Parquet membutuhkan pyarrow (`pip install pyarrow`); "
+                           "pakai .csv atau .jsonl") from exc
+    return pa, pq
+
+
+def write_batches(frames, path, fmt=None):
+    """Tulis DataFrame per blok secara streaming ke CSV / JSONL / Parquet, kembalikan jumlah baris"""
+    fmt = fmt or FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS.values():
+        raise ValueError(f"Format output tidak dikenal untuk {path}; pakai .csv, .jsonl atau .parquet")
+
+    tmp_path = path + '.tmp'
+    n_rows = 0
+    try:
+        if fmt == 'parquet':
+            pa, pq = _import_pyarrow()
+            writer = None
+            for frame in frames:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                n_rows += len(frame)
+            if writer is not None:
+                writer.close()
+        else:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                for i, frame in enumerate(frames):
+                    if fmt == 'csv':
+                        frame.to_csv(f, index=False, header=(i == 0))
+                    elif len(frame):
+                        text = frame.to_json(orient='records', lines=True, force_ascii=False)
+                        # Versi pandas lama tidak menambahkan newline di akhir
+                        f.write(text if text.endswith('\n') else text + '\n')
+                    n_rows += len(frame)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return n_rows
+
+
+def resolve_products(df, lines, live=None):
+    """Baris file daftar produk -> indeks; angka dianggap indeks, selain itu nama produk.
+
+    `live`: mask produk aktif (delta katalog); produk yang dihapus dianggap tidak ada.
+    """
+    def is_live(position):
+        return position < len(df) and (live is None or live[position])
+
+    positions = {}
+    for position, name in enumerate(df['product_name'].astype(str).str.strip().str.lower()):
+        if is_live(position):
+            positions.setdefault(name, position)
+    indices, missing = [], []
+    for line in lines:
+        value = line.strip()
+        if not value:
+            continue
+        if value.isdigit() and is_live(int(value)):
+            indices.append(int(value))
+        elif value.lower() in positions:
+            indices.append(positions[value.lower()])
+        else:
+            missing.append(value)
+    return indices, missing
+
+
+def main():
+    from .service import RecommenderService
+
+    parser = argparse.ArgumentParser(description='Ekspor rekomendasi produk serupa untuk semua produk')
+    parser.add_argument('--output', required=True, help='File .csv, .jsonl atau .parquet')
+    parser.add_argument('--format', choices=sorted(set(FORMATS.values())), default=None)
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--products', default=None,
+                        help='File berisi satu indeks atau nama produk per baris (default: semua)')
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--brand', default=None)
+    parser.add_argument('--product-type', default=None)
+    brand_group = parser.add_mutually_exclusive_group()
+    brand_group.add_argument('--same-brand', action='store_true')
+    brand_group.add_argument('--different-brand', action='store_true')
+    parser.add_argument('--memory-mb', type=int, default=256, help='Anggaran memori blok skor')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    if (args.format or FORMATS.get(os.path.splitext(args.output)[1].lower())) == 'parquet':
+        # Dicek sebelum artefak dimuat dan skor dihitung
+        try:
+            _import_pyarrow()
+        except RuntimeError as exc:
+            parser.error(str(exc))
+
+    # Lewat service agar catalog_delta.pkl ikut terpakai: produk yang dihapus (tombstone)
+    # tidak direkomendasikan, produk baru / yang diperbarui ikut dihitung
+    service = RecommenderService(args.artifact_dir)
+    engine = service.engine
+    df = engine.df
+    batch = BatchRecommender(engine, service.similarity.vectors)
+
+    product_indices = None if engine.live is None else np.flatnonzero(engine.live)
+    if args.products:
+        with open(args.products, encoding='utf-8') as f:
+            product_indices, missing = resolve_products(df, f, engine.live)
+        for value in missing:
+            print(f"Produk tidak ditemukan, dilewati: {value}", file=sys.stderr)
+
+    start = time.perf_counter()
+    frames = batch.iter_batches(
+        product_indices, args.top_n, filter_brand=args.brand,
+        filter_product_type=args.product_type, same_brand_only=args.same_brand,
+        different_brand_only=args.different_brand, memory_mb=args.memory_mb,
+        workers=args.workers)
+    n_rows = write_batches(frames, args.output, args.format)
+    n_sources = len(df) if product_indices is None else len(product_indices)
+    print(f"{n_rows} rekomendasi untuk {n_sources} produk ditulis ke {args.output} "
+          f"({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
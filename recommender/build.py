@@ -0,0 +1,274 @@
+"""Pipeline build artefak: workbook per brand (*.xlsx) -> deployment_files/.
+
+Setiap workbook dibaca dan dibersihkan (kolom *_clean, text, normalized_text,
+clean_text dengan stemming Sastrawi) di process pool. Hasil per brand disimpan di
+cache bersama hash file sumbernya, sehingga build berikutnya hanya memproses ulang
+dan meng-embed ulang brand yang workbook-nya berubah.
+
+    python -m recommender.build                # incremental
+    python -m recommender.build --refit        # fit ulang vectorizer + PCA, embed ulang semua
+    python -m recommender.build --workers 4 --source-dir . --artifact-dir deployment_files
+    python -m recommender.build --check-parity # pembersihan == kolom CSV yang dikirim
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .ann import ANN_FILE, IVFIndex
+from .catalog import (CATALOG_FILE, DELTA_FILE, MANIFEST_FILE, SOURCE_FILE, load_manifest,
+                      source_stamp, write_catalog)
+from .classifier import fill_product_types
+from .hybrid import FIELD_VECTORS_FILE, HybridRanker
+from .quantize import QUANTIZED_FILE, load_codes, quantize, save_codes
+from .similarity import (NEIGHBORS_FILE, VECTORS_FILE, build_neighbor_table, l2_normalize,
+                         load_pickle, project_texts)
+from .text import add_clean_columns, check_parity
+
+SOURCE_COLUMNS = ['product_name', 'product_type', 'active_ingredients', 'skin_type', 'benefits']
+OUTPUT_COLUMNS = SOURCE_COLUMNS + ['brand', 'product_name_clean', 'active_ingredients_clean',
+                                   'benefits_clean', 'text', 'normalized_text', 'clean_text']
+CACHE_DIR = 'build_cache'
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def discover_workbooks(source_dir):
+    """{brand: path}, nama brand diambil dari nama file (wardah.xlsx -> wardah)"""
+    paths = sorted(glob.glob(os.path.join(source_dir, '*.xlsx')))
+    return {os.path.splitext(os.path.basename(p))[0].lower(): p for p in paths
+            if not os.path.basename(p).startswith('~$')}
+
+
+def read_workbook(path):
+    df = pd.read_excel(path)
+    df = df[[c for c in SOURCE_COLUMNS if c in df.columns]].reindex(columns=SOURCE_COLUMNS)
+    df = df.dropna(subset=['product_name'])
+    # Nama tidak di-strip: harus sama persis dengan skincare_products.csv dari notebook
+    df['product_name'] = df['product_name'].astype(str)
+    df['brand'] = os.path.splitext(os.path.basename(path))[0].lower()
+    return df.reset_index(drop=True)
+
+
+def brand_order(artifact_dir, brands):
+    """Urutan brand di katalog: urutan kemunculan di skincare_products.csv yang sudah ada
+    (urutan concat notebook, bukan alfabetis), brand baru ditambahkan di akhir"""
+    path = os.path.join(artifact_dir, SOURCE_FILE)
+    existing = []
+    if os.path.exists(path):
+        existing = pd.read_csv(path, usecols=['brand'])['brand'].drop_duplicates().tolist()
+    return ([brand for brand in existing if brand in brands]
+            + sorted(brand for brand in brands if brand not in existing))
+
+
+def process_brand(path):
+    """Dijalankan di worker process: baca satu workbook lalu bersihkan"""
+    df = add_clean_columns(read_workbook(path))
+    return df[OUTPUT_COLUMNS]
+
+
+def _atomic_write(path, write):
+    """Tulis ke file sementara di folder yang sama lalu os.replace (tidak ada file setengah jadi)"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_pickle(path, obj):
+    _atomic_write(path, lambda f: pickle.dump(obj, f))
+
+
+def write_npy(path, array):
+    _atomic_write(path, lambda f: np.save(f, array))
+
+
+def write_json(path, data):
+    _atomic_write(path, lambda f: f.write(json.dumps(data, indent=2).encode('utf-8')))
+
+
+def write_csv(path, df):
+    _atomic_write(path, lambda f: f.write(df.to_csv(index=False).encode('utf-8')))
+
+
+def write_artifacts(artifact_dir, catalog, vectors):
+    """Tulis katalog + vektor, lalu bangun ulang tabel tetangga / indeks IVF / kode yang sudah ada"""
+    csv_path = os.path.join(artifact_dir, SOURCE_FILE)
+    write_csv(csv_path, catalog)
+    write_npy(os.path.join(artifact_dir, VECTORS_FILE), vectors)
+    write_catalog(os.path.join(artifact_dir, CATALOG_FILE), catalog, vectors,
+                  source=source_stamp(csv_path))
+    normalized = l2_normalize(vectors)
+    neighbors_path = os.path.join(artifact_dir, NEIGHBORS_FILE)
+    if os.path.exists(neighbors_path):
+        from scipy import sparse
+        table = build_neighbor_table(normalized)
+        _atomic_write(neighbors_path, lambda f: sparse.save_npz(f, table))
+    ann_path = os.path.join(artifact_dir, ANN_FILE)
+    if os.path.exists(ann_path):
+        old_nprobe = int(np.load(ann_path)['nprobe'])
+        index = IVFIndex.build(normalized, nprobe=old_nprobe)
+        _atomic_write(ann_path, lambda f: index.save(f))
+    quantized_path = os.path.join(artifact_dir, QUANTIZED_FILE)
+    if os.path.exists(quantized_path):
+        old, rerank = load_codes(quantized_path)
+        codes = quantize(normalized, old.mode, getattr(old, 'subspaces', 16))
+        _atomic_write(quantized_path, lambda f: save_codes(f, codes, rerank))
+    field_path = os.path.join(artifact_dir, FIELD_VECTORS_FILE)
+    if os.path.exists(field_path):
+        ranker = HybridRanker.build(catalog)
+        _atomic_write(field_path, ranker.save)
+
+
+def artifact_hashes(artifact_dir):
+    """(hash per artefak, versi gabungan) untuk manifest"""
+    artifacts = {name: file_hash(os.path.join(artifact_dir, name))
+                 for name in ['skincare_products.csv', VECTORS_FILE, CATALOG_FILE,
+                              'vectorizer.pkl', 'pca_model.pkl']}
+    version = hashlib.sha256(''.join(sorted(artifacts.values())).encode()).hexdigest()[:12]
+    return artifacts, version
+
+
+def fit_models(texts, max_features=5000, n_components=128):
+    """Vectorizer TF-IDF + reduksi dimensi. TruncatedSVD di-fit langsung pada matriks
+    sparse (PCA sklearn butuh matriks dense: produk x 5000 float64 tidak muat untuk
+    katalog besar); project_texts menangani model tanpa `mean_`."""
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(max_features=max_features, lowercase=False)
+    tfidf = vectorizer.fit_transform(texts)
+    n_components = max(1, min(n_components, tfidf.shape[0], tfidf.shape[1] - 1))
+    pca = TruncatedSVD(n_components=n_components, random_state=42)
+    pca.fit(tfidf)
+    return vectorizer, pca
+
+
+def build(source_dir='.', artifact_dir='deployment_files', refit=False, workers=None,
+          force=False, log=print):
+    os.makedirs(os.path.join(artifact_dir, CACHE_DIR), exist_ok=True)
+    manifest = load_manifest(artifact_dir)
+    previous = manifest.get('sources', {})
+    workbooks = discover_workbooks(source_dir)
+    if not workbooks:
+        raise FileNotFoundError(f"Tidak ada file .xlsx di {source_dir}")
+
+    def cache_path(brand, ext):
+        return os.path.join(artifact_dir, CACHE_DIR, f'{brand}.{ext}')
+
+    hashes = {brand: file_hash(path) for brand, path in workbooks.items()}
+    changed = [brand for brand in workbooks
+               if force or previous.get(brand, {}).get('sha256') != hashes[brand]
+               or not os.path.exists(cache_path(brand, 'pkl'))]
+
+    # 1. Baca + bersihkan workbook yang berubah, paralel per brand
+    start = time.perf_counter()
+    frames = {}
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for brand, df in zip(changed, pool.map(process_brand, [workbooks[b] for b in changed])):
+                frames[brand] = df
+                write_pickle(cache_path(brand, 'pkl'), df)
+    for brand in workbooks:
+        if brand not in frames:
+            frames[brand] = pd.read_pickle(cache_path(brand, 'pkl'))
+    log(f"Preprocessing: {len(changed)}/{len(workbooks)} brand diproses ulang "
+        f"({time.perf_counter() - start:.1f}s)")
+
+    # Urutan baris = urutan brand yang sudah dikirim + urutan baris workbook, sehingga indeks
+    # produk (dan vektor yang sejajar dengannya) tidak bergeser saat build ulang
+    order = brand_order(artifact_dir, list(frames))
+    catalog = pd.concat([frames[brand] for brand in order], ignore_index=True)
+    catalog = fill_product_types(catalog, log=log)
+
+    # 2. Vectorizer + PCA: dipakai ulang kecuali --refit (atau belum ada)
+    vectorizer_path = os.path.join(artifact_dir, 'vectorizer.pkl')
+    pca_path = os.path.join(artifact_dir, 'pca_model.pkl')
+    if refit or not (os.path.exists(vectorizer_path) and os.path.exists(pca_path)):
+        vectorizer, pca = fit_models(catalog['clean_text'])
+        write_pickle(vectorizer_path, vectorizer)
+        write_pickle(pca_path, pca)
+        log(f"Vectorizer + PCA di-fit ulang pada {len(catalog)} produk")
+    else:
+        vectorizer, pca = load_pickle(vectorizer_path), load_pickle(pca_path)
+    model_version = (file_hash(vectorizer_path) + file_hash(pca_path))[:16]
+
+    # 3. Embedding per brand; model berubah -> semua brand di-embed ulang
+    re_embed = [brand for brand in order
+                if brand in changed or manifest.get('model_version') != model_version
+                or not os.path.exists(cache_path(brand, 'npy'))]
+    blocks = []
+    for brand in order:
+        if brand in re_embed:
+            vectors = project_texts(vectorizer, pca, frames[brand]['clean_text'])
+            write_npy(cache_path(brand, 'npy'), vectors)
+        else:
+            vectors = np.load(cache_path(brand, 'npy'))
+        blocks.append(vectors)
+    vectors = np.vstack(blocks).astype(np.float32)
+    log(f"Embedding: {len(re_embed)}/{len(frames)} brand di-embed ulang")
+
+    # 4. Artefak katalog + struktur tetangga yang sudah ada dibangun ulang agar tidak basi
+    write_artifacts(artifact_dir, catalog, vectors)
+    artifacts, version = artifact_hashes(artifact_dir)
+    manifest = {
+        'version': version,
+        'built_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'model_version': model_version,
+        'n_products': len(catalog),
+        'sources': {brand: {'file': os.path.basename(workbooks[brand]), 'sha256': hashes[brand],
+                            'rows': len(frames[brand])} for brand in sorted(workbooks)},
+        'artifacts': artifacts,
+    }
+    write_json(os.path.join(artifact_dir, MANIFEST_FILE), manifest)
+    # Katalog dibangun ulang dari workbook; update incremental sebelumnya tidak berlaku lagi
+    delta_path = os.path.join(artifact_dir, DELTA_FILE)
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+        log(f"{DELTA_FILE} dihapus (update incremental tidak ada di workbook, tambahkan ke .xlsx)")
+    log(f"Versi artefak {version}: {len(catalog)} produk dari {len(workbooks)} brand")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bangun artefak deployment_files dari workbook brand')
+    parser.add_argument('--source-dir', default='.')
+    parser.add_argument('--artifact-dir', default='deployment_files')
+    parser.add_argument('--refit', action='store_true', help='Fit ulang vectorizer dan PCA')
+    parser.add_argument('--force', action='store_true', help='Proses ulang semua brand')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--check-parity', action='store_true',
+                        help='Hanya bandingkan pembersihan teks dengan skincare_products.csv')
+    args = parser.parse_args()
+    if args.check_parity:
+        path = os.path.join(args.artifact_dir, 'skincare_products.csv')
+        parity = check_parity(pd.read_csv(path))
+        for column, share in parity.items():
+            print(f"{column:<26} {share:7.2%}")
+        raise SystemExit(0 if all(share == 1.0 for share in parity.values()) else 1)
+    build(args.source_dir, args.artifact_dir, refit=args.refit, workers=args.workers,
+          force=args.force)
+
+
+if __name__ == '__main__':
+    main()
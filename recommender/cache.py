@@ -0,0 +1,114 @@
+"""Cache hasil rekomendasi / pencarian yang dibagi antar sesi Streamlit.
+
+Kunci cache selalu menyertakan versi artefak (lihat `artifact_version`), sehingga
+setelah `deployment_files/` dibangun ulang entri lama tidak pernah terpakai lagi dan
+dibuang saat versi berganti. Entri dibatasi jumlahnya (LRU) dan umurnya (TTL).
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .catalog import CATALOG_FILE, DELTA_FILE, load_manifest
+from .metrics import count
+from .similarity import ARTIFACT_DIR
+
+
+def artifact_version(artifact_dir=ARTIFACT_DIR):
+    """Versi artefak: versi manifest.json + sidik (ukuran, mtime) file di artifact_dir.
+
+    Sidik file ikut dihitung agar artefak yang ditulis di luar pipeline build
+    (mis. `python -m recommender.similarity`) juga mengganti versi. Cukup beberapa
+    os.stat, aman dipanggil di setiap rerun. File delta (update incremental) dan
+    file tersembunyi/sementara tidak dihitung: delta diterapkan tanpa memuat ulang
+    artefak dasar (lihat `RecommenderService.refresh`). catalog.bin juga tidak: isinya
+    turunan skincare_products.csv (dicek lewat sidik sumbernya) dan dibuat saat load pertama.
+    """
+    try:
+        entries = sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns)
+                         for e in os.scandir(artifact_dir)
+                         if e.is_file() and e.name not in (DELTA_FILE, CATALOG_FILE)
+                         and not e.name.startswith('.'))
+    except FileNotFoundError:
+        return 'missing'
+    stamp = hashlib.sha256(repr(entries).encode()).hexdigest()[:8]
+    return f"{load_manifest(artifact_dir).get('version', 'local')}-{stamp}"
+
+
+class ResultCache:
+    """LRU + TTL thread-safe; nilai yang disimpan dibagi antar pemanggil, jangan diubah"""
+
+    def __init__(self, max_items=1024, ttl=3600):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _set_version(self, version):
+        # Dipanggil dengan lock; artefak berganti -> semua entri lama dibuang
+        if version != self._version:
+            self.evictions += len(self._entries)
+            self._entries.clear()
+            self._version = version
+
+    def _lookup(self, version, key):
+        """(ada, nilai) untuk (version, key); entri kedaluwarsa dianggap tidak ada"""
+        now = time.monotonic()
+        with self._lock:
+            self._set_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or now - entry[0] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+        return False, None
+
+    def get(self, version, key, default=None):
+        found, value = self._lookup(version, key)
+        return value if found else default
+
+    def put(self, version, key, value):
+        """Simpan nilai; diabaikan jika versi cache sudah berganti sejak lookup"""
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = (time.monotonic(), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_items:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+    def get_or_compute(self, version, key, compute):
+        """Nilai untuk (version, key); `compute()` dipanggil hanya saat miss"""
+        found, value = self._lookup(version, key)
+        count('cache_requests_total', result='hit' if found else 'miss')
+        if found:
+            return value
+        # Dihitung di luar lock; dua sesi yang miss bersamaan cukup menghitung dua kali
+        value = compute()
+        self.put(version, key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'version': self._version,
+            'entries': len(self._entries),
+            'max_items': self.max_items,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,323 @@
+"""Format katalog biner kolumnar yang bisa di-memory-map (catalog.bin).
+
+Layout file:
+    8 byte   magic b'SKCAT001'
+    8 byte   panjang header (uint64, little endian)
+    header   JSON: jumlah produk, daftar section (offset, dtype, shape) + kategori, dan
+             sidik CSV sumber (ukuran, mtime, sha256) untuk mendeteksi katalog basi
+    section  masing-masing rata 64 byte:
+             - kolom kategorikal (brand, product_type, skin_type): kode int32, -1 = kosong
+             - kolom teks: offset int64 (n+1) + blob UTF-8 + mask null uint8
+             - vectors: blok float32 (n x d), sudah dinormalisasi L2
+
+Saat load, file cukup di-mmap lalu setiap section menjadi view NumPy; tidak ada
+parsing CSV, dan beberapa worker Streamlit berbagi page cache yang sama. Kolom teks
+DataFrame runtime dibungkus sebagai array string Arrow di atas offset + blob yang
+di-mmap (tanpa salinan, jika pyarrow terpasang); tanpa pyarrow teks didekode menjadi
+string Python dengan nilai kembar dipakai bersama. Kolom kategorikal tetap berupa
+kode int32 + daftar kategori.
+
+Import dari CSV yang ada:
+    python -m recommender.catalog deployment_files/skincare_products.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .similarity import ARTIFACT_DIR, VECTORS_FILE, l2_normalize, load_pickle, project_texts
+
+MAGIC = b'SKCAT001'
+ALIGNMENT = 64
+CATALOG_FILE = 'catalog.bin'
+SOURCE_FILE = 'skincare_products.csv'
+# Produk tambahan + tombstone sejak build/compaction terakhir (lihat updates.py)
+DELTA_FILE = 'catalog_delta.pkl'
+# Versi artefak + hash workbook sumber, ditulis recommender.build
+MANIFEST_FILE = 'manifest.json'
+CATEGORICAL_COLUMNS = ['brand', 'product_type', 'skin_type']
+# Kolom teks yang dipakai UI / indeks; text, normalized_text dan clean_text tidak disimpan
+TEXT_COLUMNS = ['product_name', 'active_ingredients', 'benefits',
+                'active_ingredients_clean', 'benefits_clean']
+# Kolom turunan yang hanya dibutuhkan saat build (fallback CSV tidak menyimpannya di memori)
+BUILD_ONLY_COLUMNS = ['product_name_clean', 'text', 'normalized_text']
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def source_stamp(csv_path):
+    """Sidik CSV sumber: {'size', 'mtime_ns', 'sha256'}, None jika file tidak ada"""
+    if not os.path.exists(csv_path):
+        return None
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+
+
+def load_manifest(artifact_dir):
+    """Isi manifest.json, {} jika belum ada (artefak dari notebook)"""
+    path = os.path.join(artifact_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_catalog(path, df, vectors=None, source=None):
+    """Tulis DataFrame produk (+ vektor opsional) ke file catalog.bin.
+
+    `source`: sidik CSV asal (source_stamp), dipakai load_frame untuk menolak katalog basi.
+    """
+    sections = {}
+    header = {'n_products': len(df), 'sections': {}, 'categories': {}, 'columns': [],
+              'source': source}
+
+    for column in CATEGORICAL_COLUMNS:
+        if column not in df.columns:
+            continue
+        codes, uniques = pd.factorize(df[column])
+        sections[f'{column}.codes'] = codes.astype(np.int32)
+        header['categories'][column] = [str(v) for v in uniques]
+        header['columns'].append(column)
+
+    for column in TEXT_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        nulls = values.isna().to_numpy()
+        encoded = [b'' if null else str(v).encode('utf-8') for v, null in zip(values, nulls)]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        sections[f'{column}.offsets'] = offsets
+        sections[f'{column}.blob'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        sections[f'{column}.nulls'] = nulls.astype(np.uint8)
+        header['columns'].append(column)
+
+    if vectors is not None:
+        sections['vectors'] = l2_normalize(vectors)
+
+    # Offset section dihitung relatif terhadap awal area data (setelah header)
+    offset = 0
+    for name, array in sections.items():
+        offset = _align(offset)
+        header['sections'][name] = {'offset': offset, 'dtype': array.dtype.str,
+                                    'shape': list(array.shape)}
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+    # Nama sementara unik dan tersembunyi: beberapa worker boleh menulis bersamaan, dan
+    # artifact_version tidak melihat file setengah jadi
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(header_bytes)))
+            f.write(header_bytes)
+            for name, array in sections.items():
+                f.seek(data_start + header['sections'][name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Catalog:
+    """View read-only atas catalog.bin yang di-mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        self._mmap = np.memmap(path, dtype=np.uint8, mode='r')
+        if bytes(self._mmap[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} bukan file katalog ({MAGIC!r})")
+        header_len = struct.unpack('<Q', bytes(self._mmap[len(MAGIC):len(MAGIC) + 8]))[0]
+        header_end = len(MAGIC) + 8 + header_len
+        self.header = json.loads(bytes(self._mmap[len(MAGIC) + 8:header_end]))
+        self._data_start = _align(header_end)
+        self.n_products = self.header['n_products']
+        self.columns = self.header['columns']
+
+    def __len__(self):
+        return self.n_products
+
+    def section(self, name):
+        spec = self.header['sections'].get(name)
+        if spec is None:
+            return None
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape']))
+        start = self._data_start + spec['offset']
+        array = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=start)
+        return array.reshape(spec['shape'])
+
+    @property
+    def vectors(self):
+        return self.section('vectors')
+
+    def matches_source(self, csv_path):
+        """True jika katalog dibuat dari isi `csv_path` saat ini (atau CSV tidak ada).
+
+        Ukuran + mtime sama cukup satu os.stat; jika berbeda (mis. setelah git checkout)
+        isi file di-hash. Katalog lama tanpa sidik dianggap basi jika CSV lebih baru.
+        """
+        if not os.path.exists(csv_path):
+            return True
+        stat = os.stat(csv_path)
+        source = self.header.get('source')
+        if not source:
+            return stat.st_mtime_ns <= os.stat(self.path).st_mtime_ns
+        if source['size'] == stat.st_size and source['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        if source['size'] != stat.st_size:
+            return False
+        return source_stamp(csv_path)['sha256'] == source['sha256']
+
+    def codes(self, column):
+        return self.section(f'{column}.codes')
+
+    def categories(self, column):
+        return self.header['categories'][column]
+
+    def text(self, column, row):
+        offsets = self.section(f'{column}.offsets')
+        if self.section(f'{column}.nulls')[row]:
+            return None
+        blob = self.section(f'{column}.blob')
+        return bytes(blob[offsets[row]:offsets[row + 1]]).decode('utf-8')
+
+    def texts(self, column, rows=None):
+        """Dekode teks satu kolom (semua baris atau `rows` tertentu) menjadi array object.
+
+        Teks yang sama persis (mis. manfaat yang berulang) memakai satu objek str.
+        """
+        offsets = self.section(f'{column}.offsets')
+        nulls = self.section(f'{column}.nulls')
+        data = bytes(self.section(f'{column}.blob'))
+        rows = range(self.n_products) if rows is None else rows
+        values, interned = [], {}
+        for r in rows:
+            if nulls[r]:
+                values.append(None)
+                continue
+            text = data[offsets[r]:offsets[r + 1]].decode('utf-8')
+            values.append(interned.setdefault(text, text))
+        return np.array(values, dtype=object)
+
+    def arrow_texts(self, column):
+        """Kolom teks sebagai ArrowStringArray yang menunjuk langsung ke mmap (tanpa salinan)"""
+        import pyarrow as pa
+
+        nulls = self.section(f'{column}.nulls')
+        null_count = int(np.count_nonzero(nulls))
+        validity = (pa.py_buffer(np.packbits(nulls == 0, bitorder='little'))
+                    if null_count else None)
+        array = pa.LargeStringArray.from_buffers(
+            self.n_products, pa.py_buffer(self.section(f'{column}.offsets')),
+            pa.py_buffer(self.section(f'{column}.blob')), validity, null_count)
+        strings = pd.arrays.ArrowStringArray(pa.chunked_array([array], type=pa.large_string()))
+        # NaN (bukan pd.NA) untuk nilai kosong, sama seperti kolom hasil read_csv
+        return strings.astype(_string_dtype(), copy=False)
+
+    def to_frame(self, columns=None, strings=None):
+        """DataFrame untuk app.py; kolom kategorikal dibangun dari kode tanpa parsing.
+
+        `strings`: 'arrow' (view mmap), 'object' (string Python) atau None = arrow jika
+        pyarrow tersedia.
+        """
+        if strings is None:
+            strings = 'arrow' if _has_pyarrow() else 'object'
+        data = {}
+        for column in columns or self.columns:
+            if column in self.header['categories']:
+                data[column] = pd.Categorical.from_codes(
+                    self.codes(column), categories=self.categories(column))
+            elif strings == 'arrow':
+                data[column] = self.arrow_texts(column)
+            else:
+                data[column] = self.texts(column)
+        # copy=False: DataFrame memakai array di atas tanpa menyalinnya
+        return pd.DataFrame(data, copy=False)
+
+
+def _string_dtype():
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)  # pandas >= 2.3
+    except TypeError:
+        return pd.StringDtype('pyarrow_numpy')             # pandas 2.1 - 2.2
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def compact_frame(df, keep=()):
+    """DataFrame produk ramping: tanpa kolom khusus build, kolom kategorikal sebagai kode.
+
+    `keep` berisi kolom build yang tetap dibutuhkan (mis. clean_text jika vektor produk
+    harus dihitung ulang).
+    """
+    df = df.drop(columns=[c for c in BUILD_ONLY_COLUMNS + ['clean_text']
+                          if c in df.columns and c not in keep])
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    return df
+
+
+def frame_footprint(df, vectors=None):
+    """Byte per produk DataFrame (deep, termasuk isi string) + vektor, per kolom dan total"""
+    n_products = max(len(df), 1)
+    usage = df.memory_usage(deep=True, index=False)
+    columns = {column: int(nbytes) / n_products for column, nbytes in usage.items()}
+    if vectors is not None:
+        columns['vectors'] = vectors.nbytes / n_products
+    return {'columns': columns, 'bytes_per_product': sum(columns.values())}
+
+
+def load_catalog(path):
+    return Catalog(path)
+
+
+def import_csv(csv_path, path, artifact_dir=ARTIFACT_DIR):
+    """Konversi skincare_products.csv ke catalog.bin, termasuk vektor produk"""
+    df = pd.read_csv(csv_path)
+    vectors_path = os.path.join(artifact_dir, VECTORS_FILE)
+    vectors = np.load(vectors_path) if os.path.exists(vectors_path) else None
+    if vectors is None or len(vectors) != len(df):
+        vectorizer = load_pickle(os.path.join(artifact_dir, 'vectorizer.pkl'))
+        pca = load_pickle(os.path.join(artifact_dir, 'pca_model.pkl'))
+        vectors = project_texts(vectorizer, pca, df['clean_text'].fillna('').astype(str))
+    write_catalog(path, df, vectors, source=source_stamp(csv_path))
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import skincare_products.csv ke catalog.bin')
+    parser.add_argument('csv', nargs='?', default=os.path.join(ARTIFACT_DIR, 'skincare_products.csv'))
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+    output = args.output or os.path.join(args.artifact_dir, CATALOG_FILE)
+    n_products = import_csv(args.csv, output, args.artifact_dir)
+    size = os.path.getsize(output)
+    print(f"{n_products} produk ditulis ke {output} ({size / 1024:.0f} KB)")
+
+
+if __name__ == '__main__':
+    main()
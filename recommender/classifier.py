@@ -0,0 +1,255 @@
+"""Klasifikasi teks produk dengan inferensi ber-micro-batch.
+
+Dua classifier tersedia:
+    product_type  nama produk -> jenis produk; TF-IDF n-gram karakter + Complement NB
+                  yang di-fit dari katalog saat pertama dipakai (tidak ada model
+                  product_type di deployment_files/)
+    brand         teks produk -> brand; model yang dikirim (skincare_model.pkl +
+                  label_encoder.pkl) di atas fitur vectorizer + PCA
+
+`MicroBatcher` mengumpulkan request yang datang bersamaan menjadi satu batch (maks.
+`max_batch` teks, atau sampai `max_latency` detik sejak request pertama menunggu),
+lalu menjalankan ekstraksi fitur + model sekali untuk seluruh batch. Prediksi
+di-cache per hash teks. Model pohon / linear jauh lebih murah per teks dalam batch
+besar daripada dipanggil satu per satu (lihat benchmarks/bench_classifier.py).
+
+    batcher = service.classifier('product_type')
+    batcher.predict(['Wardah Acnederm Pure Foaming Cleanser'])[0]['label']
+"""
+import hashlib
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from .metrics import METRICS, count
+from .similarity import project_texts
+from .text import clean_column, clean_query
+
+TARGETS = ('product_type', 'brand')
+
+
+def text_key(text):
+    """Kunci cache prediksi: hash teks (spasi di tepi diabaikan)"""
+    return hashlib.blake2b(str(text).strip().encode('utf-8'), digest_size=16).hexdigest()
+
+
+def canonical_labels(values):
+    """Label kanonik: 'Eye cream' / 'Eye Cream' / 'eye cream ' -> ejaan yang paling sering"""
+    spellings = {}
+    for value in values:
+        if isinstance(value, str) and value.strip():
+            value = value.strip()
+            counts = spellings.setdefault(value.lower(), {})
+            counts[value] = counts.get(value, 0) + 1
+    return {key: max(counts, key=counts.get) for key, counts in spellings.items()}
+
+
+class TextClassifier:
+    """Teks -> label: `featurize(texts)` lalu `model.predict_proba`, sekali per batch"""
+
+    def __init__(self, featurize, model, classes, name):
+        self.featurize = featurize
+        self.model = model
+        self.classes = [str(c) for c in classes]
+        self.name = name
+
+    @classmethod
+    def for_product_type(cls, df):
+        """Fit dari nama produk katalog (baris tanpa product_type dilewati)"""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import ComplementNB
+
+        canonical = canonical_labels(df['product_type'])
+        names, labels = [], []
+        for name, label in zip(df['product_name'], df['product_type']):
+            if isinstance(name, str) and isinstance(label, str) and label.strip():
+                names.append(clean_column(name, keep='%+'))
+                labels.append(canonical[label.strip().lower()])
+        if len(set(labels)) < 2:
+            raise ValueError("Katalog butuh minimal dua product_type untuk melatih classifier")
+        vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=(3, 5), sublinear_tf=True)
+        model = ComplementNB(alpha=0.3).fit(vectorizer.fit_transform(names), labels)
+        return cls(lambda texts: vectorizer.transform([clean_column(t, keep='%+') for t in texts]),
+                   model, model.classes_, 'product_type')
+
+    @classmethod
+    def for_brand(cls, classifier, label_encoder, vectorizer, pca):
+        """Model brand yang dikirim; fiturnya vektor PCA (tanpa normalisasi) dari clean_text"""
+        def featurize(texts):
+            return project_texts(vectorizer, pca, [clean_query(t) for t in texts])
+
+        classes = label_encoder.inverse_transform(np.asarray(classifier.classes_, dtype=int))
+        return cls(featurize, classifier, classes, 'brand')
+
+    def predict_proba(self, texts):
+        features = self.featurize(texts)
+        if hasattr(self.model, 'predict_proba'):
+            return np.asarray(self.model.predict_proba(features))
+        return np.asarray(self.model.predict(features, verbose=0))
+
+    def predict_batch(self, texts, alternatives=3):
+        """Satu dict per teks: label, confidence, dan beberapa label alternatif"""
+        probabilities = self.predict_proba(texts)
+        order = np.argsort(-probabilities, axis=1)[:, :alternatives]
+        return [{'label': self.classes[row[0]], 'confidence': float(p[row[0]]),
+                 'alternatives': [{'label': self.classes[i], 'confidence': float(p[i])}
+                                  for i in row[1:]]}
+                for row, p in zip(order, probabilities)]
+
+
+def fill_product_types(df, reference=None, log=print):
+    """Isi product_type yang kosong dengan prediksi dari nama produk.
+
+    Model di-fit dari `reference` (default: baris `df` yang product_type-nya terisi).
+    Tanpa ini, produk baru tanpa product_type tidak pernah lolos filter jenis produk.
+    """
+    missing = df['product_type'].isna() | (df['product_type'].astype(str).str.strip() == '')
+    if not missing.any():
+        return df
+    reference = df[~missing] if reference is None else reference
+    try:
+        classifier = TextClassifier.for_product_type(reference)
+    except ValueError as e:
+        log(f"product_type kosong tidak diprediksi: {e}")
+        return df
+    df = df.copy()
+    predictions = classifier.predict_batch(df.loc[missing, 'product_name'].tolist())
+    df.loc[missing, 'product_type'] = [p['label'] for p in predictions]
+    log(f"product_type diprediksi untuk {int(missing.sum())} produk tanpa jenis produk")
+    return df
+
+
+class MicroBatcher:
+    """Antrian request -> batch (maks. `max_batch`, tunggu maks. `max_latency` detik)"""
+
+    def __init__(self, predict_batch, max_batch=64, max_latency=0.005, cache=None,
+                 version=lambda: None, name='classifier', history=4096):
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.cache = cache
+        self.version = version
+        self.name = name
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._latencies = deque(maxlen=history)
+        self._batch_sizes = deque(maxlen=history)
+        self._started = time.monotonic()
+        self.requests = 0
+        self.cache_hits = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, daemon=True,
+                                                    name=f'{self.name}-batcher')
+                    self._thread.start()
+
+    def submit(self, text):
+        """Future berisi prediksi untuk `text` (langsung selesai jika ada di cache)"""
+        future = Future()
+        key = text_key(text)
+        version = self.version()
+        with self._lock:
+            self.requests += 1
+        if self.cache is not None:
+            hit = self.cache.get(version, key)
+            if hit is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                count('classifier_requests_total', model=self.name, result='cache')
+                future.set_result(hit)
+                return future
+        self._ensure_worker()
+        self._queue.put((key, str(text), version, future, time.monotonic()))
+        return future
+
+    def predict(self, texts, timeout=None):
+        futures = [self.submit(text) for text in texts]
+        return [future.result(timeout) for future in futures]
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first[4] + self.max_latency
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Setelah deadline, request yang sudah antre tetap ikut tanpa menunggu lagi
+                    item = (self._queue.get(timeout=remaining) if remaining > 0
+                            else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        # Teks yang sama dalam satu batch cukup diprediksi sekali
+        unique = {}
+        for key, text, _, _, _ in batch:
+            unique.setdefault(key, text)
+        keys = list(unique)
+        start = time.perf_counter()
+        try:
+            predictions = dict(zip(keys, self.predict_batch([unique[k] for k in keys])))
+        except Exception as e:
+            for item in batch:
+                item[3].set_exception(e)
+            return
+        seconds = time.perf_counter() - start
+        METRICS.observe('classifier_batch_seconds', seconds, model=self.name)
+        count('classifier_requests_total', len(batch), model=self.name, result='model')
+
+        now = time.monotonic()
+        with self._lock:
+            self.batches += 1
+            self.busy_seconds += seconds
+            self._batch_sizes.append(len(batch))
+            for item in batch:
+                self._latencies.append(now - item[4])
+        for key, _, version, future, _ in batch:
+            if self.cache is not None:
+                self.cache.put(version, key, predictions[key])
+            future.set_result(predictions[key])
+
+    def stats(self):
+        """Jumlah request / batch, ukuran batch rata-rata, latensi p50/p95/p99, throughput"""
+        with self._lock:
+            latencies = np.asarray(self._latencies) * 1e3
+            sizes = np.asarray(self._batch_sizes)
+            elapsed = time.monotonic() - self._started
+            stats = {
+                'requests': self.requests,
+                'cache_hits': self.cache_hits,
+                'batches': self.batches,
+                'mean_batch_size': float(sizes.mean()) if len(sizes) else 0.0,
+                'max_batch': self.max_batch,
+                'max_latency_ms': self.max_latency * 1e3,
+                'busy_seconds': round(self.busy_seconds, 4),
+                'requests_per_second': self.requests / elapsed if elapsed > 0 else 0.0,
+            }
+        for q in (50, 95, 99):
+            stats[f'p{q}_ms'] = float(np.percentile(latencies, q)) if len(latencies) else None
+        return stats
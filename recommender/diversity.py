@@ -0,0 +1,63 @@
+"""Re-ranking keragaman (Maximal Marginal Relevance) untuk daftar rekomendasi.
+
+Dari pool kandidat teratas (mis. 200 hasil dengan filter yang sama), produk dipilih
+satu per satu dengan skor
+
+    MMR = λ · relevansi - (1 - λ) · max cosine(kandidat, produk yang sudah terpilih)
+
+sehingga varian ukuran dari produk yang sama atau satu lini serum dari brand yang sama
+tidak memenuhi Top-N. λ = 1 sama dengan urutan relevansi biasa; makin kecil, makin beragam.
+
+Kemiripan antar kandidat dihitung sekali sebagai satu matriks (pool x pool) dari vektor
+produk; setiap langkah greedy hanya memperbarui max cosine dengan satu baris matriks itu.
+"""
+import numpy as np
+
+from .similarity import l2_normalize
+
+DEFAULT_POOL = 200
+
+
+def mmr(relevance, vectors, top_n, mmr_lambda=0.7):
+    """Urutan pilihan MMR (indeks ke dalam pool) dari `relevance` dan vektor kandidat"""
+    relevance = np.asarray(relevance, dtype=np.float32)
+    top_n = min(top_n, len(relevance))
+    if top_n <= 0:
+        return np.empty(0, dtype=np.int64)
+    vectors = l2_normalize(vectors)
+    pairwise = vectors @ vectors.T
+
+    chosen = np.empty(top_n, dtype=np.int64)
+    # Kandidat pertama: paling relevan (belum ada yang terpilih)
+    chosen[0] = int(np.argmax(relevance))
+    max_sim = pairwise[chosen[0]].copy()
+    gain = mmr_lambda * relevance
+    available = np.ones(len(relevance), dtype=bool)
+    available[chosen[0]] = False
+    for step in range(1, top_n):
+        scores = np.where(available, gain - (1.0 - mmr_lambda) * max_sim, -np.inf)
+        pick = int(np.argmax(scores))
+        chosen[step] = pick
+        available[pick] = False
+        np.maximum(max_sim, pairwise[pick], out=max_sim)
+    return chosen
+
+
+def diversify(result, similarity, top_n, mmr_lambda=0.7):
+    """Top-n baris `result` (DataFrame pool hasil rekomendasi, kolom 'index' + 'similarity')
+    dalam urutan MMR; kolom lain (mis. bahan yang sama) ikut terbawa"""
+    if result is None or len(result) == 0:
+        return result
+    indices = result['index'].to_numpy(dtype=np.int64)
+    order = mmr(result['similarity'].to_numpy(), similarity.rows(indices), top_n, mmr_lambda)
+    return result.iloc[order].reset_index(drop=True)
+
+
+def intra_list_similarity(vectors):
+    """Rata-rata cosine antar pasangan produk dalam satu daftar (makin kecil makin beragam)"""
+    vectors = l2_normalize(vectors)
+    n = len(vectors)
+    if n < 2:
+        return 0.0
+    pairwise = vectors @ vectors.T
+    return float((pairwise.sum() - np.trace(pairwise)) / (n * (n - 1)))
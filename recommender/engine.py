@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from .facets import FacetIndex, unpack
+
+# Kolom yang dikembalikan ke UI, sama dengan skema recommend_products lama
+RESULT_COLUMNS = ['index', 'similarity', 'product_name', 'brand', 'product_type',
+                  'skin_type', 'active_ingredients', 'benefits']
+DISPLAY_COLUMNS = ['product_type', 'skin_type', 'active_ingredients', 'benefits']
+
+
+def top_k(scores, k):
+    """Ambil k indeks dengan skor tertinggi, terurut menurun (tie -> indeks kecil dulu)"""
+    n = len(scores)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < n:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(n)
+    order = np.lexsort((part, -scores[part]))
+    return part[order]
+
+
+class RecommendationEngine:
+    """Mesin rekomendasi tervektorisasi: filter via bitmap facet, seleksi top-k via argpartition"""
+
+    def __init__(self, df, live=None):
+        self.df = df
+        self.n_products = len(df)
+        # Mask produk aktif; None = semua aktif (False = tombstone dari update incremental)
+        self.live = live
+        self.brand_codes, self.brand_values = self._encode(df, 'brand')
+        self.has_product_type = 'product_type' in df.columns
+        # Bitmap per nilai brand / product_type / skin_type untuk filter dan jumlah per facet
+        self.facets = FacetIndex(df, live)
+        # Kolom tampilan sebagai array (NumPy / Arrow / kategorikal) tanpa konversi ke object,
+        # sehingga view mmap catalog.bin tidak disalin; hasil diambil dengan fancy indexing
+        self._columns = {
+            column: df[column].array if column in df.columns else None
+            for column in ['product_name', 'brand'] + DISPLAY_COLUMNS
+        }
+
+    @staticmethod
+    def _encode(df, column):
+        if column not in df.columns:
+            return np.full(len(df), -1, dtype=np.int32), []
+        codes, uniques = pd.factorize(df[column])
+        return codes.astype(np.int32), list(uniques)
+
+    def filter_mask(self, product_idx, filter_brand=None, filter_product_type=None,
+                    same_brand_only=False, different_brand_only=False, filter_skin_type=None):
+        """Boolean mask produk aktif yang lolos semua filter (produk target selalu dikeluarkan).
+
+        `product_idx=None` untuk query tanpa produk acuan; filter brand sama/berbeda diabaikan.
+        Filter boleh berupa satu nilai atau daftar nilai (OR); nilai yang tidak ada di
+        katalog tidak cocok dengan produk mana pun.
+        """
+        selections = {'brand': filter_brand, 'product_type': filter_product_type,
+                      'skin_type': filter_skin_type}
+        words = self.facets.words(selections)
+        if product_idx is not None and (same_brand_only or different_brand_only):
+            code = self.brand_codes[product_idx]
+            target_brand = [str(self.brand_values[code])] if code >= 0 else []
+            target = self.facets.value_words('brand', target_brand)
+            if same_brand_only:
+                words &= target
+            if different_brand_only:
+                words &= ~target
+        mask = unpack(words, self.n_products)
+
+        if product_idx is not None:
+            mask[product_idx] = False
+        return mask
+
+    def select(self, scores, mask, top_n, candidates=None):
+        """Pilih top_n indeks dari skor yang lolos mask.
+
+        Jika `candidates` diberikan, `scores` sejajar dengan array indeks tersebut
+        (bukan satu baris penuh sepanjang katalog).
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        if candidates is None:
+            eligible = np.flatnonzero(mask)
+            eligible_scores = scores[eligible]
+        else:
+            candidates = np.asarray(candidates)
+            keep = mask[candidates]
+            eligible = candidates[keep]
+            eligible_scores = scores[keep]
+        order = top_k(eligible_scores, top_n)
+        return eligible[order], eligible_scores[order]
+
+    def to_frame(self, indices, scores):
+        """Bangun DataFrame hasil dengan skema yang sama seperti recommend_products lama"""
+        data = {'index': indices, 'similarity': scores}
+        for column, values in self._columns.items():
+            data[column] = values[indices] if values is not None else 'N/A'
+        return pd.DataFrame(data, columns=RESULT_COLUMNS)
+
+    def recommend(self, scores, product_idx, top_n=5, filter_brand=None,
+                  filter_product_type=None, same_brand_only=False,
+                  different_brand_only=False, candidates=None, filter_skin_type=None):
+        if product_idx >= self.n_products:
+            return None
+
+        mask = self.filter_mask(product_idx, filter_brand, filter_product_type,
+                                same_brand_only, different_brand_only, filter_skin_type)
+        indices, selected = self.select(scores, mask, top_n, candidates)
+        return self.to_frame(indices, selected)
+
+    def rank(self, scores, top_n=5, filter_brand=None, filter_product_type=None,
+             filter_skin_type=None):
+        """Top-n produk untuk skor tanpa produk acuan (mis. query teks bebas)"""
+        mask = self.filter_mask(None, filter_brand, filter_product_type,
+                                filter_skin_type=filter_skin_type)
+        indices, selected = self.select(scores, mask, top_n)
+        return self.to_frame(indices, selected)
@@ -0,0 +1,201 @@
+"""Indeks facet: satu bitmap terkompresi per nilai brand, product_type dan skin_type.
+
+Bitmap memetakan produk p ke bit (p % 64) pada word 64-bit ke (p // 64). Seperti
+container Roaring, tiap bitmap memilih layout yang lebih kecil: hanya word yang tidak
+nol (indeks word + isinya), atau semua word jika nilainya tersebar di seluruh katalog.
+Katalog dikelompokkan per brand, jadi bitmap brand cukup beberapa word. skin_type
+diurai menjadi beberapa jenis kulit kanonik per produk ("Semua jenis kulit" = semuanya).
+
+Kombinasi filter diselesaikan dengan operasi bit pada word:
+    OR  antar nilai dalam satu facet  (mis. kering ATAU sensitif)
+    AND antar facet, dengan mask produk aktif dan (opsional) hasil pencarian
+Jumlah hasil per nilai facet (untuk sidebar) dihitung pada langkah yang sama dengan
+popcount word bitmap nilai tersebut terhadap hasil filter facet lainnya.
+
+    facets = FacetIndex(df)
+    positions, counts = facets.query({'brand': 'wardah', 'skin_type': ['kering', 'sensitif']})
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .ingredients import normalize_text
+
+FACETS = ('brand', 'product_type', 'skin_type')
+
+# Kata kunci -> jenis kulit kanonik
+SKIN_TYPES = ('normal', 'kering', 'berminyak', 'kombinasi', 'sensitif', 'berjerawat',
+              'kusam', 'menua')
+_SKIN_KEYWORDS = {
+    'normal': 'normal', 'kering': 'kering', 'dry': 'kering', 'berminyak': 'berminyak',
+    'minyak': 'berminyak', 'oily': 'berminyak', 'kombinasi': 'kombinasi',
+    'combination': 'kombinasi', 'sensitif': 'sensitif', 'sensitive': 'sensitif',
+    'jerawat': 'berjerawat', 'berjerawat': 'berjerawat', 'acne': 'berjerawat',
+    'acneprone': 'berjerawat', 'kusam': 'kusam', 'dull': 'kusam', 'menua': 'menua',
+    'penuaan': 'menua', 'aging': 'menua', 'keriput': 'menua',
+}
+_ALL_SKIN = re.compile(r'\b(semua|all)\b')
+# Jumlah bit per byte: popcount tanpa np.bitwise_count (hanya ada di NumPy >= 2.0)
+_POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+
+def skin_types(text):
+    """Jenis kulit kanonik dari teks bebas kolom skin_type ('Semua jenis kulit' -> semua)"""
+    text = normalize_text(text) if isinstance(text, str) else ''
+    if _ALL_SKIN.search(text):
+        return list(SKIN_TYPES)
+    found = {_SKIN_KEYWORDS[word] for word in text.split() if word in _SKIN_KEYWORDS}
+    return [skin for skin in SKIN_TYPES if skin in found]
+
+
+def n_words(n_products):
+    return (n_products + 63) // 64
+
+
+def pack(mask):
+    """Boolean mask -> word uint64 (bit p % 64 dari word p // 64)"""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    padded = np.zeros(n_words(len(mask)) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view('<u8')
+
+
+def unpack(words, n_products):
+    """Word uint64 -> boolean mask sepanjang katalog"""
+    bits = np.unpackbits(words.view(np.uint8), count=n_products, bitorder='little')
+    return bits.view(bool)
+
+
+class Bitmap:
+    """Bitmap terkompresi: word 64-bit yang tidak nol + indeksnya, atau semua word (index=None)"""
+    __slots__ = ('index', 'words')
+
+    def __init__(self, index, words):
+        self.index = index
+        self.words = words
+
+    @classmethod
+    def from_positions(cls, positions, n_products):
+        """Dari posisi produk terurut naik"""
+        positions = np.asarray(positions, dtype=np.int64)
+        word_index = positions >> 6
+        index, starts = np.unique(word_index, return_index=True)
+        bits = np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64))
+        words = np.bitwise_or.reduceat(bits, starts) if len(bits) else bits
+        # Indeks int32 + word 8 byte: lebih kecil hanya jika < 2/3 word terisi
+        if 3 * len(index) >= 2 * n_words(n_products):
+            dense = np.zeros(n_words(n_products), dtype='<u8')
+            dense[index] = words
+            return cls(None, dense)
+        return cls(index.astype(np.int32), words.astype('<u8'))
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes + (self.index.nbytes if self.index is not None else 0)
+
+    def or_into(self, dense):
+        if self.index is None:
+            dense |= self.words
+        else:
+            dense[self.index] |= self.words
+
+    def count_and(self, dense):
+        """Jumlah produk di bitmap ini yang juga ada di `dense` (word penuh)"""
+        other = dense if self.index is None else dense[self.index]
+        return int(_POPCOUNT[(self.words & other).view(np.uint8)].sum())
+
+
+class FacetIndex:
+    """Bitmap per nilai facet + mask produk aktif, semuanya dalam word 64-bit"""
+
+    def __init__(self, df, live=None):
+        self.n_products = len(df)
+        self.all = pack(np.ones(self.n_products, dtype=bool) if live is None else live)
+        self.bitmaps = {}
+        for facet in FACETS:
+            if facet not in df.columns:
+                continue
+            if facet == 'skin_type':
+                self.bitmaps[facet] = self._multi_value(df[facet], skin_types)
+            else:
+                self.bitmaps[facet] = self._single_value(df[facet])
+
+    @staticmethod
+    def _single_value(column):
+        codes, uniques = pd.factorize(column)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        return {str(value): Bitmap.from_positions(order[bounds[i]:bounds[i + 1]], len(codes))
+                for i, value in enumerate(uniques)}
+
+    @staticmethod
+    def _multi_value(column, parse):
+        # Teks skin_type yang sama cukup diurai sekali
+        codes, uniques = pd.factorize(column)
+        owners = {}
+        for code, text in enumerate(uniques):
+            for value in parse(text):
+                owners.setdefault(value, []).append(code)
+        return {value: Bitmap.from_positions(np.flatnonzero(np.isin(codes, value_codes)),
+                                             len(codes))
+                for value, value_codes in owners.items()}
+
+    def __contains__(self, facet):
+        return facet in self.bitmaps
+
+    def values(self, facet):
+        return list(self.bitmaps.get(facet, {}))
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for bitmaps in self.bitmaps.values() for b in bitmaps.values())
+
+    def value_words(self, facet, values):
+        """OR bitmap nilai-nilai `values` dari satu facet; nilai tak dikenal tidak cocok apa pun"""
+        if isinstance(values, str):
+            values = [values]
+        dense = np.zeros(len(self.all), dtype='<u8')
+        bitmaps = self.bitmaps.get(facet, {})
+        for value in values:
+            if value in bitmaps:
+                bitmaps[value].or_into(dense)
+        return dense
+
+    def words(self, selections=None, base=None, exclude=None):
+        """AND filter semua facet terpilih (kecuali `exclude`) dengan produk aktif dan `base`.
+
+        `selections`: {facet: nilai | daftar nilai}; None / daftar kosong = tanpa filter.
+        Facet yang tidak ada di katalog diabaikan.
+        """
+        result = self.all.copy() if base is None else self.all & base
+        for facet, values in (selections or {}).items():
+            if facet == exclude or facet not in self.bitmaps or values is None or len(values) == 0:
+                continue
+            result &= self.value_words(facet, values)
+        return result
+
+    def base_words(self, positions):
+        """Word untuk himpunan posisi produk (mis. hasil pencarian bahan aktif)"""
+        mask = np.zeros(self.n_products, dtype=bool)
+        mask[positions] = True
+        return pack(mask)
+
+    def mask(self, selections=None, base=None):
+        return unpack(self.words(selections, base), self.n_products)
+
+    def positions(self, selections=None, base=None):
+        return np.flatnonzero(self.mask(selections, base))
+
+    def counts(self, selections=None, base=None):
+        """{facet: {nilai: jumlah}}; jumlah per facet memakai filter facet lain saja,
+        sehingga pilihan alternatif di facet yang sama tetap terlihat jumlahnya"""
+        counts = {}
+        for facet, bitmaps in self.bitmaps.items():
+            others = self.words(selections, base, exclude=facet)
+            counts[facet] = {value: bitmap.count_and(others) for value, bitmap in bitmaps.items()}
+        return counts
+
+    def query(self, selections=None, base=None):
+        """(posisi hasil filter, jumlah per facet) dalam satu panggilan"""
+        return self.positions(selections, base), self.counts(selections, base)
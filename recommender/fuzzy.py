@@ -0,0 +1,137 @@
+"""Pencocokan bahan / nama produk yang toleran typo dengan indeks trigram karakter.
+
+Kandidat (kosakata bahan dari IngredientIndex + nama produk) dipecah menjadi
+trigram. Query dinilai dengan koefisien Dice atas trigram yang sama, dihitung
+dengan satu np.bincount atas posting list, lalu dilengkapi tabel sinonim
+(mis. Vitamin C -> Ascorbic Acid, BHA -> Salicylic Acid).
+"""
+import numpy as np
+
+from .engine import top_k
+from .ingredients import build_postings, normalize_ingredient, rewrite_terms, strengths
+
+# Nama umum -> nama INCI yang setara
+SYNONYMS = {
+    'vitamin c': ['ascorbic acid', '3-o-ethyl ascorbic acid', 'ethyl ascorbic acid',
+                  'ascorbyl glucoside', 'sodium ascorbyl phosphate',
+                  'magnesium ascorbyl phosphate', 'ascorbyl tetraisopalmitate'],
+    'vitamin b3': ['niacinamide'],
+    'vitamin b5': ['panthenol'],
+    'vitamin e': ['tocopherol', 'tocopheryl acetate'],
+    'vitamin a': ['retinol', 'retinyl palmitate', 'retinal', 'hydroxypinacolone retinoate'],
+    'bha': ['salicylic acid', 'betaine salicylate'],
+    'aha': ['glycolic acid', 'lactic acid', 'mandelic acid'],
+    'pha': ['gluconolactone', 'lactobionic acid'],
+    'hyaluronic acid': ['sodium hyaluronate', 'hydrolyzed hyaluronic acid'],
+    'cica': ['centella asiatica', 'madecassoside', 'asiaticoside'],
+    'tea tree': ['melaleuca alternifolia'],
+    'licorice': ['glycyrrhiza glabra'],
+    'arbutin': ['alpha-arbutin'],
+    'spf': ['sunscreen'],
+}
+# Singkatan yang sering diketik pengguna ('vit c' -> 'vitamin c')
+SYNONYMS.update({
+    'vit ' + key[len('vitamin '):]: [key] + values
+    for key, values in list(SYNONYMS.items()) if key.startswith('vitamin ')
+})
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyMatcher:
+    """Autocomplete + fuzzy match untuk kotak pencarian bahan aktif"""
+
+    def __init__(self, ingredient_index, synonyms=SYNONYMS):
+        self.synonyms = {normalize_ingredient(k): v for k, v in synonyms.items()}
+        self.terms = list(ingredient_index.vocabulary) + list(dict.fromkeys(ingredient_index.names))
+        self.kinds = (['bahan'] * len(ingredient_index.vocabulary)
+                      + ['produk'] * (len(self.terms) - len(ingredient_index.vocabulary)))
+
+        self.trigram_ids = {}
+        keys, term_ids = [], []
+        sizes = np.empty(len(self.terms), dtype=np.int32)
+        for term_id, term in enumerate(self.terms):
+            grams = trigrams(term)
+            sizes[term_id] = len(grams)
+            keys.extend(self.trigram_ids.setdefault(gram, len(self.trigram_ids)) for gram in grams)
+            term_ids.extend([term_id] * len(grams))
+        self.term_sizes = sizes
+        self.postings = build_postings(keys, term_ids, len(self.trigram_ids))
+
+    def expand(self, query):
+        """Query + sinonimnya sebagai daftar term (untuk digabung dengan OR)"""
+        key = normalize_ingredient(query)
+        return [key] + [term for term in self.synonyms.get(key, []) if term != key]
+
+    def expand_query(self, query):
+        """Query boolean IngredientIndex dengan sinonim setiap term di-OR-kan di tempatnya
+
+        ('vit c AND niacinamide' -> '(vitamin c OR ascorbic acid OR ...) AND niacinamide')
+        """
+        return rewrite_terms(query, self._expand_term)
+
+    def _expand_term(self, term):
+        terms = self.expand(term)
+        if len(terms) == 1:
+            return term
+        # Konsentrasi ('vit c 3%') ikut dibawa ke setiap sinonim
+        dose = ''.join(f' {value}' for value in strengths(term))
+        return '(' + ' OR '.join(f'{name}{dose}' for name in terms) + ')'
+
+    def correct_query(self, query, index):
+        """(query dengan setiap term tanpa hasil diganti kandidat fuzzy terbaiknya, saran lain)
+
+        Operator dan term lain tidak berubah, jadi klausa AND / NOT tetap berlaku.
+        """
+        others = []
+
+        def correct(term):
+            if len(index.search(self._expand_term(term))):
+                return term
+            suggestions = self.suggest(term)
+            if not suggestions:
+                return term
+            others.extend(text for text, _, _ in suggestions[1:])
+            return suggestions[0][0] + ''.join(f' {value}' for value in strengths(term))
+
+        return rewrite_terms(query, correct), others
+
+    def suggest(self, query, limit=5, min_score=0.35):
+        """Kandidat terurut skor: list (teks, jenis, skor)"""
+        key = normalize_ingredient(query)
+        if not key:
+            return []
+
+        results = [(term, 'sinonim', 1.0) for term in self.synonyms.get(key, [])]
+
+        query_grams = trigrams(key)
+        grams = [self.trigram_ids[g] for g in query_grams if g in self.trigram_ids]
+        if grams:
+            hits = np.concatenate([self.postings[g] for g in grams])
+            shared = np.bincount(hits, minlength=len(self.terms))
+            # Dice >= min_score butuh minimal sekian trigram yang sama; sisanya tidak perlu dinilai
+            needed = max(1, int(np.ceil(min_score * len(query_grams) / (2 - min_score))))
+            candidates = np.flatnonzero(shared >= needed)
+            scores = 2.0 * shared[candidates] / (len(query_grams) + self.term_sizes[candidates])
+            for position in top_k(scores, limit * 4):
+                term_id = candidates[position]
+                score = float(scores[position])
+                term = self.terms[term_id]
+                # Autocomplete: awalan / substring yang cocok diberi bobot tinggi
+                if term.startswith(key):
+                    score = max(score, 0.9)
+                elif key in term:
+                    score = max(score, 0.8)
+                if score >= min_score:
+                    results.append((term, self.kinds[term_id], score))
+
+        seen = set()
+        ranked = []
+        for term, kind, score in sorted(results, key=lambda r: -r[2]):
+            if term not in seen:
+                seen.add(term)
+                ranked.append((term, kind, score))
+        return ranked[:limit]
@@ -0,0 +1,165 @@
+"""Ranking hybrid per kolom: bahan aktif, manfaat dan jenis kulit dengan bobot bebas.
+
+Setiap kolom punya vektor ternormalisasi L2 sendiri yang dihitung sekali:
+    ingredients  TF-IDF daftar bahan kanonik (ingredients.py) -> TruncatedSVD
+    benefits     TF-IDF kata `benefits_clean` -> TruncatedSVD
+    skin_type    multi-hot jenis kulit kanonik ("Semua jenis kulit" = semua)
+
+Ketiganya disimpan berdampingan dalam satu matriks N x D. Skor gabungan
+    sum_f w_f * cos_f(a, b) / sum_f w_f
+sama dengan satu perkalian matriks-vektor terhadap query yang tiap bloknya dikali
+bobot kolomnya, jadi bobot boleh berubah di setiap request tanpa menghitung ulang
+struktur N x N apa pun.
+
+Menyimpan vektor per kolom (dibangun ulang otomatis oleh build / compaction):
+    python -m recommender.hybrid
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .facets import SKIN_TYPES, skin_types
+from .ingredients import normalize_text, split_ingredients
+from .similarity import ARTIFACT_DIR, l2_normalize
+
+FIELD_VECTORS_FILE = 'field_vectors.npz'
+FIELDS = ('ingredients', 'benefits', 'skin_type')
+DEFAULT_WEIGHTS = {'ingredients': 0.5, 'benefits': 0.3, 'skin_type': 0.2}
+FIELD_DIMS = {'ingredients': 64, 'benefits': 48}
+
+
+def _svd_vectors(documents, dim, analyzer):
+    """TF-IDF (analyzer bebas) -> TruncatedSVD, dinormalisasi L2; baris kosong = vektor nol"""
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    tfidf = TfidfVectorizer(analyzer=analyzer).fit_transform(documents)
+    dim = max(1, min(dim, tfidf.shape[1] - 1, tfidf.shape[0] - 1))
+    vectors = TruncatedSVD(n_components=dim, random_state=42).fit_transform(tfidf)
+    vectors = vectors.astype(np.float32)
+    vectors[tfidf.getnnz(axis=1) == 0] = 0
+    return l2_normalize(vectors)
+
+
+def field_vectors(df, dims=FIELD_DIMS):
+    """{kolom: vektor ternormalisasi} untuk semua baris DataFrame produk"""
+    if 'active_ingredients' in df.columns:
+        ingredient_lists = [split_ingredients(text) for text in df['active_ingredients']]
+    else:
+        ingredient_lists = [str(text).split() if isinstance(text, str) else []
+                            for text in df['active_ingredients_clean']]
+    if 'benefits_clean' in df.columns:
+        benefits = df['benefits_clean']
+    else:
+        benefits = df['benefits'].map(lambda t: normalize_text(t) if isinstance(t, str) else '')
+
+    skin = np.zeros((len(df), len(SKIN_TYPES)), dtype=np.float32)
+    lookup = {name: i for i, name in enumerate(SKIN_TYPES)}
+    column = df['skin_type'] if 'skin_type' in df.columns else [None] * len(df)
+    for row, text in enumerate(column):
+        for name in skin_types(text):
+            skin[row, lookup[name]] = 1.0
+
+    return {
+        'ingredients': _svd_vectors(ingredient_lists, dims['ingredients'], lambda names: names),
+        'benefits': _svd_vectors(benefits.fillna('').astype(str), dims['benefits'], str.split),
+        'skin_type': l2_normalize(skin),
+    }
+
+
+class HybridRanker:
+    """Matriks vektor per kolom berdampingan (N x D) + offset kolom"""
+
+    def __init__(self, matrix, fields, offsets):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.fields = tuple(fields)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._slices = {field: slice(self.offsets[i], self.offsets[i + 1])
+                        for i, field in enumerate(self.fields)}
+
+    def __len__(self):
+        return len(self.matrix)
+
+    @classmethod
+    def build(cls, df, dims=FIELD_DIMS):
+        vectors = field_vectors(df, dims)
+        blocks = [vectors[field] for field in FIELDS]
+        offsets = np.concatenate([[0], np.cumsum([b.shape[1] for b in blocks])])
+        return cls(np.hstack(blocks), FIELDS, offsets)
+
+    def save(self, path):
+        np.savez(path, matrix=self.matrix, fields=np.array(self.fields), offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(data['matrix'], [str(f) for f in data['fields']], data['offsets'])
+
+    @classmethod
+    def from_artifacts(cls, df, artifact_dir=ARTIFACT_DIR):
+        """field_vectors.npz jika cocok dengan katalog, selain itu dibangun dari DataFrame"""
+        path = os.path.join(artifact_dir, FIELD_VECTORS_FILE)
+        if os.path.exists(path):
+            ranker = cls.load(path)
+            if len(ranker) == len(df):
+                return ranker
+        return cls.build(df)
+
+    def weight_vector(self, weights=None):
+        """Bobot per dimensi (dibagi total bobot sehingga skor tetap di rentang cosine)"""
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        total = sum(max(float(weights[f]), 0.0) for f in self.fields) or 1.0
+        scale = np.empty(self.matrix.shape[1], dtype=np.float32)
+        for field in self.fields:
+            scale[self._slices[field]] = max(float(weights[field]), 0.0) / total
+        return scale
+
+    def scores(self, product_indices, weights=None):
+        """Skor gabungan (Q x N) untuk beberapa produk acuan sekaligus: satu GEMM"""
+        queries = self.matrix[np.atleast_1d(product_indices)] * self.weight_vector(weights)
+        return queries @ self.matrix.T
+
+    def row(self, product_idx, weights=None):
+        return self.matrix @ (self.matrix[product_idx] * self.weight_vector(weights))
+
+    def field_scores(self, product_idx, indices):
+        """Cosine per kolom antara produk acuan dan `indices` (untuk penjelasan hasil)"""
+        query = self.matrix[product_idx]
+        rows = self.matrix[indices]
+        return {field: rows[:, s] @ query[s] for field, s in self._slices.items()}
+
+
+def recommend_hybrid(engine, ranker, product_idx, weights=None, top_n=5, **filters):
+    """DataFrame skema recommend_products + kolom score_<kolom> per sinyal"""
+    if product_idx >= len(ranker):
+        return None
+    result = engine.recommend(ranker.row(product_idx, weights), product_idx, top_n, **filters)
+    if result is None:
+        return None
+    for field, values in ranker.field_scores(product_idx, result['index'].to_numpy()).items():
+        result[f'score_{field}'] = values
+    return result
+
+
+def main():
+    from .build import _atomic_write
+    from .registry import load_frame
+
+    parser = argparse.ArgumentParser(description='Bangun vektor per kolom untuk ranking hybrid')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    args = parser.parse_args()
+
+    csv_path = os.path.join(args.artifact_dir, 'skincare_products.csv')
+    df = pd.read_csv(csv_path) if os.path.exists(csv_path) else load_frame(args.artifact_dir)[0]
+    ranker = HybridRanker.build(df)
+    path = os.path.join(args.artifact_dir, FIELD_VECTORS_FILE)
+    _atomic_write(path, ranker.save)
+    dims = ', '.join(f'{f}={ranker.offsets[i + 1] - ranker.offsets[i]}'
+                     for i, f in enumerate(ranker.fields))
+    print(f"Vektor per kolom ({dims}) untuk {len(ranker)} produk disimpan ke {path}")
+
+
+if __name__ == '__main__':
+    main()
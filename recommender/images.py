@@ -0,0 +1,192 @@
+"""Gambar produk: indeks nama produk -> file dan cache thumbnail.
+
+Folder brand (avoskin/, wardah/, ...) dipindai sekali; semua ekstensi (jpg, jpeg,
+png, webp) diindeks dengan kunci nama yang dinormalisasi, sehingga nama file yang
+karakternya diganti saat disimpan ("Niacinamide 10_" untuk "Niacinamide 10%",
+spasi/newline di ujung nama) tetap cocok.
+
+Thumbnail berukuran tetap (JPEG terkompresi) disimpan di folder cache dengan nama
+berdasarkan hash isi file sumber, jadi gambar yang diganti otomatis mendapat
+thumbnail baru. Byte thumbnail yang sering dipakai di-cache di memori (LRU).
+
+Membuat semua thumbnail sekaligus:
+    python -m recommender.images --workers 4
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from .metrics import timer
+from .similarity import ARTIFACT_DIR
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+THUMBNAIL_DIR = 'thumbnails'
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 80
+HASHES_FILE = 'hashes.json'
+
+
+def image_key(name):
+    """Kunci pencocokan nama: huruf kecil, selain a-z/0-9/+ jadi satu spasi ('10%' == '10_')"""
+    return ' '.join(re.sub(r'[^a-z0-9+]+', ' ', str(name).lower()).split())
+
+
+class ImageIndex:
+    """Peta (brand, kunci nama produk) -> path gambar, dibangun dengan satu scan per folder brand"""
+
+    def __init__(self, brands, root='.'):
+        self.root = root
+        self.paths = {}
+        for brand in sorted({str(b).lower() for b in brands}):
+            folder = os.path.join(root, brand)
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    stem, ext = os.path.splitext(entry.name)
+                    if ext.lower() in IMAGE_EXTENSIONS and entry.is_file():
+                        # Ekstensi pertama sesuai urutan IMAGE_EXTENSIONS yang dipakai jika ganda
+                        key = (brand, image_key(stem))
+                        current = self.paths.get(key)
+                        if current is None or self._rank(entry.path) < self._rank(current):
+                            self.paths[key] = entry.path
+
+    @staticmethod
+    def _rank(path):
+        return IMAGE_EXTENSIONS.index(os.path.splitext(path)[1].lower())
+
+    def __len__(self):
+        return len(self.paths)
+
+    def resolve(self, product_name, brand):
+        """Path gambar asli produk, None jika tidak ada"""
+        return self.paths.get((str(brand).lower(), image_key(product_name)))
+
+
+class ThumbnailCache:
+    """Thumbnail ber-hash isi di `cache_dir` + LRU byte thumbnail di memori"""
+
+    def __init__(self, index, cache_dir=os.path.join(ARTIFACT_DIR, THUMBNAIL_DIR),
+                 size=THUMBNAIL_SIZE, quality=THUMBNAIL_QUALITY, memory_items=256):
+        self.index = index
+        self.cache_dir = cache_dir
+        self.size = tuple(size)
+        self.quality = quality
+        # Hash sumber dari run sebelumnya: (path, ukuran, mtime) -> sha256, agar tidak dibaca ulang
+        self._hashes = {}
+        hashes_path = os.path.join(cache_dir, HASHES_FILE)
+        if os.path.exists(hashes_path):
+            with open(hashes_path, encoding='utf-8') as f:
+                self._hashes = json.load(f)
+        self._read = lru_cache(maxsize=memory_items)(self._thumbnail_bytes)
+
+    def _source_hash(self, source):
+        stat = os.stat(source)
+        stamp = f'{source}|{stat.st_size}|{stat.st_mtime_ns}'
+        digest = self._hashes.get(stamp)
+        if digest is None:
+            with open(source, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self._hashes[stamp] = digest
+        return digest
+
+    def thumbnail_path(self, source):
+        width, height = self.size
+        name = f'{self._source_hash(source)[:20]}-{width}x{height}-q{self.quality}.jpg'
+        return os.path.join(self.cache_dir, name)
+
+    def render(self, source):
+        """Buat thumbnail JPEG (latar putih, ukuran tetap) dari gambar sumber, hasilkan bytes"""
+        from PIL import Image, ImageOps
+
+        with Image.open(source) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel('A'))
+                img = background
+            else:
+                img = img.convert('RGB')
+            img = ImageOps.pad(img, self.size, color=(255, 255, 255))
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=self.quality, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+    def ensure(self, source):
+        """Path thumbnail untuk `source`, dibuat jika belum ada (None jika folder cache read-only)"""
+        path = self.thumbnail_path(source)
+        if os.path.exists(path):
+            return path
+        data = self.render(source)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            return None
+        return path
+
+    def _thumbnail_bytes(self, source):
+        path = self.ensure(source)
+        if path is None:
+            return self.render(source)
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def get(self, product_name, brand):
+        """Bytes thumbnail produk (siap untuk st.image), None jika produk tidak punya gambar"""
+        with timer('image_seconds'):
+            source = self.index.resolve(product_name, brand)
+            if source is None:
+                return None
+            return self._read(source)
+
+    def pregenerate(self, workers=None):
+        """Buat thumbnail semua gambar terindeks; kembalikan (jumlah dibuat, jumlah total)"""
+        sources = sorted(set(self.index.paths.values()))
+        missing = [s for s in sources if not os.path.exists(self.thumbnail_path(s))]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(self.ensure, missing))
+        self.save_hashes()
+        return len(missing), len(sources)
+
+    def save_hashes(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, HASHES_FILE)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._hashes, f, indent=0)
+        os.replace(tmp_path, path)
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Buat cache thumbnail gambar produk')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--image-root', default='.', help='Folder yang berisi folder per brand')
+    parser.add_argument('--size', type=int, default=THUMBNAIL_SIZE[0])
+    parser.add_argument('--quality', type=int, default=THUMBNAIL_QUALITY)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(args.artifact_dir, 'skincare_products.csv'))
+    index = ImageIndex(df['brand'].dropna().unique(), args.image_root)
+    cache = ThumbnailCache(index, os.path.join(args.artifact_dir, THUMBNAIL_DIR),
+                           size=(args.size, args.size), quality=args.quality)
+    created, total = cache.pregenerate(args.workers)
+    found = sum(index.resolve(n, b) is not None for n, b in zip(df['product_name'], df['brand']))
+    print(f"{found}/{len(df)} produk punya gambar; {created} thumbnail baru dari {total} gambar "
+          f"di {cache.cache_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,434 @@
+"""Indeks terbalik bahan aktif untuk pencarian "Cari Berdasarkan Bahan Aktif".
+
+Daftar INCI di `active_ingredients` dipecah per koma menjadi ID bahan yang
+dinormalisasi, masing-masing dengan posting list (array int terurut berisi posisi
+baris). Query dijawab dengan operasi himpunan, bukan scan teks per baris:
+
+    niacinamide
+    niacinamide AND hyaluronic
+    retinol OR bakuchiol
+    niacinamide AND NOT fragrance
+    (salicylic OR glycolic) AND NOT alcohol
+    niacinamide 10%
+
+Operator tidak peka huruf besar/kecil. Operator yang menggantung (`niacinamide AND`,
+`NOT` tanpa term) dan kurung tanpa pasangan diabaikan, dan query yang hanya berisi
+negasi (`NOT fragrance`) ditolak (hasil kosong) karena akan mengembalikan hampir
+seluruh katalog.
+"""
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+OPERATORS = {'AND', 'OR', 'NOT', '(', ')'}
+_QUERY_TOKEN = re.compile(r'\(|\)|\bAND\b|\bOR\b|\bNOT\b', re.IGNORECASE)
+_PERCENT = re.compile(r'(\d+(?:[.,]\d+)?)\s*%')
+TERM_CACHE_SIZE = 4096
+_NON_WORD = re.compile(r'[^0-9a-z%+\-\s]')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Huruf kecil, tanpa aksen/tanda baca, spasi dirapikan"""
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode()
+    text = _NON_WORD.sub(' ', text.lower())
+    return _SPACES.sub(' ', text).strip()
+
+
+def normalize_ingredient(text):
+    """Nama bahan kanonik: tanpa konsentrasi ('Niacinamide 10%' -> 'niacinamide')"""
+    text = normalize_text(_PERCENT.sub(' ', str(text)))
+    return text.strip(' -+')
+
+
+def strengths(text):
+    """Konsentrasi yang disebut di teks, bentuk kanonik ('2,5 %' -> '2.5%')"""
+    return [f"{float(value.replace(',', '.')):g}%" for value in _PERCENT.findall(str(text))]
+
+
+def split_ingredients(text):
+    """Pecah daftar INCI (dipisah koma / baris baru) menjadi nama bahan kanonik"""
+    return [name for name, _ in split_doses(text)]
+
+
+def split_doses(text):
+    """Seperti split_ingredients, tetapi [(nama bahan, [konsentrasi])]"""
+    if not isinstance(text, str):
+        return []
+    parts = ((normalize_ingredient(part), strengths(part)) for part in re.split(r'[,\n;]', text))
+    return [(name, doses) for name, doses in parts if name]
+
+
+def build_postings(keys, positions, n_keys):
+    """Kelompokkan pasangan (key, baris) menjadi posting list terurut tanpa duplikat per key"""
+    offsets, positions = build_csr(keys, positions, n_keys)
+    return np.split(positions, offsets[1:-1])
+
+
+def build_csr(keys, positions, n_keys):
+    """Seperti build_postings, tetapi (offsets, positions): posting key k = positions[offsets[k]:offsets[k + 1]]"""
+    keys = np.asarray(keys, dtype=np.int64)
+    positions = np.asarray(positions, dtype=np.int32)
+    order = np.lexsort((positions, keys))
+    keys, positions = keys[order], positions[order]
+    if len(keys):
+        unique = np.ones(len(keys), dtype=bool)
+        unique[1:] = (keys[1:] != keys[:-1]) | (positions[1:] != positions[:-1])
+        keys, positions = keys[unique], positions[unique]
+    offsets = np.searchsorted(keys, np.arange(n_keys + 1)).astype(np.int64)
+    return offsets, positions
+
+
+def gather(offsets, values, keys):
+    """Gabungan posting CSR untuk banyak key sekaligus (tanpa loop Python per key)"""
+    keys = np.asarray(keys, dtype=np.int64)
+    starts = offsets[keys]
+    lengths = offsets[keys + 1] - starts
+    shift = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[shift + np.arange(len(shift))]
+
+
+class SubstringIndex:
+    """Suffix array atas kosakata kecil: key yang mengandung / diawali / diakhiri suatu teks.
+
+    Hanya menyimpan (id, offset) per sufiks; pencarian = binary search O(log n) perbandingan
+    string, bukan `teks in nama` untuk setiap entri kosakata.
+    """
+
+    def __init__(self, strings):
+        self.strings = strings
+        self.lengths = np.array([len(text) for text in strings], dtype=np.int32)
+        ids = np.repeat(np.arange(len(strings), dtype=np.int32), self.lengths)
+        offsets = (np.arange(len(ids), dtype=np.int64)
+                   - np.repeat(np.cumsum(self.lengths) - self.lengths, self.lengths)).astype(np.int32)
+        suffixes = [strings[i][o:] for i, o in zip(ids.tolist(), offsets.tolist())]
+        order = np.array(sorted(range(len(suffixes)), key=suffixes.__getitem__), dtype=np.int64)
+        self.ids = ids[order]
+        self.offsets = offsets[order]
+
+    def _suffix(self, position):
+        return self.strings[self.ids[position]][self.offsets[position]:]
+
+    def _bound(self, text):
+        low, high = 0, len(self.ids)
+        while low < high:
+            middle = (low + high) // 2
+            if self._suffix(middle) < text:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _range(self, text):
+        return self._bound(text), self._bound(text + '\U0010ffff')
+
+    def containing(self, text):
+        low, high = self._range(text)
+        return np.unique(self.ids[low:high])
+
+    def starting_with(self, text):
+        low, high = self._range(text)
+        return self.ids[low:high][self.offsets[low:high] == 0]
+
+    def ending_with(self, text):
+        low, high = self._range(text)
+        ids = self.ids[low:high]
+        return ids[self.offsets[low:high] + len(text) == self.lengths[ids]]
+
+
+class IngredientIndex:
+    """Posting list per bahan aktif dan per kata nama produk, dibangun sekali saat load"""
+
+    def __init__(self, df):
+        self.n_products = len(df)
+        self.all_rows = np.arange(self.n_products, dtype=np.int32)
+
+        if 'active_ingredients' in df.columns:
+            dose_lists = [split_doses(text) for text in df['active_ingredients']]
+        else:
+            # Kolom *_clean tidak punya koma, setiap baris dianggap satu daftar kata
+            dose_lists = [[(normalize_text(text), [])] if isinstance(text, str) else []
+                          for text in df['active_ingredients_clean']]
+        ingredient_lists = [[name for name, _ in doses] for doses in dose_lists]
+
+        self.ingredient_ids = {}
+        keys, rows = [], []
+        for row, names in enumerate(ingredient_lists):
+            for name in names:
+                keys.append(self.ingredient_ids.setdefault(name, len(self.ingredient_ids)))
+                rows.append(row)
+        self.vocabulary = list(self.ingredient_ids)
+        self.posting_offsets, self.posting_rows = build_csr(keys, rows, len(self.vocabulary))
+        self.vocabulary_index = SubstringIndex(self.vocabulary)
+
+        # Daftar ID bahan per produk (layout CSR), dipakai fitur lain yang butuh set bahan
+        self.product_offsets = np.zeros(self.n_products + 1, dtype=np.int64)
+        self.product_offsets[1:] = np.cumsum([len(set(names)) for names in ingredient_lists])
+        self.product_ingredients = np.array(
+            [self.ingredient_ids[name] for names in ingredient_lists
+             for name in dict.fromkeys(names)], dtype=np.int32)
+
+        # Kata nama produk dengan posisi global (baris dipisah satu posisi kosong), sehingga
+        # frasa dijawab dengan irisan posisi yang digeser, tanpa memeriksa nama per baris
+        self.names = [normalize_text(name) for name in df['product_name'].fillna('')]
+        self.word_ids = {}
+        keys, rows = [], []
+        for row, name in enumerate(self.names):
+            for word in name.split():
+                keys.append(self.word_ids.setdefault(word, len(self.word_ids)))
+                rows.append(row)
+        self.words = list(self.word_ids)
+        self.position_rows = np.array(rows, dtype=np.int32)
+        positions = np.arange(len(rows)) + self.position_rows
+        self.position_rows = np.full(len(rows) + self.n_products, -1, dtype=np.int32)
+        self.position_rows[positions] = rows
+        self.word_offsets, self.word_positions = build_csr(keys, positions, len(self.words))
+        self.word_index = SubstringIndex(self.words)
+
+        # Konsentrasi ('Niacinamide (10%)' di daftar INCI, '10% Niacinamide' di nama produk).
+        # Nama bahan kanonik tidak membawa konsentrasi, jadi disimpan di posting terpisah
+        dose_keys, keys, rows = {}, [], []
+        for row, doses in enumerate(dose_lists):
+            for name, values in doses:
+                for dose in values:
+                    keys.append(dose_keys.setdefault((self.ingredient_ids[name], dose),
+                                                     len(dose_keys)))
+                    rows.append(row)
+        self.dose_postings = dict(zip(dose_keys, build_postings(keys, rows, len(dose_keys))))
+        any_doses = {}
+        for (_, dose), dose_rows in self.dose_postings.items():
+            any_doses.setdefault(dose, []).append(dose_rows)
+        self.any_dose_postings = {dose: self._union(arrays) for dose, arrays in any_doses.items()}
+        name_doses, keys, rows = {}, [], []
+        for row, name in enumerate(df['product_name'].fillna('')):
+            for dose in strengths(name):
+                keys.append(name_doses.setdefault(dose, len(name_doses)))
+                rows.append(row)
+        self.name_dose_postings = dict(zip(name_doses, build_postings(keys, rows, len(name_doses))))
+
+        # LRU kecil: kuncinya berasal dari input pengguna, jangan tumbuh selama proses hidup
+        self._term_cache = OrderedDict()
+        self._term_lock = threading.Lock()
+
+    def ingredients_of(self, row):
+        start, end = self.product_offsets[row:row + 2]
+        return [self.vocabulary[i] for i in self.product_ingredients[start:end]]
+
+    @staticmethod
+    def _union(arrays):
+        arrays = [a for a in arrays if len(a)]
+        if not arrays:
+            return np.empty(0, dtype=np.int32)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def term_rows(self, term):
+        """Baris yang bahan aktifnya atau nama produknya mengandung `term`.
+
+        Konsentrasi di term ('niacinamide 10%', '10%') harus cocok dengan konsentrasi
+        bahan itu di daftar INCI atau disebut di nama produk.
+        """
+        key = normalize_ingredient(term)
+        doses = tuple(strengths(term))
+        cache_key = (key, doses)
+        with self._term_lock:
+            if cache_key in self._term_cache:
+                self._term_cache.move_to_end(cache_key)
+                return self._term_cache[cache_key]
+        if not key and not doses:
+            return np.empty(0, dtype=np.int32)
+
+        # Substring dicocokkan lewat suffix array kosakata bahan, bukan scan setiap entri
+        ingredients = self.vocabulary_index.containing(key) if key else None
+        name_rows = self._name_rows(key) if key else self.all_rows
+        if doses:
+            result = None
+            for dose in doses:
+                if ingredients is None:
+                    inci_rows = [self.any_dose_postings.get(dose, np.empty(0, dtype=np.int32))]
+                else:
+                    inci_rows = [self.dose_postings[(i, dose)] for i in ingredients.tolist()
+                                 if (i, dose) in self.dose_postings]
+                named = self.name_dose_postings.get(dose, np.empty(0, dtype=np.int32))
+                rows = self._union(inci_rows + [self.intersect(name_rows, named)])
+                result = rows if result is None else self.intersect(result, rows)
+        else:
+            result = self._rows(np.concatenate([
+                gather(self.posting_offsets, self.posting_rows, ingredients), name_rows]))
+
+        with self._term_lock:
+            self._term_cache[cache_key] = result
+            while len(self._term_cache) > TERM_CACHE_SIZE:
+                self._term_cache.popitem(last=False)
+        return result
+
+    def _rows(self, rows):
+        """Baris unik terurut; mask boolean untuk hasil besar, np.unique untuk hasil kecil"""
+        if len(rows) * 16 < self.n_products:
+            return np.unique(rows).astype(np.int32)
+        mask = np.zeros(self.n_products, dtype=bool)
+        mask[rows] = True
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def intersect(self, a, b):
+        """Irisan dua posting terurut (lookup mask, bukan sort gabungan)"""
+        if len(a) > len(b):
+            a, b = b, a
+        mask = np.zeros(self.n_products, dtype=bool)
+        mask[b] = True
+        return a[mask[a]]
+
+    def complement(self, rows):
+        mask = np.ones(self.n_products, dtype=bool)
+        mask[rows] = False
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def _name_rows(self, key):
+        """Nama produk yang mengandung frasa `key` (substring dari nama yang dinormalisasi).
+
+        Kata pertama frasa harus akhiran sebuah kata, kata tengah sama persis dan kata terakhir
+        awalan sebuah kata, di posisi berurutan.
+        """
+        words = key.split()
+        if len(words) == 1:
+            matches = [self.word_index.containing(words[0])]
+        else:
+            middle = [self.word_ids.get(word, -1) for word in words[1:-1]]
+            matches = ([self.word_index.ending_with(words[0])]
+                       + [np.array([i] if i >= 0 else [], dtype=np.int64) for i in middle]
+                       + [self.word_index.starting_with(words[-1])])
+        positions = None
+        for shift, ids in enumerate(matches):
+            found = np.sort(gather(self.word_offsets, self.word_positions, ids)) - shift
+            positions = found if positions is None else np.intersect1d(
+                positions, found, assume_unique=True)
+            if not len(positions):
+                break
+        return self._rows(self.position_rows[positions])
+
+    def search(self, query):
+        """Jawab query boolean (AND / OR / NOT / kurung), hasil berupa posisi baris terurut"""
+        tokens = self._tokenize(query)
+        if not tokens:
+            return np.empty(0, dtype=np.int32)
+        parser = _QueryParser(tokens, self)
+        return parser.parse()
+
+    @staticmethod
+    def _tokenize(query):
+        return [token for _, _, token in query_spans(query)]
+
+
+def query_spans(query):
+    """(awal, akhir, token) setiap operator (huruf besar) dan term dalam query boolean"""
+    spans = []
+    position = 0
+    for match in [*_QUERY_TOKEN.finditer(query), None]:
+        end = match.start() if match else len(query)
+        text = query[position:end]
+        if text.strip():
+            start = position + len(text) - len(text.lstrip())
+            spans.append((start, start + len(text.strip()), text.strip()))
+        if match:
+            spans.append((match.start(), match.end(), match.group().upper()))
+            position = match.end()
+    return spans
+
+
+def rewrite_terms(query, replace):
+    """Query dengan setiap term diganti `replace(term)`; operator dan spasi tidak berubah"""
+    parts, position = [], 0
+    for start, end, token in query_spans(query):
+        if token not in OPERATORS:
+            parts.append(query[position:start])
+            parts.append(replace(token))
+            position = end
+    parts.append(query[position:])
+    return ''.join(parts)
+
+
+class _QueryParser:
+    """Recursive descent: or_expr := and_expr (OR and_expr)*; and_expr := unary (AND? unary)*
+
+    Setiap ekspresi dievaluasi menjadi (baris, positif). `positif` = hasilnya dibatasi oleh
+    minimal satu term (bukan sekadar komplemen dari NOT); None = operand tidak ada.
+    """
+
+    def __init__(self, tokens, index):
+        self.tokens = self._balance(tokens)
+        self.position = 0
+        self.index = index
+
+    @staticmethod
+    def _balance(tokens):
+        """Buang kurung tutup tanpa pasangan agar token sesudahnya tetap diparse"""
+        balanced, depth = [], 0
+        for token in tokens:
+            if token == ')':
+                if not depth:
+                    continue
+                depth -= 1
+            elif token == '(':
+                depth += 1
+            balanced.append(token)
+        return balanced
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self):
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        result = self._or()
+        # Query yang hanya negasi ditolak
+        if result is None or not result[1]:
+            return np.empty(0, dtype=np.int32)
+        return result[0]
+
+    def _or(self):
+        result = self._and()
+        while self._peek() == 'OR':
+            self._next()
+            operand = self._and()
+            if operand is None:
+                continue
+            result = operand if result is None else (
+                self.index._rows(np.concatenate([result[0], operand[0]])),
+                result[1] and operand[1])
+        return result
+
+    def _and(self):
+        result = None
+        while self._peek() not in (None, 'OR', ')'):
+            if self._peek() == 'AND':
+                self._next()
+                continue
+            operand = self._unary()
+            if operand is None:
+                continue
+            result = operand if result is None else (
+                self.index.intersect(result[0], operand[0]), result[1] or operand[1])
+        return result
+
+    def _unary(self):
+        token = self._next()
+        if token == 'NOT':
+            if self._peek() in (None, 'AND', 'OR', ')'):
+                return None
+            operand = self._unary()
+            if operand is None:
+                return None
+            return self.index.complement(operand[0]), False
+        if token == '(':
+            result = self._or()
+            if self._peek() == ')':
+                self._next()
+            return result
+        return self.index.term_rows(token), True
@@ -0,0 +1,289 @@
+"""Instrumentasi ringan: timer, counter, trace per request dan sampling profiler.
+
+    with timer('recommend_seconds', mode='vector'):
+        ...
+    count('cache_requests_total', result='hit')
+
+Semua metrik disimpan di `METRICS` (satu per proses) dan bisa dirender dalam format
+teks Prometheus (`render_prometheus`), disajikan lewat `GET /metrics` di server.py
+atau `start_metrics_server(port)` untuk app Streamlit. Satu timer hanya menambah
+beberapa mikrodetik: perf_counter + satu lock.
+
+Trace per request (opt-in) mengumpulkan setiap timer yang selesai di konteks saat
+ini; sampling profiler (opt-in) mengambil stack semua thread secara berkala dan
+menghitung fungsi yang paling sering sedang berjalan.
+"""
+import contextvars
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Batas bucket histogram (detik), sama untuk semua timer
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_trace = contextvars.ContextVar('trace', default=None)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        # (nama, label) -> [jumlah per bucket, sum, count, max]
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * len(BUCKETS), 0.0, 0, 0.0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += seconds
+            entry[2] += 1
+            entry[3] = max(entry[3], seconds)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def summary(self):
+        """Satu dict per timer/counter untuk panel debug (waktu dalam ms)"""
+        with self._lock:
+            histograms = {k: (list(v[0]), v[1], v[2], v[3]) for k, v in self._histograms.items()}
+            counters = dict(self._counters)
+        rows = []
+        fmt = lambda labels: ', '.join(f'{k}={v}' for k, v in labels)
+        for (name, labels), (_, total, n, peak) in sorted(histograms.items()):
+            rows.append({'metric': name, 'labels': fmt(labels), 'count': n,
+                         'total_ms': total * 1e3, 'mean_ms': total / n * 1e3 if n else 0.0,
+                         'max_ms': peak * 1e3})
+        for (name, labels), value in sorted(counters.items()):
+            rows.append({'metric': name, 'labels': fmt(labels), 'count': value,
+                         'total_ms': None, 'mean_ms': None, 'max_ms': None})
+        return rows
+
+    def render_prometheus(self, prefix='skincare_'):
+        """Semua metrik dalam format teks eksposisi Prometheus 0.0.4"""
+        with self._lock:
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self._histograms.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f'# HELP {prefix}{name} {self._help[name]}')
+                lines.append(f'# TYPE {prefix}{name} {kind}')
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, 'counter')
+            lines.append(f'{prefix}{name}{_format_labels(labels)} {value}')
+        for (name, labels), (buckets, total, n) in sorted(histograms.items()):
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, buckets):
+                cumulative += bucket
+                lines.append(f'{prefix}{name}_bucket{_format_labels(labels, [("le", str(bound))])} '
+                             f'{cumulative}')
+            lines.append(f'{prefix}{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {n}')
+            lines.append(f'{prefix}{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{prefix}{name}_count{_format_labels(labels)} {n}')
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+METRICS.describe('artifact_load_seconds', 'Waktu memuat artefak dari deployment_files')
+METRICS.describe('recommend_seconds', 'Waktu rekomendasi produk serupa')
+METRICS.describe('search_seconds', 'Waktu pencarian bahan aktif / teks bebas')
+METRICS.describe('facet_seconds', 'Waktu filter / jumlah per facet dari bitmap')
+METRICS.describe('diversity_seconds', 'Waktu re-ranking keragaman (MMR) pada pool kandidat')
+METRICS.describe('image_seconds', 'Waktu resolusi gambar + baca thumbnail')
+METRICS.describe('render_seconds', 'Waktu render elemen UI Streamlit')
+METRICS.describe('http_request_seconds', 'Waktu request HTTP di server.py')
+METRICS.describe('cache_requests_total', 'Request ke cache hasil per hasil (hit/miss)')
+METRICS.describe('classify_seconds', 'Waktu klasifikasi teks produk (termasuk antre batch)')
+METRICS.describe('classifier_batch_seconds', 'Waktu satu micro-batch fitur + model classifier')
+METRICS.describe('classifier_requests_total', 'Request classifier per sumber hasil (cache/model)')
+
+
+@contextmanager
+def timer(name, **labels):
+    """Catat durasi blok ke histogram `name` (dan ke trace aktif, jika ada)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        METRICS.observe(name, seconds, **labels)
+        spans = _trace.get()
+        if spans is not None:
+            spans.append({'span': name, **labels, 'ms': seconds * 1e3})
+
+
+def timed(name, **labels):
+    """Decorator versi `timer`"""
+    def decorate(fn):
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return fn(*args, **kwargs)
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        return wrapper
+    return decorate
+
+
+def count(name, value=1, **labels):
+    METRICS.inc(name, value, **labels)
+
+
+@contextmanager
+def trace():
+    """Kumpulkan semua timer di dalam blok; yield list span (urut selesai)"""
+    spans = []
+    token = _trace.set(spans)
+    try:
+        yield spans
+    finally:
+        _trace.reset(token)
+
+
+def start_trace():
+    """Versi tanpa `with` dari `trace` (mis. sepanjang satu run script Streamlit)"""
+    spans = []
+    _trace.set(spans)
+    return spans
+
+
+def stop_trace():
+    _trace.set(None)
+
+
+class SamplingProfiler:
+    """Profiler sampling di thread latar: hitung fungsi teratas di stack setiap `interval` detik"""
+
+    def __init__(self, interval=0.005, max_depth=30):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.leaf = Counter()
+        self.inclusive = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                self.samples += 1
+                seen = set()
+                depth = 0
+                leaf = True
+                while frame is not None and depth < self.max_depth:
+                    code = frame.f_code
+                    key = f'{code.co_name} ({code.co_filename.rsplit("/", 1)[-1]}:{code.co_firstlineno})'
+                    if leaf:
+                        self.leaf[key] += 1
+                        leaf = False
+                    if key not in seen:
+                        self.inclusive[key] += 1
+                        seen.add(key)
+                    frame = frame.f_back
+                    depth += 1
+
+    def report(self, limit=20):
+        """Fungsi dengan sampel terbanyak: (fungsi, % sebagai leaf, % inklusif)"""
+        total = max(self.samples, 1)
+        return [{'function': key, 'self_pct': self.leaf[key] / total * 100,
+                 'inclusive_pct': value / total * 100}
+                for key, value in self.inclusive.most_common(limit)]
+
+
+_profiler = None
+
+
+def profiler():
+    """Profiler global proses ini (dibuat saat pertama diminta, belum berjalan)"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
+
+
+_metrics_server = None
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Sajikan GET /metrics (format Prometheus) di thread latar; aman dipanggil berulang"""
+    global _metrics_server
+    if _metrics_server is not None:
+        return _metrics_server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = METRICS.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    _metrics_server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=_metrics_server.serve_forever, name='metrics-server',
+                     daemon=True).start()
+    return _metrics_server
@@ -0,0 +1,44 @@
+"""Halaman hasil pencarian di atas array posisi produk yang sudah dihitung.
+
+Hasil pencarian disimpan sebagai array posisi terurut (urutan katalog, stabil antar
+rerun). Navigasi halaman hanya memotong array ini; baris DataFrame, gambar dan HTML
+dibuat untuk halaman yang tampil saja, jadi ribuan hasil "glycerin" tidak membuat
+halaman membengkak dan pindah halaman tidak menjalankan ulang pencarian.
+"""
+import numpy as np
+
+PAGE_SIZES = (10, 20, 50)
+
+
+class ResultPages:
+    def __init__(self, positions, page_size=PAGE_SIZES[0]):
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.page_size = max(1, int(page_size))
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def n_pages(self):
+        return max(1, -(-len(self.positions) // self.page_size))
+
+    def clamp(self, page):
+        """Nomor halaman (mulai 1) dibatasi ke rentang yang ada"""
+        return min(max(1, int(page)), self.n_pages)
+
+    def page(self, page):
+        """Posisi produk di halaman `page`"""
+        start = (self.clamp(page) - 1) * self.page_size
+        return self.positions[start:start + self.page_size]
+
+    def window(self, offset, limit):
+        """Potongan berbasis offset/limit (untuk API)"""
+        offset = max(0, int(offset))
+        return self.positions[offset:offset + max(0, int(limit))]
+
+    def label(self, page):
+        """Teks 'Menampilkan a–b dari total'"""
+        page = self.clamp(page)
+        start = (page - 1) * self.page_size
+        end = min(start + self.page_size, len(self.positions))
+        return f"Menampilkan {start + 1 if end else 0}–{end} dari {len(self.positions)} produk"
@@ -0,0 +1,251 @@
+"""Vektor produk terkuantisasi untuk scan kasar + re-ranking exact.
+
+Tiga mode kode (vektor ternormalisasi L2, 128 dimensi PCA):
+    float16  2 byte per dimensi (256 byte per produk)
+    int8     1 byte per dimensi + satu skala per dimensi (128 byte per produk)
+    pq       product quantization: vektor dipecah menjadi `subspaces` potongan, tiap
+             potongan diganti ID centroid terdekat (1 byte) dari codebook 256 centroid;
+             skor dihitung dari tabel lookup per query (16 byte per produk untuk 16 potongan)
+
+Scan seluruh katalog hanya membaca kode; `rerank` kandidat teratas lalu dinilai ulang
+dengan vektor float32 penuh yang di-mmap dari disk (catalog.bin / product_vectors.npy),
+sehingga hanya baris kandidat yang dibaca. Lihat `QuantizedSimilarity` di similarity.py.
+
+Membuat kode untuk katalog di deployment_files (sekaligus melaporkan memori yang
+dihemat dan kesesuaian top-k terhadap ranking cosine exact):
+    python -m recommender.quantize --mode int8
+    python -m recommender.quantize --mode pq --subspaces 16
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .engine import top_k
+
+QUANTIZED_FILE = 'quantized_vectors.npz'
+MODES = ('float16', 'int8', 'pq')
+
+
+def _blocks(n, block_size):
+    for start in range(0, n, block_size):
+        yield start, min(start + block_size, n)
+
+
+class Float16Codes:
+    mode = 'float16'
+
+    def __init__(self, codes):
+        self.codes = np.asarray(codes, dtype=np.float16)
+
+    @classmethod
+    def build(cls, vectors):
+        return cls(np.asarray(vectors, dtype=np.float16))
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    def score(self, query, block_size=4096):
+        # Matmul float16 NumPy tidak memakai BLAS; dekode per blok (muat di cache) ke float32
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(len(self.codes), dtype=np.float32)
+        for start, end in _blocks(len(self.codes), block_size):
+            out[start:end] = self.codes[start:end].astype(np.float32) @ query
+        return out
+
+    def arrays(self):
+        return {'codes': self.codes}
+
+
+class Int8Codes:
+    """Kuantisasi simetris per dimensi: x ≈ code * scale[d]"""
+    mode = 'int8'
+
+    def __init__(self, codes, scales):
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.scales = np.asarray(scales, dtype=np.float32)
+
+    @classmethod
+    def build(cls, vectors, block_size=65536):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=0) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for start, end in _blocks(len(vectors), block_size):
+            codes[start:end] = np.clip(np.rint(vectors[start:end] / scales), -127, 127)
+        return cls(codes, scales)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+    def score(self, query, block_size=4096):
+        # Skala dilipat ke query: satu perkalian per dimensi, bukan per produk
+        query = np.asarray(query, dtype=np.float32) * self.scales
+        out = np.empty(len(self.codes), dtype=np.float32)
+        for start, end in _blocks(len(self.codes), block_size):
+            out[start:end] = self.codes[start:end].astype(np.float32) @ query
+        return out
+
+    def arrays(self):
+        return {'codes': self.codes, 'scales': self.scales}
+
+
+def kmeans(vectors, n_clusters, n_iter=15, sample_size=50_000, seed=0):
+    """K-means Euclidean sederhana (codebook PQ), dilatih pada sampel"""
+    rng = np.random.default_rng(seed)
+    if len(vectors) > sample_size:
+        vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    n_clusters = min(n_clusters, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _nearest(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=n_clusters)
+        # Centroid kosong diisi ulang dengan titik acak
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+            counts[empty] = 1
+        centroids = (sums / counts[:, None]).astype(np.float32)
+    return centroids
+
+
+def _nearest(vectors, centroids, block_size=65536):
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 sama untuk semua centroid
+    half_norms = 0.5 * (centroids ** 2).sum(axis=1)
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start, end in _blocks(len(vectors), block_size):
+        labels[start:end] = (vectors[start:end] @ centroids.T - half_norms).argmax(axis=1)
+    return labels
+
+
+class ProductQuantizer:
+    """Kode PQ: satu byte per potongan vektor; skor = jumlah lookup tabel (ADC)"""
+    mode = 'pq'
+
+    def __init__(self, codes, codebooks):
+        # (subspaces, produk): kode satu potongan kontigu untuk np.take
+        self.codes = np.asarray(codes, dtype=np.uint8)
+        # (subspaces, 256, dimensi per potongan)
+        self.codebooks = np.asarray(codebooks, dtype=np.float32)
+
+    @classmethod
+    def build(cls, vectors, subspaces=16, n_iter=15, seed=0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        if dim % subspaces:
+            raise ValueError(f"Dimensi vektor ({dim}) harus habis dibagi subspaces ({subspaces})")
+        width = dim // subspaces
+        n_centroids = min(256, len(vectors))
+        codebooks = np.zeros((subspaces, 256, width), dtype=np.float32)
+        codes = np.empty((subspaces, len(vectors)), dtype=np.uint8)
+        for j in range(subspaces):
+            part = np.ascontiguousarray(vectors[:, j * width:(j + 1) * width])
+            codebooks[j, :n_centroids] = kmeans(part, n_centroids, n_iter=n_iter, seed=seed + j)
+            codes[j] = _nearest(part, codebooks[j, :n_centroids])
+        return cls(codes, codebooks)
+
+    def __len__(self):
+        return self.codes.shape[1]
+
+    @property
+    def subspaces(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.codebooks.nbytes
+
+    def score(self, query):
+        query = np.asarray(query, dtype=np.float32).reshape(self.subspaces, -1)
+        # tabel[j, c] = <potongan query j, centroid c>; skor = jumlah tabel[j, kode j]
+        table = np.einsum('jcw,jw->jc', self.codebooks, query)
+        out = np.take(table[0], self.codes[0])
+        for j in range(1, self.subspaces):
+            out += np.take(table[j], self.codes[j])
+        return out
+
+    def arrays(self):
+        return {'codes': self.codes, 'codebooks': self.codebooks}
+
+
+CODECS = {'float16': Float16Codes, 'int8': Int8Codes, 'pq': ProductQuantizer}
+
+
+def quantize(vectors, mode='int8', subspaces=16):
+    """Bangun kode untuk vektor ternormalisasi L2"""
+    if mode not in CODECS:
+        raise ValueError(f"mode tidak dikenal: {mode!r} (pilih {', '.join(MODES)})")
+    if mode == 'pq':
+        return ProductQuantizer.build(vectors, subspaces)
+    return CODECS[mode].build(vectors)
+
+
+def save_codes(path, codes, rerank=100):
+    np.savez(path, mode=codes.mode, rerank=rerank, **codes.arrays())
+
+
+def load_codes(path):
+    """(kode, rerank) dari file hasil `save_codes`"""
+    data = np.load(path)
+    arrays = {name: data[name] for name in data.files if name not in ('mode', 'rerank')}
+    return CODECS[str(data['mode'])](**arrays), int(data['rerank'])
+
+
+def topk_agreement(similarity, vectors, queries, k=10):
+    """Rata-rata |top-k similarity ∩ top-k cosine exact| / k untuk produk `queries`"""
+    hits = 0
+    for idx in queries:
+        exact = top_k(vectors @ vectors[idx], k)
+        hits += len(np.intersect1d(top_k(similarity.row(idx), k), exact))
+    return hits / (k * len(queries))
+
+
+def main():
+    from .build import _atomic_write
+    from .registry import load_frame
+    from .similarity import ARTIFACT_DIR, QuantizedSimilarity, VectorSimilarity
+
+    parser = argparse.ArgumentParser(description='Bangun vektor produk terkuantisasi')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--mode', choices=MODES, default='int8')
+    parser.add_argument('--subspaces', type=int, default=16, help='Jumlah potongan vektor (mode pq)')
+    parser.add_argument('--rerank', type=int, default=100,
+                        help='Kandidat teratas yang dinilai ulang dengan vektor penuh')
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    csv_path = os.path.join(args.artifact_dir, 'skincare_products.csv')
+    # Tanpa CSV (deploy yang hanya membawa catalog.bin) vektor diambil dari katalog biner
+    df, vectors = ((pd.read_csv(csv_path), None) if os.path.exists(csv_path)
+                   else load_frame(args.artifact_dir))
+    vectors = VectorSimilarity.from_artifacts(df, args.artifact_dir, vectors=vectors,
+                                              quantized=False).vectors
+    codes = quantize(vectors, args.mode, args.subspaces)
+    path = os.path.join(args.artifact_dir, QUANTIZED_FILE)
+    _atomic_write(path, lambda f: save_codes(f, codes, args.rerank))
+
+    similarity = QuantizedSimilarity(codes, vectors, rerank=args.rerank)
+    rng = np.random.default_rng(0)
+    queries = rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    agreement = topk_agreement(similarity, vectors, queries, args.k)
+    full = len(vectors) * vectors.shape[1] * 4
+    print(f"Kode {args.mode} untuk {len(codes)} produk disimpan ke {path}")
+    print(f"Memori vektor: {full / 2**20:.2f} MB float32 -> {codes.nbytes / 2**20:.2f} MB "
+          f"({full / codes.nbytes:.1f}x lebih kecil, {codes.nbytes / len(codes):.0f} byte/produk)")
+    print(f"Kesesuaian top-{args.k} dengan cosine exact (rerank={args.rerank}): {agreement:.3f}")
+
+
+if __name__ == '__main__':
+    main()
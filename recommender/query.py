@@ -0,0 +1,48 @@
+"""Query teks bebas ("kulit berminyak, jerawat, ingin mencerahkan") -> produk terdekat.
+
+Query dibersihkan dengan pipeline yang sama seperti kolom clean_text (normalisasi +
+stemming Sastrawi, di-memoize LRU di text.py), diproyeksikan lewat vectorizer + PCA,
+lalu diurutkan dengan cosine similarity terhadap vektor produk.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .similarity import l2_normalize, project_texts
+from .text import clean_query
+
+
+class QueryEmbedder:
+    def __init__(self, vectorizer, pca, cache_size=1024):
+        self.vectorizer = vectorizer
+        self.pca = pca
+        self._embed_clean = lru_cache(maxsize=cache_size)(self._embed_clean_text)
+
+    def _embed_clean_text(self, clean_text):
+        # Tanpa kata yang dikenal vectorizer, hasil PCA hanya -mean; anggap query kosong
+        if not clean_text or self.vectorizer.transform([clean_text]).nnz == 0:
+            return None
+        vector = l2_normalize(project_texts(self.vectorizer, self.pca, [clean_text]))[0]
+        vector.setflags(write=False)
+        return vector
+
+    def embed(self, query):
+        """Vektor ternormalisasi untuk query, None jika tidak ada kata yang dikenal.
+
+        Query yang sama setelah dibersihkan berbagi entri cache.
+        """
+        return self._embed_clean(clean_query(query))
+
+    def cache_info(self):
+        return {'embed': self._embed_clean.cache_info(), 'clean_query': clean_query.cache_info()}
+
+
+def search_by_text(engine, similarity, embedder, query, top_n=5, filter_brand=None,
+                   filter_product_type=None, filter_skin_type=None):
+    """DataFrame rekomendasi (skema sama dengan recommend_products) untuk query teks bebas"""
+    vector = embedder.embed(query)
+    if vector is None:
+        return engine.to_frame(np.empty(0, dtype=np.int64), np.empty(0))
+    scores = similarity.score(vector)
+    return engine.rank(scores, top_n, filter_brand=filter_brand,
+                       filter_product_type=filter_product_type, filter_skin_type=filter_skin_type)
@@ -0,0 +1,148 @@
+"""Registry artefak yang dimuat secara lazy.
+
+Setiap artefak (katalog, similarity, vectorizer, PCA, classifier, tokenizer,
+label encoder, classifier brand siap pakai) didaftarkan sebagai fungsi loader dan baru dimuat saat fitur yang
+membutuhkannya memanggil `registry.get(nama)`. Import framework berat (sklearn,
+TensorFlow/Keras) terjadi di dalam loader, sehingga alur daftar produk default
+cukup dengan NumPy dan pandas. Waktu load dan pertambahan RSS dicatat per artefak.
+"""
+import os
+import sys
+import threading
+import time
+import warnings
+
+import pandas as pd
+
+from .catalog import CATALOG_FILE, SOURCE_FILE, compact_frame, import_csv, load_catalog
+from .classifier import TextClassifier
+from .hybrid import HybridRanker
+from .metrics import timer
+from .query import QueryEmbedder
+from .similarity import ARTIFACT_DIR, VECTORS_FILE, VectorSimilarity, load_pickle
+
+
+def current_rss():
+    """RSS proses saat ini dalam byte, None jika tidak bisa dibaca di platform ini"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss adalah puncak RSS (KB di Linux, byte di macOS), cukup sebagai perkiraan
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+    except ImportError:
+        return None
+
+
+class ModelRegistry:
+    """Peta nama artefak -> loader; hasil load di-cache per proses"""
+
+    def __init__(self):
+        self._loaders = {}
+        self._loaded = {}
+        self._stats = {}
+        # RLock: loader boleh memanggil get() untuk artefak lain (similarity -> catalog)
+        self._lock = threading.RLock()
+
+    def register(self, name, loader):
+        self._loaders[name] = loader
+
+    def is_loaded(self, name):
+        return name in self._loaded
+
+    def get(self, name):
+        if name in self._loaded:
+            return self._loaded[name]
+        with self._lock:
+            if name not in self._loaded:
+                rss_before = current_rss()
+                start = time.perf_counter()
+                with timer('artifact_load_seconds', artifact=name):
+                    value = self._loaders[name]()
+                seconds = time.perf_counter() - start
+                rss_after = current_rss()
+                self._stats[name] = {
+                    'seconds': seconds,
+                    'rss_delta': (rss_after - rss_before) if rss_before is not None else None,
+                }
+                self._loaded[name] = value
+        return self._loaded[name]
+
+    def report(self):
+        """Satu dict per artefak terdaftar: status, waktu load dan pertambahan RSS"""
+        rows = []
+        for name in self._loaders:
+            stats = self._stats.get(name, {})
+            rows.append({
+                'artifact': name,
+                'loaded': name in self._loaded,
+                'seconds': stats.get('seconds'),
+                'rss_delta_mb': (stats['rss_delta'] / 2**20
+                                 if stats.get('rss_delta') is not None else None),
+            })
+        return rows
+
+    def heavy_modules(self):
+        """Framework berat yang sudah terimpor di proses ini"""
+        return [m for m in ('sklearn', 'scipy', 'tensorflow', 'keras', 'Sastrawi')
+                if m in sys.modules]
+
+
+def load_frame(artifact_dir):
+    """(DataFrame produk, vektor ternormalisasi atau None) dari catalog.bin.
+
+    catalog.bin tidak ikut di git; jika belum ada atau basi (dibuat dari versi lain
+    skincare_products.csv) file itu dibangun sekali dari CSV. Hanya jika tidak bisa ditulis
+    (mis. folder read-only) katalog dibaca langsung dari CSV.
+    """
+    catalog_path = os.path.join(artifact_dir, CATALOG_FILE)
+    csv_path = os.path.join(artifact_dir, SOURCE_FILE)
+    if os.path.exists(catalog_path):
+        catalog = load_catalog(catalog_path)
+        if catalog.matches_source(csv_path):
+            return catalog.to_frame(), catalog.vectors
+        warnings.warn(f"{catalog_path} basi (dibuat dari versi lain {SOURCE_FILE}), dibangun ulang")
+    try:
+        import_csv(csv_path, catalog_path, artifact_dir)
+    except OSError as exc:
+        warnings.warn(f"{catalog_path} tidak bisa ditulis ({exc}), memakai {SOURCE_FILE}")
+    else:
+        catalog = load_catalog(catalog_path)
+        return catalog.to_frame(), catalog.vectors
+    df = pd.read_csv(csv_path)
+    # clean_text hanya disimpan jika vektor produk harus dihitung ulang dari vectorizer + PCA
+    keep = () if os.path.exists(os.path.join(artifact_dir, VECTORS_FILE)) else ('clean_text',)
+    return compact_frame(df, keep), None
+
+
+def _load_classifier(artifact_dir):
+    keras_path = os.path.join(artifact_dir, 'skincare_model.h5')
+    if os.path.exists(keras_path):
+        from tensorflow import keras
+        return keras.models.load_model(keras_path)
+    return load_pickle(os.path.join(artifact_dir, 'skincare_model.pkl'))
+
+
+def default_registry(artifact_dir=ARTIFACT_DIR):
+    registry = ModelRegistry()
+    registry.register('catalog', lambda: load_frame(artifact_dir))
+    registry.register('similarity', lambda: VectorSimilarity.from_artifacts(
+        registry.get('catalog')[0], artifact_dir, vectors=registry.get('catalog')[1]))
+    registry.register('hybrid', lambda: HybridRanker.from_artifacts(
+        registry.get('catalog')[0], artifact_dir))
+    registry.register('vectorizer', lambda: load_pickle(os.path.join(artifact_dir, 'vectorizer.pkl')))
+    registry.register('pca', lambda: load_pickle(os.path.join(artifact_dir, 'pca_model.pkl')))
+    registry.register('classifier', lambda: _load_classifier(artifact_dir))
+    # tokenizer.pkl adalah Tokenizer Keras; unpickle akan mengimpor keras saat itu juga
+    registry.register('tokenizer', lambda: load_pickle(os.path.join(artifact_dir, 'tokenizer.pkl')))
+    registry.register('query_embedder', lambda: QueryEmbedder(
+        registry.get('vectorizer'), registry.get('pca')))
+    registry.register('label_encoder', lambda: load_pickle(os.path.join(artifact_dir, 'label_encoder.pkl')))
+    registry.register('brand_classifier', lambda: TextClassifier.for_brand(
+        registry.get('classifier'), registry.get('label_encoder'),
+        registry.get('vectorizer'), registry.get('pca')))
+    return registry
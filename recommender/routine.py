@@ -0,0 +1,210 @@
+"""Lengkapi rutinitas: produk pelengkap per langkah perawatan untuk satu produk acuan.
+
+Dibangun sekali dari kolom skincare_products.csv (`active_ingredients`, `product_type`)
+dengan NumPy saja, di atas CSR produk x bahan milik IngredientIndex (`product_offsets` /
+`product_ingredients`), sehingga alur rekomendasi default tetap tidak mengimpor scipy:
+    X  nilai CSR produk x bahan, bobot IDF, baris ternormalisasi L2
+    C  CSR bahan x bahan: co-occurrence bahan di katalog (cosine antar kolom X)
+    T  bool jenis produk x langkah: tabel transisi "jenis ini dilengkapi langkah apa"
+    A  bool produk x kelompok bahan aktif (retinoid, AHA, BHA, vitamin C, benzoyl peroxide)
+    K  kelompok x kelompok: pasangan bahan aktif yang sebaiknya tidak dipakai bersama
+
+Untuk produk acuan a, skor semua produk = X @ q dengan q = C @ x_a (dinormalisasi):
+produk yang bahannya sama atau sering diformulasikan bersama bahan aktif a mendapat
+skor tinggi. Langkah yang dibutuhkan = baris T untuk jenis produk a, lalu per langkah
+(pembersih -> toner -> serum -> pelembap -> sunscreen) dipilih produk terbaik yang tidak
+bertentangan dengan rutinitas sejauh ini:
+
+    konflik = A @ (K @ g) > 0      g = kelompok aktif produk yang sudah terpilih
+
+(baris A juga disimpan sebagai satu byte bit per produk, jadi cek per langkah = satu AND).
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from .ingredients import gather, normalize_text
+
+ROUTINE_STEPS = ('cleanser', 'toner', 'serum', 'moisturizer', 'sunscreen')
+STEP_LABELS = {'cleanser': 'Pembersih', 'toner': 'Toner', 'serum': 'Serum',
+               'moisturizer': 'Pelembap', 'sunscreen': 'Sunscreen'}
+# Jenis produk -> langkah; aturan pertama yang cocok dipakai. None = bukan langkah harian
+# (masker, scrub, perawatan mata), produk seperti ini tetap bisa menjadi acuan
+_STEP_RULES = (
+    ('sunscreen', re.compile(r'\b(sunscreen|sunblock|spf|sun)\b')),
+    (None, re.compile(r'\b(eye|mask|scrub|peeling|lip)\b')),
+    ('cleanser', re.compile(r'\b(cleanser|cleansing|wash|micellar|foam)\b')),
+    ('toner', re.compile(r'\b(toner|essence|mist)\b')),
+    ('serum', re.compile(r'\b(serum|ampoule|spot|treatment)\b')),
+    ('moisturizer', re.compile(r'\b(moisturi[sz]er|cream|gel|lotion|oil)\b')),
+)
+
+ACTIVE_GROUPS = {
+    'retinoid': re.compile(r'\b(retinol|retinal|retinyl|retinoate|adapalene|tretinoin)\b'),
+    'aha': re.compile(r'\b(glycolic|lactic|mandelic|malic|tartaric) acid\b|\baha\b'),
+    'bha': re.compile(r'\bsalicylic acid\b|\bbetaine salicylate\b|\bbha\b'),
+    # Semua turunan: ascorbyl glucoside, sodium ascorbyl phosphate, 3-o-ethyl ascorbic acid, ...
+    'vitamin_c': re.compile(r'\bascorb(ic|yl|ate)\b|\bvitamin c\b'),
+    'benzoyl_peroxide': re.compile(r'\bbenzoyl peroxide\b'),
+}
+GROUP_LABELS = {'retinoid': 'Retinoid', 'aha': 'AHA', 'bha': 'BHA', 'vitamin_c': 'Vitamin C',
+                'benzoyl_peroxide': 'Benzoyl peroxide'}
+# Iritasi / saling menonaktifkan bila dilapis dalam satu rutinitas
+CONFLICTS = (
+    ('retinoid', 'aha'), ('retinoid', 'bha'), ('retinoid', 'benzoyl_peroxide'),
+    ('retinoid', 'vitamin_c'), ('vitamin_c', 'aha'), ('vitamin_c', 'bha'),
+    ('vitamin_c', 'benzoyl_peroxide'),
+)
+
+
+def routine_step(product_type):
+    """Langkah rutinitas untuk teks product_type, None jika bukan langkah harian"""
+    text = normalize_text(product_type) if isinstance(product_type, str) else ''
+    for step, pattern in _STEP_RULES:
+        if pattern.search(text):
+            return step
+    return None
+
+
+class RoutineBuilder:
+    def __init__(self, df, ingredient_index):
+        n_products = ingredient_index.n_products
+        vocabulary = ingredient_index.vocabulary
+        self.n_products = n_products
+        self.n_ingredients = len(vocabulary)
+        # CSR produk x bahan milik IngredientIndex: bahan baris p = ingredients[offsets[p]:offsets[p + 1]]
+        self.offsets = ingredient_index.product_offsets
+        self.ingredients = ingredient_index.product_ingredients
+        self.rows = np.repeat(np.arange(n_products, dtype=np.int32), np.diff(self.offsets))
+
+        # X: bobot IDF (glycerin / aqua hampir tidak berpengaruh), baris ternormalisasi
+        document_frequency = np.bincount(self.ingredients, minlength=self.n_ingredients)
+        idf = np.log((1 + n_products) / (1 + document_frequency)) + 1.0
+        weights = idf[self.ingredients]
+        row_norms = self._norms(self.rows, weights, n_products)
+        self.values = (weights / row_norms[self.rows]).astype(np.float32)
+
+        # C: cosine antar kolom X berbobot, CSR bahan x bahan. Baris i dibangun dari posting
+        # bahan i: bahan-bahan produk yang mengandung i
+        column_norms = self._norms(self.ingredients, weights, self.n_ingredients)
+        columns, values = [], []
+        for i in range(self.n_ingredients):
+            start, end = ingredient_index.posting_offsets[i:i + 2]
+            neighbours = gather(self.offsets, self.ingredients,
+                                ingredient_index.posting_rows[start:end])
+            row_columns, inverse = np.unique(neighbours, return_inverse=True)
+            dot = np.bincount(inverse, idf[neighbours]) * idf[i]
+            columns.append(row_columns.astype(np.int32))
+            values.append((dot / (column_norms[i] * column_norms[row_columns])).astype(np.float32))
+        self.cooccurrence_offsets = np.zeros(self.n_ingredients + 1, dtype=np.int64)
+        self.cooccurrence_offsets[1:] = np.cumsum([len(row) for row in columns])
+        self.cooccurrence_columns = np.concatenate(columns or [np.zeros(0, dtype=np.int32)])
+        self.cooccurrence_values = np.concatenate(values or [np.zeros(0, dtype=np.float32)])
+
+        # T: jenis produk x langkah. Jenis yang termasuk langkah s dilengkapi langkah lain;
+        # jenis di luar rutinitas (masker, scrub) dilengkapi semua langkah
+        if 'product_type' in df.columns:
+            codes, product_types = pd.factorize(df['product_type'])
+        else:
+            codes, product_types = np.full(n_products, -1), []
+        type_steps = np.array([ROUTINE_STEPS.index(step) if step else -1
+                               for step in map(routine_step, product_types)], dtype=np.int64)
+        self.transitions = type_steps[:, None] != np.arange(len(ROUTINE_STEPS))
+        self.type_codes = codes
+        self.product_steps = np.where(codes >= 0, type_steps[np.maximum(codes, 0)], -1)
+
+        # A: produk x kelompok aktif, K: pasangan kelompok yang bertentangan
+        self.groups = list(ACTIVE_GROUPS)
+        membership = np.array([[bool(ACTIVE_GROUPS[group].search(name)) for group in self.groups]
+                               for name in vocabulary], dtype=bool).reshape(-1, len(self.groups))
+        hits = membership[self.ingredients]
+        self.actives = np.stack([np.bincount(self.rows, hits[:, g], minlength=n_products) > 0
+                                 for g in range(len(self.groups))], axis=1)
+        # Satu bit per kelompok per produk: cek konflik per langkah cukup satu AND
+        self.active_bits = (self.actives @ (2 ** np.arange(len(self.groups)))).astype(np.uint8)
+        self.conflicts = np.zeros((len(self.groups), len(self.groups)), dtype=bool)
+        for a, b in CONFLICTS:
+            self.conflicts[self.groups.index(a), self.groups.index(b)] = True
+        self.conflicts |= self.conflicts.T
+
+    @staticmethod
+    def _norms(keys, weights, n_keys):
+        """Norma L2 per baris / kolom dari nilai berbobot, 1.0 untuk yang kosong"""
+        norms = np.sqrt(np.bincount(keys, weights ** 2, minlength=n_keys))
+        norms[norms == 0] = 1.0
+        return norms
+
+    def scores(self, product_idx):
+        """Skor pelengkap semua produk: X @ (C @ x_a), relatif terhadap produk acuan (1.0)"""
+        # x_a hanya beberapa bahan: cukup baris C untuk bahan itu saja
+        start, end = self.offsets[product_idx:product_idx + 2]
+        own = self.ingredients[start:end]
+        lengths = self.cooccurrence_offsets[own + 1] - self.cooccurrence_offsets[own]
+        columns = gather(self.cooccurrence_offsets, self.cooccurrence_columns, own)
+        weights = (np.repeat(self.values[start:end], lengths)
+                   * gather(self.cooccurrence_offsets, self.cooccurrence_values, own))
+        query = np.bincount(columns, weights, minlength=self.n_ingredients)
+        scores = np.bincount(self.rows, self.values * np.take(query, self.ingredients),
+                             minlength=self.n_products)
+        reference = scores[product_idx]
+        if reference <= 0:
+            return np.zeros(self.n_products, dtype=np.float32)
+        return np.minimum(scores / reference, 1.0)
+
+    def active_groups(self, product_idx):
+        return [self.groups[g] for g in np.flatnonzero(self.actives[product_idx])]
+
+    def _conflicting(self, present):
+        """Mask produk yang bertentangan dengan kelompok aktif `present` (vektor bool)"""
+        forbidden = np.flatnonzero(self.conflicts[present].any(axis=0))
+        return (self.active_bits & np.uint8(np.sum(2 ** forbidden))) != 0
+
+    def avoided(self, product_idx):
+        """Pasangan (aktif acuan, aktif yang dihindari) untuk penjelasan di UI"""
+        present = np.flatnonzero(self.actives[product_idx])
+        return [(self.groups[a], self.groups[b]) for a in present
+                for b in np.flatnonzero(self.conflicts[a]) if b not in present]
+
+    def build(self, product_idx, mask=None):
+        """[(langkah, posisi produk, skor)] dalam urutan rutinitas.
+
+        `mask`: produk yang boleh dipilih (filter brand / jenis kulit, produk aktif).
+        Langkah yang tidak punya produk cocok tanpa konflik dilewati.
+        """
+        scores = self.scores(product_idx)
+        allowed = scores > 0 if mask is None else mask & (scores > 0)
+        allowed[product_idx] = False
+        code = self.type_codes[product_idx]
+        if code >= 0:
+            needed = set(np.flatnonzero(self.transitions[code]).tolist())
+        else:
+            needed = set(range(len(ROUTINE_STEPS)))
+        present = self.actives[product_idx].copy()
+
+        routine = []
+        allowed &= ~self._conflicting(present)
+        for step in sorted(needed):
+            eligible = allowed & (self.product_steps == step)
+            if not eligible.any():
+                continue
+            best = int(np.argmax(np.where(eligible, scores, -np.inf)))
+            routine.append((ROUTINE_STEPS[step], best, float(scores[best])))
+            if self.active_bits[best]:
+                present |= self.actives[best]
+                allowed &= ~self._conflicting(present)
+        return routine
+
+
+def complete_routine(engine, builder, product_idx, filter_brand=None, same_brand_only=False,
+                     filter_skin_type=None):
+    """(DataFrame skema recommend_products + kolom routine_step, pasangan aktif yang dihindari)"""
+    if product_idx >= builder.n_products:
+        return None
+    mask = engine.filter_mask(product_idx, filter_brand, same_brand_only=same_brand_only,
+                              filter_skin_type=filter_skin_type)
+    steps = builder.build(product_idx, mask)
+    result = engine.to_frame(np.array([index for _, index, _ in steps], dtype=np.int64),
+                             np.array([score for _, _, score in steps], dtype=np.float64))
+    result.insert(0, 'routine_step', [step for step, _, _ in steps])
+    return result, builder.avoided(product_idx)
@@ -0,0 +1,501 @@
+"""Layanan HTTP headless di atas RecommenderService (asyncio, tanpa dependency tambahan).
+
+    python -m recommender.server --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoint (request dan response JSON):
+    GET  /health
+    GET  /metrics                      (format teks Prometheus)
+    GET  /debug/profile?action=start|stop|report   (hanya dengan --profiling)
+    GET  /products/<idx>/similar?top_n=5&brand=&product_type=&skin_type=kering,sensitif
+         same_brand=1&different_brand=1
+         mode=hybrid&w_ingredients=0.5&w_benefits=0.3&w_skin_type=0.2   (ranking per kolom)
+         mode=ingredients&measure=jaccard|weighted                      (irisan bahan aktif)
+         lambda=0.7                  (MMR: < 1 = lebih beragam, berlaku juga di /search/text)
+    GET  /products/<idx>/routine?brand=&same_brand=1&skin_type=   (lengkapi rutinitas)
+    GET  /search/ingredients?q=niacinamide AND NOT fragrance&brand=&product_type=&skin_type=
+         limit=20&offset=0&facets=1                  (facets=1: jumlah per facet dalam hasil)
+    GET  /search/text?q=kulit berminyak, jerawat&top_n=5&brand=&product_type=&skin_type=
+    GET  /facets?brand=&product_type=&skin_type=     (jumlah produk per nilai facet)
+    GET  /classify?q=Wardah Acnederm Pure Foaming Cleanser&target=product_type|brand
+    POST /batch   {"requests": [{"endpoint": "similar", "product_idx": 3, "top_n": 5},
+                                {"endpoint": "ingredients", "q": "niacinamide"},
+                                {"endpoint": "routine", "product_idx": 3},
+                                {"endpoint": "text", "q": "kulit kering"},
+                                {"endpoint": "classify", "q": "...", "target": "brand"}]}
+
+Tambahkan `trace=1` ke query string untuk menyertakan rincian waktu per tahap
+(`_trace`) di response JSON.
+
+Setiap worker adalah proses terpisah (fork) yang menerima koneksi dari socket yang
+sama dan memuat artefak sekali saat start. catalog.bin di-mmap sehingga page-nya
+dibagi antar worker lewat page cache. Pekerjaan NumPy dijalankan di thread pool agar
+event loop tetap melayani koneksi lain; artefak yang dibangun ulang dimuat ulang
+otomatis (dicek paling sering sekali per `reload_interval` detik). Request /classify
+yang datang bersamaan digabung menjadi micro-batch (lihat classifier.py) tanpa
+menahan thread pool selama menunggu batch.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .cache import artifact_version
+from .classifier import TARGETS
+from .facets import FACETS
+from .hybrid import FIELDS
+from .metrics import METRICS, profiler, trace
+from .minhash import MEASURES
+from .pagination import ResultPages
+from .service import RecommenderService
+from .similarity import ARTIFACT_DIR
+from .updates import Compactor
+
+MAX_BODY = 1 << 20
+MAX_BATCH = 100
+PRODUCT_COLUMNS = ['index', 'product_name', 'brand', 'product_type', 'skin_type',
+                   'active_ingredients', 'benefits']
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def records(frame):
+    """DataFrame -> list dict yang aman untuk JSON (NaN -> null)"""
+    if frame is None:
+        return []
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient='records')
+
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def _int(params, name, default, minimum=0, maximum=None):
+    value = params.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' harus bilangan bulat")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' di luar rentang")
+    return value
+
+
+def _values(params, name):
+    """Nilai filter facet: 'kering,sensitif' (atau list di batch) -> daftar nilai, None jika kosong"""
+    value = params.get(name)
+    if not value:
+        return None
+    values = value if isinstance(value, list) else str(value).split(',')
+    return [v.strip() for v in values if str(v).strip()] or None
+
+
+def _float(params, name, minimum=0.0, maximum=100.0):
+    try:
+        value = float(params[name])
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' harus bilangan")
+    if not minimum <= value <= maximum:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{name}' di luar rentang")
+    return value
+
+
+def _mmr_lambda(params):
+    """λ MMR dari parameter `lambda` (0-1), None jika tidak diberikan (urutan relevansi)"""
+    return _float(params, 'lambda', 0.0, 1.0) if params.get('lambda') not in (None, '') else None
+
+
+class RecommendationServer:
+    def __init__(self, artifact_dir=ARTIFACT_DIR, threads=None, reload_interval=1.0,
+                 profiling=False):
+        self.artifact_dir = artifact_dir
+        self.reload_interval = reload_interval
+        self.profiling = profiling
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.service = RecommenderService(artifact_dir).warm_up()
+        self._checked_at = time.monotonic()
+        self._reloading = None
+
+    async def _current_service(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            version = artifact_version(self.artifact_dir)
+            # service.version = base+seq saat ada delta; yang dibandingkan hanya artefak dasar
+            if version != self.service.base_version and self._reloading is None:
+                # Versi baru dimuat di thread pool; request lain tetap memakai versi lama
+                loop = asyncio.get_running_loop()
+                self._reloading = loop.run_in_executor(
+                    self.executor, lambda: RecommenderService(self.artifact_dir, version).warm_up())
+                self._reloading.add_done_callback(self._swap_service)
+            elif self._reloading is None:
+                # Update incremental (catalog_delta.pkl) diterapkan tanpa memuat ulang artefak
+                asyncio.get_running_loop().run_in_executor(self.executor, self.service.refresh)
+        return self.service
+
+    def _swap_service(self, future):
+        self._reloading = None
+        if future.exception() is None:
+            self.service = future.result()
+
+    # --- endpoint (dijalankan di thread pool) ---
+
+    def similar(self, service, product_idx, params):
+        filters = dict(filter_brand=params.get('brand') or None,
+                       filter_product_type=params.get('product_type') or None,
+                       filter_skin_type=_values(params, 'skin_type'),
+                       same_brand_only=_flag(params.get('same_brand')),
+                       different_brand_only=_flag(params.get('different_brand')))
+        filters['mmr_lambda'] = _mmr_lambda(params)
+        top_n = _int(params, 'top_n', 5, 1, 100)
+        mode = params.get('mode', 'vector')
+        if mode == 'hybrid':
+            weights = {field: _float(params, f'w_{field}') for field in FIELDS
+                       if f'w_{field}' in params}
+            result = service.recommend_hybrid(product_idx, weights, top_n, **filters)
+        elif mode == 'ingredients':
+            measure = params.get('measure', 'jaccard')
+            if measure not in MEASURES:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"measure tidak dikenal: {measure!r}")
+            result = service.recommend_by_ingredients(product_idx, top_n, measure, **filters)
+        elif mode == 'vector':
+            result = service.recommend(product_idx, top_n, **filters)
+        else:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"mode tidak dikenal: {mode!r}")
+        if result is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Produk {product_idx} tidak ada")
+        return {'product_idx': product_idx, 'results': records(result)}
+
+    def routine(self, service, product_idx, params):
+        result = service.routine(product_idx, filter_brand=params.get('brand') or None,
+                                 same_brand_only=_flag(params.get('same_brand')),
+                                 filter_skin_type=_values(params, 'skin_type'))
+        if result is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Produk {product_idx} tidak ada")
+        steps, avoided = result
+        return {'product_idx': product_idx, 'steps': records(steps),
+                'avoided': [{'active': a, 'avoid': b} for a, b in avoided]}
+
+    def ingredients(self, service, params):
+        query = (params.get('q') or '').strip()
+        if not query:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Parameter 'q' wajib diisi")
+        positions, corrected, suggestions = service.search_ingredients(query)
+        selections = {facet: _values(params, facet) for facet in FACETS}
+        # Jumlah per facet dihitung di dalam hasil pencarian (sebelum filter facet itu sendiri)
+        counts = service.facet_counts(selections, positions) if _flag(params.get('facets')) else None
+        positions = service.filter_positions(positions, selections)
+        # Hanya baris di halaman yang diminta yang dimaterialisasi
+        pages = ResultPages(positions)
+        offset = _int(params, 'offset', 0)
+        limit = _int(params, 'limit', 20, 1, 500)
+        page = service.products(pages.window(offset, limit)).reset_index(names='index')
+        result = {'query': query, 'corrected': corrected, 'suggestions': suggestions,
+                  'total': len(pages), 'offset': offset,
+                  'results': records(page.reindex(columns=PRODUCT_COLUMNS))}
+        if counts is not None:
+            result['facets'] = counts
+        return result
+
+    def facets(self, service, params):
+        selections = {facet: _values(params, facet) for facet in FACETS}
+        return {'selections': selections, 'facets': service.facet_counts(selections)}
+
+    def text(self, service, params):
+        query = (params.get('q') or '').strip()
+        if not query:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Parameter 'q' wajib diisi")
+        result = service.search_text(
+            query, _int(params, 'top_n', 5, 1, 100),
+            filter_brand=params.get('brand') or None,
+            filter_product_type=params.get('product_type') or None,
+            filter_skin_type=_values(params, 'skin_type'),
+            mmr_lambda=_mmr_lambda(params))
+        return {'query': query, 'results': records(result)}
+
+    @staticmethod
+    def _classify_params(params):
+        text = (params.get('q') or '').strip()
+        if not text:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Parameter 'q' wajib diisi")
+        target = params.get('target', 'product_type')
+        if target not in TARGETS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"target tidak dikenal: {target!r}")
+        return text, target
+
+    async def classify(self, service, params):
+        text, target = self._classify_params(params)
+        prediction = await asyncio.wrap_future(service.classifier(target).submit(text))
+        return {'q': text, 'target': target, **prediction}
+
+    def batch_item(self, service, item):
+        if not isinstance(item, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Setiap request batch harus objek JSON")
+        params = {k: v for k, v in item.items() if v is not None}
+        endpoint = params.get('endpoint')
+        if endpoint == 'similar':
+            return self.similar(service, _int(params, 'product_idx', None), params)
+        if endpoint == 'routine':
+            return self.routine(service, _int(params, 'product_idx', None), params)
+        if endpoint == 'ingredients':
+            return self.ingredients(service, params)
+        if endpoint == 'text':
+            return self.text(service, params)
+        if endpoint == 'facets':
+            return self.facets(service, params)
+        if endpoint == 'classify':
+            text, target = self._classify_params(params)
+            return {'q': text, 'target': target, **service.classifier(target).submit(text).result()}
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Endpoint batch tidak dikenal: {endpoint!r}")
+
+    # --- routing ---
+
+    async def _run(self, func, *args):
+        # Konteks disalin agar timer di thread pool tetap masuk ke trace request ini
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, context.run, func, *args)
+
+    async def _batch(self, service, body):
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body bukan JSON yang valid")
+        items = payload.get('requests') if isinstance(payload, dict) else None
+        if not isinstance(items, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body harus berisi daftar 'requests'")
+        if len(items) > MAX_BATCH:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"Maksimal {MAX_BATCH} request per batch")
+
+        async def run_item(item):
+            try:
+                return {'status': 200, **await self._run(self.batch_item, service, item)}
+            except HTTPError as e:
+                return {'status': int(e.status), 'error': e.message}
+            except Exception as e:
+                # Satu item yang gagal (mis. model tidak bisa dimuat) tidak menggagalkan batch
+                return {'status': int(HTTPStatus.INTERNAL_SERVER_ERROR), 'error': str(e)}
+
+        return {'results': await asyncio.gather(*(run_item(item) for item in items))}
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        service = await self._current_service()
+        parts = [unquote(p) for p in path.strip('/').split('/')]
+
+        if path == '/metrics':
+            return METRICS.render_prometheus()
+        if path == '/debug/profile' and self.profiling:
+            action = params.get('action', 'report')
+            if action == 'start':
+                profiler().start()
+            elif action == 'stop':
+                profiler().stop()
+            return {'running': profiler().running, 'samples': profiler().samples,
+                    'top': profiler().report(int(params.get('limit', 20)))}
+        if path == '/health':
+            return {'status': 'ok', 'version': service.version, 'products': len(service),
+                    'pid': os.getpid(), 'cache': service.cache.stats(),
+                    'classifiers': service.classifier_stats(),
+                    'vectors': service.vector_footprint()}
+        if method == 'POST' and path == '/batch':
+            return await self._batch(service, body)
+        if method != 'GET':
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} tidak didukung")
+        if len(parts) == 3 and parts[0] == 'products' and parts[2] in ('similar', 'routine'):
+            if not parts[1].isdigit():
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Indeks produk harus bilangan bulat")
+            handler = self.similar if parts[2] == 'similar' else self.routine
+            return await self._run(handler, service, int(parts[1]), params)
+        if path == '/search/ingredients':
+            return await self._run(self.ingredients, service, params)
+        if path == '/search/text':
+            return await self._run(self.text, service, params)
+        if path == '/facets':
+            return await self._run(self.facets, service, params)
+        if path == '/classify':
+            return await self.classify(service, params)
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"Path {path} tidak ditemukan")
+
+    # --- HTTP/1.1 minimal dengan keep-alive ---
+
+    @staticmethod
+    def _route(path):
+        """Label endpoint untuk metrik (tanpa indeks produk agar kardinalitas tetap kecil)"""
+        if path.startswith('/products/'):
+            return '/products/routine' if path.endswith('/routine') else '/products/similar'
+        if path in ('/health', '/metrics', '/batch', '/search/ingredients', '/search/text',
+                    '/facets', '/classify', '/debug/profile'):
+            return path
+        return 'other'
+
+    @staticmethod
+    def _response(status, payload, keep_alive):
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        status = HTTPStatus(status)
+        head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                f'Content-Type: {content_type}\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    writer.write(self._response(HTTPStatus.BAD_REQUEST,
+                                                {'error': 'Request line tidak valid'}, False))
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY:
+                    writer.write(self._response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                                {'error': 'Body terlalu besar'}, False))
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                url = urlsplit(target)
+                start = time.perf_counter()
+                with trace() as spans:
+                    try:
+                        status, payload = HTTPStatus.OK, await self.dispatch(method, target, body)
+                    except HTTPError as e:
+                        status, payload = e.status, {'error': e.message}
+                    except Exception as e:
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+                METRICS.observe('http_request_seconds', time.perf_counter() - start,
+                                endpoint=self._route(url.path.rstrip('/') or '/'),
+                                status=int(status))
+                if isinstance(payload, dict) and 'trace=1' in url.query:
+                    payload['_trace'] = spans
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, sock):
+        server = await asyncio.start_server(self.handle, sock=sock, limit=MAX_BODY)
+        async with server:
+            await server.serve_forever()
+
+
+def run_worker(sock, artifact_dir, threads, profiling=False):
+    server = RecommendationServer(artifact_dir, threads, profiling=profiling)
+    print(f"Worker {os.getpid()} siap ({len(server.service)} produk, "
+          f"versi {server.service.version})", flush=True)
+    try:
+        asyncio.run(server.serve(sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host='127.0.0.1', port=8000, workers=1, artifact_dir=ARTIFACT_DIR, threads=None,
+          profiling=False, compact_interval=0):
+    sock = socket.create_server((host, port), backlog=1024)
+    print(f"Melayani http://{host}:{port} dengan {workers} worker", flush=True)
+    # Compaction delta periodik cukup di satu proses; worker memuat ulang versi barunya
+    compactor = None
+    if compact_interval > 0:
+        compactor = Compactor(artifact_dir, compact_interval,
+                              log=lambda message: print(message, flush=True))
+    # Tanpa os.fork (Windows) hanya satu worker
+    if workers <= 1 or not hasattr(os, 'fork'):
+        if compactor is not None:
+            compactor.start()
+        run_worker(sock, artifact_dir, threads, profiling)
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                run_worker(sock, artifact_dir, threads, profiling)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    # Thread baru dimulai setelah semua fork selesai
+    if compactor is not None:
+        compactor.start()
+
+    def stop(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    remaining = set(children)
+    try:
+        while remaining:
+            remaining.discard(os.wait()[0])
+    except KeyboardInterrupt:
+        stop(signal.SIGINT, None)
+        for pid in remaining:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+    finally:
+        sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Layanan HTTP rekomendasi skincare')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help='Jumlah proses worker')
+    parser.add_argument('--threads', type=int, default=None, help='Thread per worker')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--profiling', action='store_true',
+                        help='Aktifkan endpoint /debug/profile (sampling profiler)')
+    parser.add_argument('--compact-interval', type=float, default=0,
+                        help='Detik antar compaction catalog_delta.pkl di latar (0 = mati)')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.artifact_dir, args.threads, args.profiling,
+          args.compact_interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,395 @@
+"""Inti rekomendasi tanpa Streamlit, dipakai app.py dan layanan HTTP (server.py).
+
+Satu `RecommenderService` mewakili satu versi artefak: DataFrame produk, registry
+artefak, engine rekomendasi, indeks bahan aktif + fuzzy (dibangun saat pertama
+dipakai) dan cache hasil. Semua method aman dipanggil dari banyak thread.
+
+Update incremental (catalog_delta.pkl, lihat updates.py) diterapkan oleh `refresh()`:
+view katalog baru (artefak dasar + delta) dibangun lalu ditukar dengan satu assignment,
+sehingga request yang sedang berjalan tetap memakai view lamanya sampai selesai.
+"""
+import threading
+
+from .cache import ResultCache, artifact_version
+from .classifier import TARGETS, MicroBatcher, TextClassifier
+from .diversity import DEFAULT_POOL, diversify
+from .engine import RecommendationEngine
+from .fuzzy import FuzzyMatcher
+from .hybrid import HybridRanker, recommend_hybrid
+from .ingredients import IngredientIndex
+from .metrics import timer
+from .minhash import IngredientLSH, recommend_by_ingredients
+from .query import search_by_text
+from .registry import default_registry
+from .routine import RoutineBuilder, complete_routine
+from .similarity import ARTIFACT_DIR, recommend_with_backend
+from .updates import LayeredSimilarity, delta_stamp, live_mask, load_delta, merge_frames
+
+
+def _facet_key(values):
+    """Daftar nilai filter -> tuple terurut (kunci cache); satu nilai / None apa adanya"""
+    if values is None or isinstance(values, str):
+        return values
+    return tuple(sorted(values))
+
+
+class CatalogView:
+    """Satu keadaan katalog yang tidak berubah: data, engine dan indeks turunannya"""
+
+    def __init__(self, version, df, delta=None):
+        self.version = version
+        self.df = df
+        self.delta = delta
+        self.live = live_mask(len(df), delta) if delta is not None else None
+        self.engine = RecommendationEngine(df, live=self.live)
+        # Dibangun saat pertama dipakai (di bawah lock service)
+        self.similarity = None
+        self.hybrid = None
+        self.ingredient_index = None
+        self.ingredient_lsh = None
+        self.fuzzy_matcher = None
+        self.routine_builder = None
+        self.product_type_classifier = None
+
+    def is_live(self, product_idx):
+        return 0 <= product_idx < len(self.df) and (self.live is None or self.live[product_idx])
+
+
+class RecommenderService:
+    def __init__(self, artifact_dir=ARTIFACT_DIR, version=None, cache_items=2048, cache_ttl=3600,
+                 batch_size=64, batch_latency=0.005):
+        self.artifact_dir = artifact_dir
+        self.base_version = version or artifact_version(artifact_dir)
+        # Registry artefak: similarity, vectorizer, PCA, classifier, tokenizer dan
+        # label encoder baru dimuat saat fitur yang membutuhkannya dipakai
+        self.registry = default_registry(artifact_dir)
+        self.cache = ResultCache(max_items=cache_items, ttl=cache_ttl)
+        # Prediksi classifier: cache terpisah (per hash teks) + satu micro-batcher per target
+        self.prediction_cache = ResultCache(max_items=max(cache_items, 1) * 8, ttl=None)
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self._batchers = {}
+        # RLock: fuzzy_matcher membangun ingredient_index di dalam lock yang sama
+        self._lock = threading.RLock()
+        # catalog.bin (mmap, tanpa parsing) jika ada, fallback ke CSV
+        self._view = CatalogView(self.base_version, self.registry.get('catalog')[0])
+        self._delta_stamp = None
+        self.refresh()
+
+    def __len__(self):
+        return len(self._view.df)
+
+    @property
+    def version(self):
+        """Versi artefak dasar, ditambah nomor urut delta jika ada update incremental"""
+        return self._view.version
+
+    @property
+    def df(self):
+        return self._view.df
+
+    @property
+    def engine(self):
+        return self._view.engine
+
+    @property
+    def delta(self):
+        return self._view.delta
+
+    def refresh(self):
+        """Terapkan catalog_delta.pkl jika berubah sejak pemeriksaan terakhir.
+
+        Tanpa perubahan biayanya satu os.stat, aman dipanggil di setiap rerun / request.
+        Mengembalikan True jika view katalog ditukar.
+        """
+        stamp = delta_stamp(self.artifact_dir)
+        if stamp == self._delta_stamp:
+            return False
+        with self._lock:
+            if stamp == self._delta_stamp:
+                return False
+            delta = load_delta(self.artifact_dir, self.base_version) if stamp else None
+            current = self._view.delta
+            if delta is None and current is None:
+                self._delta_stamp = stamp
+                return False
+            base_df = self.registry.get('catalog')[0]
+            version = self.base_version if delta is None else f"{self.base_version}+{delta['seq']}"
+            self._view = CatalogView(version, merge_frames(base_df, delta), delta)
+            self._delta_stamp = stamp
+        return True
+
+    def live_frame(self):
+        """Produk aktif (tanpa tombstone); label index = posisi produk"""
+        view = self._view
+        return view.df if view.live is None else view.df[view.live]
+
+    def _similarity(self, view):
+        if view.delta is None:
+            return self.registry.get('similarity')
+        if view.similarity is None:
+            with self._lock:
+                if view.similarity is None:
+                    view.similarity = LayeredSimilarity(self.registry.get('similarity'),
+                                                        view.delta['vectors'])
+        return view.similarity
+
+    def _hybrid(self, view):
+        if view.delta is None:
+            return self.registry.get('hybrid')
+        if view.hybrid is None:
+            with self._lock:
+                if view.hybrid is None:
+                    view.hybrid = HybridRanker.build(view.df)
+        return view.hybrid
+
+    def _ingredient_index(self, view):
+        if view.ingredient_index is None:
+            with self._lock:
+                if view.ingredient_index is None:
+                    view.ingredient_index = IngredientIndex(view.df)
+        return view.ingredient_index
+
+    def _ingredient_lsh(self, view):
+        if view.ingredient_lsh is None:
+            with self._lock:
+                if view.ingredient_lsh is None:
+                    view.ingredient_lsh = IngredientLSH(self._ingredient_index(view))
+        return view.ingredient_lsh
+
+    def _routine_builder(self, view):
+        if view.routine_builder is None:
+            with self._lock:
+                if view.routine_builder is None:
+                    view.routine_builder = RoutineBuilder(view.df, self._ingredient_index(view))
+        return view.routine_builder
+
+    def _fuzzy_matcher(self, view):
+        if view.fuzzy_matcher is None:
+            with self._lock:
+                if view.fuzzy_matcher is None:
+                    view.fuzzy_matcher = FuzzyMatcher(self._ingredient_index(view))
+        return view.fuzzy_matcher
+
+    def _text_classifier(self, view, target):
+        if target == 'brand':
+            return self.registry.get('brand_classifier')
+        if view.product_type_classifier is None:
+            with self._lock:
+                if view.product_type_classifier is None:
+                    live = view.df if view.live is None else view.df[view.live]
+                    view.product_type_classifier = TextClassifier.for_product_type(live)
+        return view.product_type_classifier
+
+    def classifier(self, target='product_type'):
+        """MicroBatcher untuk `target` (product_type / brand); `submit` aman dari thread mana pun"""
+        if target not in TARGETS:
+            raise ValueError(f"target tidak dikenal: {target!r} (pilih {', '.join(TARGETS)})")
+        batcher = self._batchers.get(target)
+        if batcher is None:
+            with self._lock:
+                batcher = self._batchers.get(target)
+                if batcher is None:
+                    # View dibaca saat batch dijalankan: update katalog langsung terpakai
+                    batcher = MicroBatcher(
+                        lambda texts: self._text_classifier(self._view, target).predict_batch(texts),
+                        max_batch=self.batch_size, max_latency=self.batch_latency,
+                        cache=self.prediction_cache, version=lambda: self._view.version,
+                        name=target)
+                    self._batchers[target] = batcher
+        return batcher
+
+    def classify(self, texts, target='product_type'):
+        """Prediksi per teks (dict label / confidence / alternatives), lewat micro-batch"""
+        with timer('classify_seconds', model=target):
+            return self.classifier(target).predict(texts)
+
+    def classifier_stats(self):
+        return {target: batcher.stats() for target, batcher in self._batchers.items()}
+
+    @property
+    def similarity(self):
+        return self._similarity(self._view)
+
+    @property
+    def ingredient_index(self):
+        return self._ingredient_index(self._view)
+
+    @property
+    def fuzzy_matcher(self):
+        return self._fuzzy_matcher(self._view)
+
+    def vector_footprint(self):
+        """Mode dan ukuran kode jika similarity terkuantisasi sudah dimuat, selain itu None"""
+        if not self.registry.is_loaded('similarity'):
+            return None
+        similarity = self.registry.get('similarity')
+        return similarity.footprint() if hasattr(similarity, 'footprint') else None
+
+    def warm_up(self):
+        """Muat semua yang dibutuhkan endpoint sekaligus (dipakai worker HTTP saat start)"""
+        self.similarity
+        self.fuzzy_matcher
+        self.registry.get('query_embedder')
+        return self
+
+    def _cached(self, view, key, compute):
+        return self.cache.get_or_compute(view.version, key, compute)
+
+    def _diversified(self, view, key, top_n, mmr_lambda, pool):
+        """Top-n dari `pool()` (hasil sebanyak DEFAULT_POOL, ter-cache sendiri) dalam urutan MMR;
+        menggeser λ hanya menjalankan ulang MMR pada pool yang sama"""
+        def compute():
+            result = pool()
+            with timer('diversity_seconds'):
+                return diversify(result, self._similarity(view), top_n, mmr_lambda)
+        return self._cached(view, key + ('mmr', mmr_lambda), compute)
+
+    def recommend(self, product_idx, top_n=5, filter_brand=None, filter_product_type=None,
+                  same_brand_only=False, different_brand_only=False, filter_skin_type=None,
+                  mmr_lambda=None):
+        """Produk serupa (skema recommend_products), None jika indeks di luar katalog / dihapus.
+
+        `mmr_lambda` < 1 mengurutkan ulang pool kandidat dengan MMR (lihat diversity.py).
+        """
+        view = self._view
+        if not view.is_live(product_idx):
+            return None
+        filter_skin_type = _facet_key(filter_skin_type)
+        key = ('recommend', product_idx, top_n, filter_brand, filter_product_type,
+               same_brand_only, different_brand_only, filter_skin_type)
+        filters = dict(filter_brand=filter_brand, filter_product_type=filter_product_type,
+                       same_brand_only=same_brand_only, different_brand_only=different_brand_only,
+                       filter_skin_type=filter_skin_type)
+        if mmr_lambda is not None and mmr_lambda < 1.0:
+            # Pool = kandidat tabel tetangga / ANN yang lolos filter; baris penuh hanya jika < top_n
+            pool_size = max(top_n, DEFAULT_POOL)
+            return self._diversified(view, key, top_n, mmr_lambda, lambda: self._cached(
+                view, key + ('pool',), lambda: recommend_with_backend(
+                    view.engine, self._similarity(view), product_idx, pool_size,
+                    min_results=top_n, **filters)))
+        with timer('recommend_seconds', mode='vector'):
+            return self._cached(view, key, lambda: recommend_with_backend(
+                view.engine, self._similarity(view), product_idx, top_n, **filters))
+
+    def recommend_hybrid(self, product_idx, weights=None, top_n=5, filter_brand=None,
+                         filter_product_type=None, same_brand_only=False,
+                         different_brand_only=False, filter_skin_type=None, mmr_lambda=None):
+        """Seperti `recommend`, tetapi skor = gabungan berbobot bahan aktif / manfaat / jenis kulit"""
+        view = self._view
+        if not view.is_live(product_idx):
+            return None
+        filter_skin_type = _facet_key(filter_skin_type)
+        key = ('hybrid', product_idx, tuple(sorted((weights or {}).items())), top_n,
+               filter_brand, filter_product_type, same_brand_only, different_brand_only,
+               filter_skin_type)
+        if mmr_lambda is not None and mmr_lambda < 1.0:
+            pool_size = max(top_n, DEFAULT_POOL)
+            return self._diversified(view, key, top_n, mmr_lambda, lambda: self.recommend_hybrid(
+                product_idx, weights, pool_size, filter_brand, filter_product_type,
+                same_brand_only, different_brand_only, filter_skin_type))
+        with timer('recommend_seconds', mode='hybrid'):
+            return self._cached(view, key, lambda: recommend_hybrid(
+                view.engine, self._hybrid(view), product_idx, weights, top_n,
+                filter_brand=filter_brand,
+                filter_product_type=filter_product_type,
+                same_brand_only=same_brand_only,
+                different_brand_only=different_brand_only,
+                filter_skin_type=filter_skin_type))
+
+    def recommend_by_ingredients(self, product_idx, top_n=5, measure='jaccard', filter_brand=None,
+                                 filter_product_type=None, same_brand_only=False,
+                                 different_brand_only=False, filter_skin_type=None,
+                                 mmr_lambda=None):
+        """Produk dengan irisan bahan aktif terbesar (MinHash/LSH + skor exact) + bahan yang sama"""
+        view = self._view
+        if not view.is_live(product_idx):
+            return None
+        filter_skin_type = _facet_key(filter_skin_type)
+        key = ('ingredient_set', product_idx, top_n, measure, filter_brand, filter_product_type,
+               same_brand_only, different_brand_only, filter_skin_type)
+        if mmr_lambda is not None and mmr_lambda < 1.0:
+            pool_size = max(top_n, DEFAULT_POOL)
+            return self._diversified(
+                view, key, top_n, mmr_lambda, lambda: self.recommend_by_ingredients(
+                    product_idx, pool_size, measure, filter_brand, filter_product_type,
+                    same_brand_only, different_brand_only, filter_skin_type))
+        with timer('recommend_seconds', mode='ingredients'):
+            return self._cached(view, key, lambda: recommend_by_ingredients(
+                view.engine, self._ingredient_lsh(view), product_idx, top_n, measure,
+                filter_brand=filter_brand,
+                filter_product_type=filter_product_type,
+                same_brand_only=same_brand_only,
+                different_brand_only=different_brand_only,
+                filter_skin_type=filter_skin_type))
+
+    def routine(self, product_idx, filter_brand=None, same_brand_only=False, filter_skin_type=None):
+        """Produk pelengkap per langkah rutinitas: (DataFrame + kolom routine_step, pasangan
+        aktif yang dihindari), None jika indeks di luar katalog / dihapus"""
+        view = self._view
+        if not view.is_live(product_idx):
+            return None
+        filter_skin_type = _facet_key(filter_skin_type)
+        key = ('routine', product_idx, filter_brand, same_brand_only, filter_skin_type)
+        with timer('recommend_seconds', mode='routine'):
+            return self._cached(view, key, lambda: complete_routine(
+                view.engine, self._routine_builder(view), product_idx,
+                filter_brand=filter_brand,
+                same_brand_only=same_brand_only,
+                filter_skin_type=filter_skin_type))
+
+    def search_ingredients(self, query):
+        """Posisi produk yang cocok + koreksi fuzzy: (positions, corrected, saran lain)"""
+        view = self._view
+
+        def search(text):
+            positions = self._ingredient_index(view).search(
+                self._fuzzy_matcher(view).expand_query(text))
+            return positions if view.live is None else positions[view.live[positions]]
+
+        def compute():
+            # Term tanpa hasil persis (typo, singkatan) diganti kandidat fuzzy terbaiknya di
+            # dalam query, klausa AND / NOT lainnya tetap berlaku
+            text, others = self._fuzzy_matcher(view).correct_query(
+                query, self._ingredient_index(view))
+            if text == query:
+                return search(query), None, others
+            return search(text), text, others
+
+        with timer('search_seconds', kind='ingredients'):
+            return self._cached(view, ('ingredients', query), compute)
+
+    def search_text(self, query, top_n=5, filter_brand=None, filter_product_type=None,
+                    filter_skin_type=None, mmr_lambda=None):
+        """Produk untuk deskripsi kebutuhan kulit bebas (skema sama dengan recommend)"""
+        view = self._view
+        filter_skin_type = _facet_key(filter_skin_type)
+        key = ('text', query.strip(), top_n, filter_brand, filter_product_type, filter_skin_type)
+        if mmr_lambda is not None and mmr_lambda < 1.0:
+            pool_size = max(top_n, DEFAULT_POOL)
+            return self._diversified(view, key, top_n, mmr_lambda, lambda: self.search_text(
+                query, pool_size, filter_brand, filter_product_type, filter_skin_type))
+        with timer('search_seconds', kind='text'):
+            return self._cached(view, key, lambda: search_by_text(
+                view.engine, self._similarity(view), self.registry.get('query_embedder'), query,
+                top_n, filter_brand=filter_brand, filter_product_type=filter_product_type,
+                filter_skin_type=filter_skin_type))
+
+    def facet_counts(self, selections=None, positions=None):
+        """{facet: {nilai: jumlah}} untuk produk aktif (atau `positions`) dengan filter facet lain"""
+        view = self._view
+        facets = view.engine.facets
+        with timer('facet_seconds', kind='counts'):
+            if positions is not None:
+                return facets.counts(selections, facets.base_words(positions))
+            key = ('facets', tuple(sorted((f, _facet_key(v)) for f, v in (selections or {}).items())))
+            return self._cached(view, key, lambda: facets.counts(selections))
+
+    def filter_positions(self, positions, selections):
+        """Saring posisi hasil (mis. pencarian bahan aktif) dengan filter facet, urutan tetap"""
+        facets = self._view.engine.facets
+        with timer('facet_seconds', kind='filter'):
+            return positions[facets.mask(selections)[positions]]
+
+    def products(self, positions):
+        return self._view.df.iloc[positions]
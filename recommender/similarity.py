@@ -0,0 +1,249 @@
+"""Backend similarity tanpa matriks N x N.
+
+Hanya vektor produk (TF-IDF -> PCA, dinormalisasi L2) yang disimpan. Satu baris
+similarity dihitung dengan satu perkalian matriks-vektor saat dibutuhkan, dan
+tabel tetangga top-K (CSR) atau indeks IVF (lihat ann.py) opsional bisa dipakai
+untuk jalur cepat. Jika quantized_vectors.npz ada (lihat quantize.py), scan memakai
+kode float16 / int8 / PQ dan hanya kandidat teratas dinilai dengan vektor penuh.
+
+Membuat tabel tetangga:
+    python -m recommender.similarity --k 50
+"""
+import argparse
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .ann import ANN_FILE, IVFIndex
+from .engine import top_k
+from .quantize import QUANTIZED_FILE, load_codes
+
+ARTIFACT_DIR = 'deployment_files'
+NEIGHBORS_FILE = 'neighbors.npz'
+VECTORS_FILE = 'product_vectors.npy'
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def project_texts(vectorizer, pca, texts, batch_size=4096):
+    """Ubah teks bersih menjadi vektor PCA / SVD (float32) tanpa mengubah TF-IDF menjadi dense"""
+    components = pca.components_.T.astype(np.float32)
+    # PCA memusatkan data (mean_); TruncatedSVD (build ulang) tidak
+    mean = getattr(pca, 'mean_', None)
+    offset = (mean @ pca.components_.T).astype(np.float32) if mean is not None else 0.0
+    scale = None
+    if getattr(pca, 'whiten', False):
+        scale = np.sqrt(pca.explained_variance_).astype(np.float32)
+
+    texts = list(texts)
+    out = np.empty((len(texts), components.shape[1]), dtype=np.float32)
+    for start in range(0, len(texts), batch_size):
+        chunk = vectorizer.transform(texts[start:start + batch_size])
+        projected = np.asarray(chunk @ components, dtype=np.float32) - offset
+        if scale is not None:
+            projected /= scale
+        out[start:start + len(projected)] = projected
+    return out
+
+
+def l2_normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def build_neighbor_table(vectors, k=50, block_size=2048):
+    """Tabel top-K tetangga per produk sebagai CSR, baris terurut skor menurun"""
+    n_products = len(vectors)
+    k = min(k, n_products)
+    indices = np.empty((n_products, k), dtype=np.int32)
+    scores = np.empty((n_products, k), dtype=np.float32)
+
+    for start in range(0, n_products, block_size):
+        block = vectors[start:start + block_size] @ vectors.T
+        for offset, row in enumerate(block):
+            best = top_k(row, k)
+            indices[start + offset] = best
+            scores[start + offset] = row[best]
+
+    from scipy import sparse
+
+    indptr = np.arange(0, n_products * k + 1, k, dtype=np.int64)
+    return sparse.csr_matrix((scores.ravel(), indices.ravel(), indptr),
+                             shape=(n_products, n_products))
+
+
+class VectorSimilarity:
+    """Pengganti similarity_matrix: `similarity[idx]` menghasilkan satu baris skor cosine"""
+
+    def __init__(self, vectors, neighbors=None, ann=None, candidate_pool=200, normalized=False):
+        # Vektor yang sudah ternormalisasi (mis. view mmap catalog.bin) dipakai tanpa disalin
+        self.vectors = vectors if normalized else l2_normalize(vectors)
+        self.neighbors = neighbors
+        self.ann = ann
+        self.candidate_pool = candidate_pool
+
+    @classmethod
+    def from_artifacts(cls, df, artifact_dir=ARTIFACT_DIR, text_column='clean_text', vectors=None,
+                       quantized=True):
+        """`vectors` (ternormalisasi, mis. dari catalog.bin) dipakai apa adanya jika diberikan.
+
+        Jika tidak, vektor hasil pipeline build dipakai langsung, atau dihitung dari
+        vectorizer + PCA. Dengan `quantized` dan quantized_vectors.npz yang cocok,
+        hasilnya `QuantizedSimilarity` (vektor penuh dari catalog.bin tetap di mmap).
+        """
+        normalized = vectors is not None
+        vectors_path = os.path.join(artifact_dir, VECTORS_FILE)
+        quantized_path = os.path.join(artifact_dir, QUANTIZED_FILE)
+        quantized = quantized and os.path.exists(quantized_path)
+        if vectors is None and os.path.exists(vectors_path):
+            vectors = np.load(vectors_path)
+            if len(vectors) != len(df):
+                vectors = None
+        if vectors is None:
+            vectorizer = load_pickle(os.path.join(artifact_dir, 'vectorizer.pkl'))
+            pca = load_pickle(os.path.join(artifact_dir, 'pca_model.pkl'))
+            texts = df[text_column].fillna('').astype(str)
+            vectors = project_texts(vectorizer, pca, texts)
+
+        if quantized:
+            codes, rerank = load_codes(quantized_path)
+            # Kode lama (katalog berubah ukuran) diabaikan
+            if len(codes) == len(vectors):
+                return QuantizedSimilarity(codes, vectors if normalized else l2_normalize(vectors),
+                                           rerank=rerank)
+
+        neighbors = None
+        neighbors_path = os.path.join(artifact_dir, NEIGHBORS_FILE)
+        if os.path.exists(neighbors_path):
+            from scipy import sparse
+            neighbors = sparse.load_npz(neighbors_path)
+            # Tabel lama (katalog berubah ukuran) diabaikan
+            if neighbors.shape[0] != len(vectors):
+                neighbors = None
+
+        similarity = cls(vectors, neighbors, normalized=normalized)
+        ann_path = os.path.join(artifact_dir, ANN_FILE)
+        if os.path.exists(ann_path):
+            similarity.ann = IVFIndex.load(ann_path, similarity.vectors)
+        return similarity
+
+    @property
+    def shape(self):
+        return (len(self.vectors), len(self.vectors))
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def score(self, query):
+        """Skor cosine semua produk terhadap vektor query ternormalisasi"""
+        return self.vectors @ query
+
+    def row(self, product_idx):
+        return self.score(self.vectors[product_idx])
+
+    def __getitem__(self, product_idx):
+        return self.row(product_idx)
+
+    def rows(self, indices):
+        """Vektor ternormalisasi untuk beberapa produk (mis. pool kandidat MMR)"""
+        return self.vectors[indices]
+
+    def candidates(self, product_idx):
+        """(indeks, skor) dari tabel tetangga atau indeks ANN, None jika keduanya tidak tersedia"""
+        if self.neighbors is not None:
+            start, end = self.neighbors.indptr[product_idx:product_idx + 2]
+            return self.neighbors.indices[start:end], self.neighbors.data[start:end]
+        if self.ann is not None:
+            return self.ann.search(self.vectors[product_idx], self.candidate_pool)
+        return None
+
+    def with_neighbor_table(self, k=50, block_size=2048):
+        self.neighbors = build_neighbor_table(self.vectors, k, block_size)
+        return self
+
+
+class QuantizedSimilarity(VectorSimilarity):
+    """Scan kasar pada kode terkuantisasi, lalu `rerank` kandidat teratas dinilai exact.
+
+    `vectors` (ternormalisasi, mis. view mmap catalog.bin) hanya dibaca per baris:
+    vektor produk acuan dan baris kandidat. Skor di luar kandidat adalah perkiraan.
+    """
+
+    def __init__(self, codes, vectors, rerank=100):
+        self.codes = codes
+        self.vectors = vectors
+        self.rerank = rerank
+        self.neighbors = None
+        self.ann = None
+        self.candidate_pool = rerank
+
+    def _exact(self, indices, query):
+        # Baris mmap dibaca dalam urutan file
+        order = np.argsort(indices)
+        scores = np.empty(len(indices), dtype=np.float32)
+        scores[order] = self.vectors[indices[order]] @ query
+        return scores
+
+    def score(self, query):
+        scores = self.codes.score(query)
+        best = top_k(scores, self.rerank)
+        scores[best] = self._exact(best, query)
+        return scores
+
+    def candidates(self, product_idx):
+        """`rerank` kandidat dari scan kode, diurutkan ulang dengan skor exact"""
+        query = np.asarray(self.vectors[product_idx], dtype=np.float32)
+        best = top_k(self.codes.score(query), self.rerank)
+        scores = self._exact(best, query)
+        order = np.argsort(-scores, kind='stable')
+        return best[order], scores[order]
+
+    def footprint(self):
+        """Byte kode di memori vs vektor float32 penuh"""
+        full = len(self.codes) * self.vectors.shape[1] * 4
+        return {'mode': self.codes.mode, 'code_bytes': self.codes.nbytes, 'float32_bytes': full,
+                'ratio': full / self.codes.nbytes, 'rerank': self.rerank}
+
+
+def recommend_with_backend(engine, similarity, product_idx, top_n=5, min_results=None, **filters):
+    """Coba tabel tetangga / ANN dulu; hitung baris penuh hanya jika hasil filter kurang dari
+    `min_results` (default top_n; lebih kecil untuk pool MMR yang cukup diisi kandidat)"""
+    if product_idx >= len(similarity):
+        return None
+
+    candidates = similarity.candidates(product_idx)
+    if candidates is not None:
+        indices, scores = candidates
+        result = engine.recommend(scores, product_idx, top_n, candidates=indices, **filters)
+        if len(result) >= (top_n if min_results is None else min_results):
+            return result
+
+    return engine.recommend(similarity.row(product_idx), product_idx, top_n, **filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bangun tabel tetangga top-K (CSR)')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--block-size', type=int, default=2048)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(args.artifact_dir, 'skincare_products.csv'))
+    similarity = VectorSimilarity.from_artifacts(df, args.artifact_dir)
+    similarity.with_neighbor_table(args.k, args.block_size)
+    from scipy import sparse
+
+    path = os.path.join(args.artifact_dir, NEIGHBORS_FILE)
+    sparse.save_npz(path, similarity.neighbors)
+    print(f"Tabel tetangga K={args.k} untuk {len(similarity)} produk disimpan ke {path}")
+
+
+if __name__ == '__main__':
+    main()
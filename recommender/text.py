@@ -0,0 +1,97 @@
+"""Pembersihan teks produk, sama persis dengan langkah preprocessing di notebook.
+
+    product_name_clean        = clean_column(nama, keep='%+'), satuan (50ml, 2g) dibuang
+    active_ingredients_clean  = clean_column(bahan, keep='%+')
+    benefits_clean            = clean_benefits(manfaat): '&' / '+' -> 'dan', hanya huruf
+    text            = gabungan ketiga kolom *_clean
+    normalized_text = normalize(text)  (hanya huruf)
+    clean_text      = stem(normalized_text)  (Sastrawi, tanpa membuang stopword)
+
+`check_parity` membandingkan hasil add_clean_columns dengan CSV yang dikirim
+(deployment_files/skincare_products.csv) agar build ulang tidak diam-diam mengubah
+vektor produk.
+
+Query bebas dari pengguna melewati langkah yang sama lewat `clean_query`; hasil
+stem per kata dan per query di-memoize dengan LRU cache.
+"""
+import re
+from functools import lru_cache
+
+# Sama dengan notebook: tanpa batas kata dan diganti string kosong ('Glad2Glow' -> 'gladlow')
+_UNITS = re.compile(r'\d+(?:[.,]\d+)?\s*(?:ml|gr|g|gram|mg)')
+_SPACES = re.compile(r'\s+')
+CLEAN_COLUMNS = ['product_name_clean', 'active_ingredients_clean', 'benefits_clean', 'text',
+                 'normalized_text', 'clean_text']
+
+_stemmer = None
+
+
+def clean_column(text, keep='', units=False):
+    """Huruf kecil, karakter selain a-z/0-9/`keep` jadi spasi; `units`: buang satuan ukuran"""
+    if not isinstance(text, str):
+        return ''
+    text = text.lower()
+    if units:
+        text = _UNITS.sub('', text)
+    text = re.sub(rf'[^a-z0-9{re.escape(keep)}\s]', ' ', text)
+    return _SPACES.sub(' ', text).strip()
+
+
+def clean_benefits(text):
+    """Kolom benefits: '&' dan '+' dibaca 'dan', angka / persen / tanda baca dibuang"""
+    if not isinstance(text, str):
+        return ''
+    return normalize(text.lower().replace('&', ' dan ').replace('+', ' dan '))
+
+
+def normalize(text):
+    """Hanya huruf a-z dan spasi"""
+    text = re.sub(r'[^a-z\s]', ' ', str(text).lower())
+    return _SPACES.sub(' ', text).strip()
+
+
+def get_stemmer():
+    # Sastrawi diimpor saat pertama dipakai; pembuatan stemmer cukup mahal
+    global _stemmer
+    if _stemmer is None:
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+        _stemmer = StemmerFactory().create_stemmer()
+    return _stemmer
+
+
+@lru_cache(maxsize=65536)
+def stem_word(word):
+    """Stem satu kata; di-memoize karena stemmer Sastrawi lambat untuk kata yang sama"""
+    return get_stemmer().stem(word)
+
+
+def stem(text):
+    return ' '.join(word for word in map(stem_word, text.split()) if word)
+
+
+@lru_cache(maxsize=4096)
+def clean_query(text):
+    """Query bebas -> teks setara kolom clean_text (bersihkan, normalisasi, stem)"""
+    return stem(normalize(clean_column(text, units=True)))
+
+
+def add_clean_columns(df):
+    """Tambahkan kolom *_clean, text, normalized_text dan clean_text ke DataFrame produk"""
+    df = df.copy()
+    df['product_name_clean'] = df['product_name'].map(
+        lambda t: clean_column(t, keep='%+', units=True))
+    df['active_ingredients_clean'] = df['active_ingredients'].map(
+        lambda t: clean_column(t, keep='%+'))
+    df['benefits_clean'] = df['benefits'].map(clean_benefits)
+    df['text'] = (df['product_name_clean'] + ' ' + df['active_ingredients_clean'] + ' '
+                  + df['benefits_clean']).str.strip()
+    df['normalized_text'] = df['text'].map(normalize)
+    df['clean_text'] = df['normalized_text'].map(stem)
+    return df
+
+
+def check_parity(df, columns=CLEAN_COLUMNS):
+    """{kolom: porsi baris yang sama} antara kolom bersih `df` dan hasil add_clean_columns"""
+    rebuilt = add_clean_columns(df)
+    return {column: float((rebuilt[column].fillna('') == df[column].fillna('')).mean())
+            for column in columns if column in df.columns}
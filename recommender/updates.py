@@ -0,0 +1,373 @@
+"""Update katalog incremental tanpa membangun ulang struktur similarity.
+
+Produk baru / berubah di-embed dengan vectorizer.pkl + pca_model.pkl yang ada lalu
+ditambahkan ke `catalog_delta.pkl`; produk yang dihapus atau diganti ditandai
+tombstone (posisinya tetap, tetapi tidak pernah muncul di hasil). Artefak dasar
+(catalog.bin / CSV, product_vectors.npy, neighbors.npz, ann_index.npz) tidak
+disentuh, jadi biaya update sebanding dengan ukuran delta, bukan katalog.
+
+`RecommenderService.refresh()` memeriksa file delta (satu os.stat) dan menukar view
+katalog secara atomik tanpa memuat ulang artefak dasar. Compaction menggabungkan
+delta ke artefak dasar dan membangun ulang tabel tetangga / indeks IVF, sekali jalan
+atau periodik di thread latar (`Compactor`, `--compact-interval` di server.py):
+
+    python -m recommender.updates upsert produk_baru.csv
+    python -m recommender.updates remove "Wardah Lightening Serum" --brand wardah
+    python -m recommender.updates status
+    python -m recommender.updates compact
+"""
+import argparse
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .build import (OUTPUT_COLUMNS, SOURCE_COLUMNS, artifact_hashes, write_artifacts, write_json,
+                    write_pickle)
+from .cache import artifact_version
+from .catalog import DELTA_FILE, MANIFEST_FILE, load_manifest
+from .classifier import fill_product_types
+from .registry import load_frame
+from .similarity import ARTIFACT_DIR, VectorSimilarity, l2_normalize, load_pickle, project_texts
+from .text import add_clean_columns
+
+LOCK_FILE = '.update.lock'
+
+
+def product_key(brand, product_name):
+    """Identitas produk untuk upsert / remove: (brand huruf kecil, nama tanpa spasi di ujung)"""
+    return str(brand).strip().lower(), str(product_name).strip()
+
+
+@contextmanager
+def update_lock(artifact_dir, timeout=60.0):
+    """Satu penulis delta / compaction dalam satu waktu (file lock O_EXCL, lintas platform)"""
+    path = os.path.join(artifact_dir, LOCK_FILE)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{path} masih dipegang proses lain; hapus jika proses itu sudah mati")
+            time.sleep(0.1)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        os.remove(path)
+
+
+def delta_stamp(artifact_dir):
+    """(ukuran, mtime) file delta, None jika tidak ada; cukup satu os.stat"""
+    try:
+        stat = os.stat(os.path.join(artifact_dir, DELTA_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_delta(artifact_dir, base_version=None):
+    """Isi catalog_delta.pkl, None jika tidak ada atau dibuat untuk artefak dasar lain"""
+    path = os.path.join(artifact_dir, DELTA_FILE)
+    if not os.path.exists(path):
+        return None
+    delta = load_pickle(path)
+    if delta['base_version'] != (base_version or artifact_version(artifact_dir)):
+        return None
+    return delta
+
+
+def empty_delta(base_version, dim):
+    return {
+        'base_version': base_version,
+        'seq': 0,
+        'updated_at': None,
+        'rows': pd.DataFrame(columns=OUTPUT_COLUMNS),
+        'vectors': np.empty((0, dim), dtype=np.float32),
+        'tombstones': np.empty(0, dtype=np.int64),
+    }
+
+
+def merge_frames(base_df, delta):
+    """DataFrame gabungan: posisi artefak dasar tetap, baris delta di belakangnya"""
+    if delta is None or len(delta['rows']) == 0:
+        return base_df
+    rows = delta['rows'].reindex(columns=base_df.columns)
+    merged = pd.concat([base_df, rows], ignore_index=True)
+    # concat dengan kolom object menghasilkan object; kembalikan ke dtype ringkas katalog
+    for column, dtype in base_df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            merged[column] = merged[column].astype('category')
+        elif merged[column].dtype != dtype:
+            merged[column] = merged[column].astype(dtype)
+    return merged
+
+
+def live_mask(n_products, delta):
+    live = np.ones(n_products, dtype=bool)
+    if delta is not None:
+        live[delta['tombstones']] = False
+    return live
+
+
+def prepare_rows(df):
+    """Baris upsert (kolom seperti workbook + brand) -> kolom katalog lengkap dengan clean_text"""
+    missing = {'product_name', 'brand'} - set(df.columns)
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(sorted(missing))}")
+    df = df.reindex(columns=SOURCE_COLUMNS + ['brand']).dropna(subset=['product_name', 'brand'])
+    df['product_name'] = df['product_name'].astype(str).str.strip()
+    df['brand'] = df['brand'].astype(str).str.strip().str.lower()
+    # Baris yang sama lebih dari sekali: yang terakhir berlaku
+    df = df.drop_duplicates(subset=['brand', 'product_name'], keep='last')
+    for column in SOURCE_COLUMNS:
+        df[column] = df[column].fillna('')
+    return add_clean_columns(df.reset_index(drop=True))[OUTPUT_COLUMNS]
+
+
+class LayeredSimilarity:
+    """Similarity artefak dasar + vektor delta, tanpa menyalin vektor dasar"""
+
+    def __init__(self, base, delta_vectors):
+        self.base = base
+        self.delta_vectors = np.asarray(delta_vectors, dtype=np.float32)
+        self.n_base = len(base)
+        self._vectors = None
+
+    @property
+    def shape(self):
+        return (len(self), len(self))
+
+    def __len__(self):
+        return self.n_base + len(self.delta_vectors)
+
+    @property
+    def vectors(self):
+        # Disalin hanya jika ada yang butuh satu matriks utuh (mis. ekspor massal)
+        if self._vectors is None:
+            self._vectors = np.vstack([self.base.vectors, self.delta_vectors])
+        return self._vectors
+
+    def vector(self, product_idx):
+        if product_idx < self.n_base:
+            return self.base.vectors[product_idx]
+        return self.delta_vectors[product_idx - self.n_base]
+
+    def rows(self, indices):
+        indices = np.asarray(indices)
+        rows = np.empty((len(indices), self.base.vectors.shape[1]), dtype=np.float32)
+        base = indices < self.n_base
+        rows[base] = self.base.rows(indices[base])
+        rows[~base] = self.delta_vectors[indices[~base] - self.n_base]
+        return rows
+
+    def score(self, query):
+        return np.concatenate([self.base.score(query), self.delta_vectors @ query])
+
+    def row(self, product_idx):
+        return self.score(self.vector(product_idx))
+
+    def __getitem__(self, product_idx):
+        return self.row(product_idx)
+
+    def candidates(self, product_idx):
+        """Kandidat tabel tetangga / ANN dasar + semua produk delta (delta selalu kecil)"""
+        if product_idx >= self.n_base:
+            return None
+        found = self.base.candidates(product_idx)
+        if found is None:
+            return None
+        indices, scores = found
+        extra = self.delta_vectors @ self.base.vectors[product_idx]
+        return (np.concatenate([indices, np.arange(self.n_base, len(self))]),
+                np.concatenate([scores, extra]))
+
+
+def _load_models(artifact_dir):
+    return (load_pickle(os.path.join(artifact_dir, 'vectorizer.pkl')),
+            load_pickle(os.path.join(artifact_dir, 'pca_model.pkl')))
+
+
+def apply_updates(artifact_dir=ARTIFACT_DIR, upserts=None, removals=(), log=print):
+    """Tambah / ganti produk (`upserts`, DataFrame) dan hapus produk (`removals`, pasangan
+    (brand, nama)) lewat catalog_delta.pkl. Mengembalikan ringkasan perubahan."""
+    with update_lock(artifact_dir):
+        base_version = artifact_version(artifact_dir)
+        base_df, _ = load_frame(artifact_dir)
+        vectorizer, pca = _load_models(artifact_dir)
+        delta = (load_delta(artifact_dir, base_version)
+                 or empty_delta(base_version, pca.components_.shape[0]))
+
+        merged = merge_frames(base_df, delta)
+        live = live_mask(len(merged), delta)
+        positions = {product_key(b, n): i for i, (b, n) in
+                     enumerate(zip(merged['brand'], merged['product_name'])) if live[i]}
+
+        tombstones = set(delta['tombstones'].tolist())
+        removed = 0
+        for brand, name in removals:
+            position = positions.pop(product_key(brand, name), None)
+            if position is None:
+                log(f"Tidak ditemukan, dilewati: {brand} / {name}")
+                continue
+            tombstones.add(position)
+            removed += 1
+
+        rows = prepare_rows(upserts) if upserts is not None and len(upserts) else None
+        if rows is not None:
+            rows = fill_product_types(rows, reference=merged[live], log=log)
+        added = replaced = 0
+        if rows is not None:
+            for brand, name in zip(rows['brand'], rows['product_name']):
+                position = positions.get(product_key(brand, name))
+                if position is None:
+                    added += 1
+                else:
+                    tombstones.add(position)
+                    replaced += 1
+            vectors = l2_normalize(project_texts(vectorizer, pca, rows['clean_text']))
+            delta['rows'] = pd.concat([delta['rows'], rows], ignore_index=True)
+            delta['vectors'] = np.vstack([delta['vectors'], vectors]).astype(np.float32)
+
+        delta['tombstones'] = np.array(sorted(tombstones), dtype=np.int64)
+        delta['seq'] += 1
+        delta['updated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        write_pickle(os.path.join(artifact_dir, DELTA_FILE), delta)
+
+    summary = {'seq': delta['seq'], 'added': added, 'replaced': replaced, 'removed': removed,
+               'delta_rows': len(delta['rows']), 'tombstones': len(delta['tombstones']),
+               'live_products': len(base_df) + len(delta['rows']) - len(delta['tombstones'])}
+    log(f"Delta #{summary['seq']}: {added} baru, {replaced} diganti, {removed} dihapus "
+        f"({summary['live_products']} produk aktif)")
+    return summary
+
+
+def compact(artifact_dir=ARTIFACT_DIR, log=print):
+    """Gabungkan delta ke artefak dasar (tombstone dibuang, struktur tetangga dibangun ulang).
+
+    Posisi produk berubah, jadi versi artefak ikut berganti dan layanan yang berjalan
+    memuat ulang versi baru di latar (seperti setelah `recommender.build`).
+    Mengembalikan jumlah produk setelah compaction, None jika tidak ada delta.
+    """
+    with update_lock(artifact_dir):
+        delta = load_delta(artifact_dir)
+        if delta is None:
+            return None
+        start = time.perf_counter()
+        # CSV menyimpan semua kolom (termasuk clean_text); catalog.bin hanya kolom tampilan
+        csv_path = os.path.join(artifact_dir, 'skincare_products.csv')
+        catalog_vectors = None
+        if os.path.exists(csv_path):
+            base_df = pd.read_csv(csv_path)
+        else:
+            base_df, catalog_vectors = load_frame(artifact_dir)
+        base_vectors = VectorSimilarity.from_artifacts(
+            base_df, artifact_dir, vectors=catalog_vectors).vectors
+
+        merged = merge_frames(base_df, delta)
+        live = live_mask(len(merged), delta)
+        catalog = merged[live].reset_index(drop=True)
+        vectors = np.vstack([base_vectors, delta['vectors']])[live]
+        write_artifacts(artifact_dir, catalog, vectors)
+
+        artifacts, version = artifact_hashes(artifact_dir)
+        manifest = load_manifest(artifact_dir)
+        manifest.update({'version': version, 'compacted_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                         'n_products': len(catalog), 'artifacts': artifacts})
+        write_json(os.path.join(artifact_dir, MANIFEST_FILE), manifest)
+        os.remove(os.path.join(artifact_dir, DELTA_FILE))
+    log(f"Compaction: {len(delta['rows'])} baris delta, {len(delta['tombstones'])} tombstone -> "
+        f"{len(catalog)} produk, versi {version} ({time.perf_counter() - start:.1f}s)")
+    return len(catalog)
+
+
+class Compactor:
+    """Thread latar yang menjalankan `compact` setiap `interval` detik jika delta cukup besar"""
+
+    def __init__(self, artifact_dir=ARTIFACT_DIR, interval=600.0, min_changes=1, log=print):
+        self.artifact_dir = artifact_dir
+        self.interval = interval
+        self.min_changes = min_changes
+        self.log = log
+        self._stop = threading.Event()
+        self._thread = None
+
+    def pending_changes(self):
+        delta = load_delta(self.artifact_dir)
+        return 0 if delta is None else len(delta['rows']) + len(delta['tombstones'])
+
+    def run_once(self):
+        if self.pending_changes() >= self.min_changes:
+            return compact(self.artifact_dir, log=self.log)
+        return None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.log(f"Compaction gagal: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='catalog-compactor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def read_table(path):
+    if path.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(path)
+    if path.endswith(('.jsonl', '.json')):
+        return pd.read_json(path, lines=path.endswith('.jsonl'))
+    return pd.read_csv(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Update katalog incremental (delta + tombstone)')
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    upsert = commands.add_parser('upsert', help='Tambah / ganti produk dari CSV, JSON(L) atau .xlsx')
+    upsert.add_argument('path')
+    upsert.add_argument('--brand', help='Brand untuk semua baris jika file tidak punya kolom brand')
+    remove = commands.add_parser('remove', help='Hapus produk berdasarkan nama')
+    remove.add_argument('names', nargs='+')
+    remove.add_argument('--brand', required=True)
+    commands.add_parser('compact', help='Gabungkan delta ke artefak dasar')
+    commands.add_parser('status', help='Ringkasan delta saat ini')
+    args = parser.parse_args()
+
+    if args.command == 'upsert':
+        rows = read_table(args.path)
+        if args.brand:
+            rows['brand'] = args.brand
+        apply_updates(args.artifact_dir, upserts=rows)
+    elif args.command == 'remove':
+        apply_updates(args.artifact_dir, removals=[(args.brand, name) for name in args.names])
+    elif args.command == 'compact':
+        if compact(args.artifact_dir) is None:
+            print("Tidak ada delta untuk digabungkan")
+    else:
+        delta = load_delta(args.artifact_dir)
+        if delta is None:
+            print("Tidak ada delta untuk artefak saat ini")
+        else:
+            print(f"Delta #{delta['seq']} ({delta['updated_at']}): {len(delta['rows'])} baris, "
+                  f"{len(delta['tombstones'])} tombstone")
+
+
+if __name__ == '__main__':
+    main()
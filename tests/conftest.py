@@ -0,0 +1,62 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'deployment_files')
+
+BRANDS = ['avoskin', 'emina', 'glad2glow', 'originote', 'scarlett', 'somethinc', 'wardah', 'whitelab']
+PRODUCT_TYPES = ['Serum', 'Moisturizer', 'Toner', 'Cleanser', 'Sunscreen']
+SKIN_TYPES = ['Normal', 'Kering', 'Berminyak', 'Kombinasi', 'Sensitif']
+INGREDIENTS = ['Niacinamide', 'Retinol', 'Salicylic Acid', 'Ceramide NP', 'Glycerin',
+               'Hyaluronic Acid', 'Centella Asiatica Extract', 'Zinc Oxide', 'Squalane',
+               'Sodium Ascorbyl Phosphate', 'Panthenol', 'Allantoin']
+
+
+def make_products(n_products, seed=0):
+    """Katalog sintetis kecil dengan kolom seperti skincare_products.csv"""
+    rng = np.random.default_rng(seed)
+    picks = [rng.choice(len(INGREDIENTS), rng.integers(2, 6), replace=False)
+             for _ in range(n_products)]
+    brands = rng.choice(BRANDS, n_products)
+    product_types = rng.choice(PRODUCT_TYPES, n_products)
+    return pd.DataFrame({
+        'product_name': [f'{b.title()} {INGREDIENTS[p[0]]} {t} {i}'
+                         for i, (b, t, p) in enumerate(zip(brands, product_types, picks))],
+        'product_type': product_types,
+        'active_ingredients': [', '.join(INGREDIENTS[j] for j in p) for p in picks],
+        'skin_type': rng.choice(SKIN_TYPES, n_products),
+        'benefits': 'Melembapkan',
+        'brand': brands,
+    })
+
+
+def make_vectors(n_products, dim=16, seed=0):
+    """Embedding acak ter-normalisasi L2 (float32)"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n_products, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture(scope='session')
+def shipped_df():
+    """skincare_products.csv yang dikirim (hanya dibaca)"""
+    return pd.read_csv(os.path.join(ARTIFACT_DIR, 'skincare_products.csv'))
+
+
+@pytest.fixture
+def artifact_dir(tmp_path):
+    """Salinan artefak dasar yang boleh ditulis (tanpa catalog.bin / vektor turunan)"""
+    for name in ['skincare_products.csv', 'vectorizer.pkl', 'pca_model.pkl']:
+        shutil.copy(os.path.join(ARTIFACT_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+
+@pytest.fixture(scope='session')
+def synthetic_catalog():
+    """Pabrik (df, vectors) sintetis: synthetic_catalog(n_products, seed=0)"""
+    def build(n_products, seed=0):
+        return make_products(n_products, seed), make_vectors(n_products, seed=seed)
+    return build
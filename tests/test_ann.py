@@ -0,0 +1,21 @@
+import numpy as np
+
+from recommender.ann import IVFIndex
+
+
+def test_search_reads_shared_vectors(synthetic_catalog, tmp_path):
+    _, vectors = synthetic_catalog(500)
+    path = tmp_path / 'vectors.npy'
+    np.save(path, vectors)
+    shared = np.load(path, mmap_mode='r')
+    index = IVFIndex.build(shared, n_lists=10)
+    index.save(tmp_path / 'ann_index.npz')
+    index = IVFIndex.load(tmp_path / 'ann_index.npz', shared)
+    # Vektor tidak disalin per proses
+    assert index.vectors is shared
+
+    # nprobe = semua cluster sama dengan pencarian exact
+    ids, scores = index.search(vectors[7], k=5, nprobe=index.n_lists)
+    exact = np.argsort(-(vectors @ vectors[7]))[:5]
+    assert ids.tolist() == exact.tolist()
+    assert np.allclose(scores, vectors[exact] @ vectors[7], atol=1e-6)
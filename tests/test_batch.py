@@ -0,0 +1,73 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recommender import batch as batch_module
+from recommender.batch import BatchRecommender, write_batches
+from recommender.engine import RecommendationEngine
+from recommender.similarity import VectorSimilarity, recommend_with_backend
+
+N_PRODUCTS = 400
+FILTERS = [
+    {},
+    {'filter_brand': 'wardah'},
+    {'filter_product_type': 'Serum'},
+    {'same_brand_only': True},
+    {'different_brand_only': True},
+]
+
+
+@pytest.fixture(scope='module')
+def catalog(synthetic_catalog):
+    df, vectors = synthetic_catalog(N_PRODUCTS)
+    return RecommendationEngine(df), VectorSimilarity(vectors)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+@pytest.mark.parametrize('workers', [1, 3])
+def test_batch_matches_single_recommendations(catalog, filters, workers):
+    engine, similarity = catalog
+    batch = BatchRecommender(engine, similarity.vectors)
+    # Anggaran memori kecil memaksa banyak blok
+    frames = list(batch.iter_batches(top_n=5, memory_mb=1, workers=workers, **filters))
+    assert len(frames) > 1
+    exported = pd.concat(frames, ignore_index=True)
+
+    for source, rows in exported.groupby('source_index'):
+        single = recommend_with_backend(engine, similarity, int(source), 5, **filters)
+        assert rows['index'].tolist() == single['index'].tolist()
+        assert np.allclose(rows['similarity'], single['similarity'], atol=1e-5)
+        assert rows['rank'].tolist() == list(range(1, len(rows) + 1))
+    assert exported['source_index'].nunique() == N_PRODUCTS - sum(
+        1 for i in range(N_PRODUCTS)
+        if len(recommend_with_backend(engine, similarity, i, 5, **filters)) == 0)
+
+
+def test_only_a_window_of_blocks_is_in_flight(catalog, monkeypatch):
+    engine, similarity = catalog
+    submitted = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(len(args[0]))
+            return super().submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(batch_module, 'ThreadPoolExecutor', CountingExecutor)
+    frames = BatchRecommender(engine, similarity.vectors).iter_batches(
+        top_n=5, memory_mb=1, workers=2)
+    next(frames)
+    assert -(-N_PRODUCTS // submitted[0]) > 4
+    # Jendela `workers` blok (+1 setelah blok pertama diambil), bukan semua blok sekaligus
+    assert len(submitted) <= 3
+    frames.close()
+
+
+def test_parquet_without_pyarrow_is_a_clear_error(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.setitem(sys.modules, 'pyarrow.parquet', None)
+    with pytest.raises(RuntimeError, match='pyarrow'):
+        write_batches(iter([pd.DataFrame({'a': [1]})]), str(tmp_path / 'out.parquet'))
+    assert not list(tmp_path.iterdir())
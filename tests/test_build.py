@@ -0,0 +1,106 @@
+import itertools
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recommender import build as build_module
+from recommender.build import brand_order, build, discover_workbooks, read_workbook
+from recommender.catalog import CATALOG_FILE
+from recommender.similarity import VECTORS_FILE
+
+
+def test_brand_order_follows_shipped_catalog(shipped_df, artifact_dir):
+    shipped = [brand for brand, _ in itertools.groupby(shipped_df['brand'])]
+    assert shipped != sorted(shipped)
+    assert brand_order(artifact_dir, sorted(shipped)) == shipped
+    # Brand baru di akhir; brand yang workbook-nya hilang tidak ikut
+    assert brand_order(artifact_dir, shipped[1:] + ['zzz', 'aaa']) == shipped[1:] + ['aaa', 'zzz']
+
+
+def test_brand_order_without_catalog_is_alphabetical(tmp_path):
+    assert brand_order(str(tmp_path), ['wardah', 'avoskin']) == ['avoskin', 'wardah']
+
+
+def test_read_workbook_keeps_shipped_names(shipped_df, tmp_path):
+    path = os.path.join(tmp_path, 'uji.xlsx')
+    pd.DataFrame({'product_name': [' Serum A ', None, 'Toner B'],
+                  'active_ingredients': ['Niacinamide', 'Retinol', 'Glycerin']}).to_excel(path, index=False)
+    df = read_workbook(path)
+    assert df['product_name'].tolist() == [' Serum A ', 'Toner B']
+    assert (df['brand'] == 'uji').all()
+
+    root = os.path.dirname(os.path.dirname(__file__))
+    workbooks = discover_workbooks(root)
+    if workbooks:
+        names = pd.concat([read_workbook(workbooks[brand])
+                           for brand, _ in itertools.groupby(shipped_df['brand'])], ignore_index=True)
+        assert names['product_name'].tolist() == shipped_df['product_name'].tolist()
+
+
+def write_workbook(path, rows):
+    pd.DataFrame(rows, columns=['product_name', 'product_type', 'active_ingredients',
+                                'skin_type', 'benefits']).to_excel(path, index=False)
+
+
+def test_rebuild_processes_only_changed_brand(tmp_path, monkeypatch):
+    source = tmp_path / 'src'
+    source.mkdir()
+    write_workbook(source / 'alpha.xlsx', [
+        ('Alpha Brightening Serum', 'Serum', 'Niacinamide, Glycerin', 'Semua jenis kulit', 'Mencerahkan kulit'),
+        ('Alpha Gentle Toner', 'Toner', 'Centella Asiatica, Panthenol', 'Kulit sensitif', 'Menenangkan'),
+        ('Alpha Acne Cleanser', 'Cleanser', 'Salicylic Acid, Zinc', 'Kulit berminyak', 'Mengurangi jerawat')])
+    write_workbook(source / 'beta.xlsx', [
+        ('Beta Barrier Cream', 'Moisturizer', 'Ceramide NP, Squalane', 'Kulit kering', 'Melembapkan kulit'),
+        ('Beta Daily Sunscreen', 'Sunscreen', 'Zinc Oxide, Niacinamide', 'Semua jenis kulit', 'Melindungi dari UV')])
+    # Worker di proses yang sama agar panggilan process_brand bisa dihitung
+    processed = []
+    process_brand = build_module.process_brand
+
+    def counted(path):
+        processed.append(os.path.basename(path))
+        return process_brand(path)
+    monkeypatch.setattr(build_module, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(build_module, 'process_brand', counted)
+    quiet = lambda message: None
+
+    incremental = tmp_path / 'incremental'
+    build(str(source), str(incremental), log=quiet)
+    assert sorted(processed) == ['alpha.xlsx', 'beta.xlsx']
+
+    write_workbook(source / 'beta.xlsx', [
+        ('Beta Barrier Cream', 'Moisturizer', 'Ceramide NP, Squalane', 'Kulit kering', 'Melembapkan kulit'),
+        ('Beta Retinol Night Serum', 'Serum', 'Retinol, Bakuchiol', 'Kulit normal', 'Anti penuaan'),
+        ('Beta Daily Sunscreen', 'Sunscreen', 'Zinc Oxide, Niacinamide', 'Semua jenis kulit', 'Melindungi dari UV')])
+    processed.clear()
+    messages = []
+    manifest = build(str(source), str(incremental), log=messages.append)
+    assert processed == ['beta.xlsx']
+    assert 'Embedding: 1/2 brand di-embed ulang' in messages
+
+    # Build bersih dengan vectorizer + PCA yang sama harus menghasilkan artefak yang sama
+    clean = tmp_path / 'clean'
+    clean.mkdir()
+    for name in ['vectorizer.pkl', 'pca_model.pkl']:
+        shutil.copy(incremental / name, clean / name)
+    clean_manifest = build(str(source), str(clean), log=quiet)
+    assert np.allclose(np.load(incremental / VECTORS_FILE), np.load(clean / VECTORS_FILE), atol=1e-6)
+    # catalog.bin menyimpan mtime CSV sumber, jadi hash-nya selalu berbeda antar folder
+    for name, digest in clean_manifest['artifacts'].items():
+        if name != CATALOG_FILE:
+            assert manifest['artifacts'][name] == digest, name
+
+
+@pytest.mark.parametrize('module', ['build', 'updates', 'ann', 'batch', 'quantize'])
+def test_cli_runs_without_double_import(module):
+    # `import recommender` tidak boleh mengimpor modul CLI sebelum runpy menjalankannya
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-m', f'recommender.{module}', '--help'],
+                            cwd=root, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0
+    assert result.stderr == ''
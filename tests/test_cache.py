@@ -0,0 +1,73 @@
+from recommender import cache as cache_module
+from recommender.cache import ResultCache, artifact_version
+from recommender.catalog import CATALOG_FILE, DELTA_FILE
+
+
+def test_lru_eviction_at_max_items():
+    cache = ResultCache(max_items=2)
+    cache.get_or_compute('v1', 'a', lambda: 1)
+    cache.get_or_compute('v1', 'b', lambda: 2)
+    assert cache.get('v1', 'a') == 1  # 'a' baru dipakai, 'b' yang paling lama
+    cache.put('v1', 'c', 3)
+    assert cache.get('v1', 'b') is None
+    assert (cache.get('v1', 'a'), cache.get('v1', 'c')) == (1, 3)
+    assert len(cache) == 2 and cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    assert cache.get_or_compute('v1', 'a', lambda: 1) == 1
+    now[0] += 9
+    assert cache.get_or_compute('v1', 'a', lambda: 2) == 1
+    now[0] += 2
+    assert cache.get_or_compute('v1', 'a', lambda: 3) == 3
+
+
+def test_version_change_drops_every_entry():
+    cache = ResultCache()
+    for key in 'abc':
+        cache.get_or_compute('v1', key, lambda: key)
+    assert cache.get('v2', 'a') is None
+    assert len(cache) == 0 and cache.stats()['evictions'] == 3
+    assert cache.get('v1', 'a') is None
+
+
+def test_put_under_old_version_is_ignored():
+    cache = ResultCache()
+    assert cache.get('v1', 'a') is None
+    # Sesi lain sudah melihat versi baru sebelum hasil lama selesai dihitung
+    assert cache.get('v2', 'b') is None
+    cache.put('v1', 'a', 'lama')
+    assert len(cache) == 0
+    assert cache.get('v2', 'a') is None
+
+
+def test_hit_and_miss_counters():
+    cache = ResultCache()
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute('v1', 'a', lambda: calls.append(1) or 'x')
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert abs(stats['hit_rate'] - 2 / 3) < 1e-9
+
+
+def test_artifact_version_tracks_base_files_only(tmp_path):
+    (tmp_path / 'skincare_products.csv').write_text('product_name\nA\n')
+    (tmp_path / CATALOG_FILE).write_bytes(b'x')
+    version = artifact_version(str(tmp_path))
+
+    (tmp_path / CATALOG_FILE).write_bytes(b'catalog baru')
+    (tmp_path / DELTA_FILE).write_bytes(b'delta')
+    (tmp_path / '.tmp-build').write_bytes(b'sementara')
+    assert artifact_version(str(tmp_path)) == version
+
+    (tmp_path / 'skincare_products.csv').write_text('product_name\nA\nB\n')
+    changed = artifact_version(str(tmp_path))
+    assert changed != version
+    (tmp_path / 'pca_model.pkl').write_bytes(b'model')
+    assert artifact_version(str(tmp_path)) != changed
+    assert artifact_version(str(tmp_path / 'tidak-ada')) == 'missing'
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recommender.cache import ResultCache
+from recommender.classifier import MicroBatcher, TextClassifier, canonical_labels, fill_product_types
+
+
+class Recorder:
+    """predict_batch palsu: mencatat setiap batch, label = teks huruf besar"""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.error is not None:
+            raise self.error
+        return [{'label': text.upper()} for text in texts]
+
+
+@pytest.fixture
+def batcher():
+    batchers = []
+
+    def make(predict_batch, **kwargs):
+        batchers.append(MicroBatcher(predict_batch, **kwargs))
+        return batchers[-1]
+    yield make
+    for item in batchers:
+        item.close()
+
+
+def test_batches_never_exceed_max_batch(batcher):
+    model = Recorder()
+    classifier = batcher(model, max_batch=8, max_latency=0.02)
+    texts = [f'produk {i}' for i in range(200)]
+    results = {}
+
+    def client(chunk):
+        for text, prediction in zip(chunk, classifier.predict(chunk, timeout=10)):
+            results[text] = prediction['label']
+
+    threads = [threading.Thread(target=client, args=(texts[i::8],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {text: text.upper() for text in texts}
+    assert max(len(call) for call in model.calls) <= 8
+    assert len(model.calls) < len(texts)
+    assert classifier.stats()['requests'] == len(texts)
+
+
+def test_lone_request_is_flushed_after_max_latency(batcher):
+    classifier = batcher(Recorder(), max_batch=64, max_latency=0.05)
+    start = time.monotonic()
+    assert classifier.submit('serum').result(timeout=5) == {'label': 'SERUM'}
+    assert 0.04 <= time.monotonic() - start < 2
+
+
+def test_duplicate_texts_are_predicted_once(batcher):
+    model = Recorder()
+    classifier = batcher(model, max_latency=0.2)
+    futures = [classifier.submit(text) for text in ['toner', 'serum', 'toner', ' toner ']]
+    assert [f.result(timeout=5)['label'] for f in futures] == ['TONER', 'SERUM', 'TONER', 'TONER']
+    assert model.calls == [['toner', 'serum']]
+
+
+def test_cache_hits_skip_the_model(batcher):
+    model = Recorder()
+    classifier = batcher(model, max_latency=0.001, cache=ResultCache(), version=lambda: 'v1')
+    assert classifier.predict(['toner'], timeout=5) == [{'label': 'TONER'}]
+    assert classifier.predict(['toner'], timeout=5) == [{'label': 'TONER'}]
+    assert model.calls == [['toner']]
+    assert classifier.stats()['cache_hits'] == 1
+
+
+def test_model_error_reaches_every_future(batcher):
+    classifier = batcher(Recorder(error=RuntimeError('model rusak')), max_latency=0.1)
+    futures = [classifier.submit(text) for text in ['a', 'b', 'a']]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='model rusak'):
+            future.result(timeout=5)
+
+
+def test_product_type_classifier_predicts_held_out_rows(shipped_df):
+    held_out = shipped_df.iloc[::5]
+    classifier = TextClassifier.for_product_type(shipped_df.drop(held_out.index))
+    canonical = canonical_labels(shipped_df['product_type'])
+    predicted = [p['label'] for p in classifier.predict_batch(held_out['product_name'].tolist())]
+    truth = [canonical[label.strip().lower()] for label in held_out['product_type']]
+    assert np.mean(np.array(predicted) == np.array(truth)) >= 0.6
+
+
+def test_fill_product_types_fills_only_blank_rows(shipped_df):
+    df = shipped_df.copy()
+    blank = [3, 50, 120]
+    df.loc[blank[0], 'product_type'] = np.nan
+    df.loc[blank[1], 'product_type'] = ''
+    df.loc[blank[2], 'product_type'] = '  '
+    filled = fill_product_types(df, log=lambda message: None)
+
+    others = df.index.difference(blank)
+    pd.testing.assert_series_equal(filled.loc[others, 'product_type'], df.loc[others, 'product_type'])
+    labels = set(canonical_labels(shipped_df['product_type']).values())
+    assert all(filled.loc[row, 'product_type'] in labels for row in blank)
+    # Input tidak diubah
+    assert pd.isna(df.loc[blank[0], 'product_type'])
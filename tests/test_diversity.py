@@ -0,0 +1,14 @@
+import numpy as np
+
+from recommender.diversity import mmr
+
+
+def test_mmr_without_diversity_keeps_relevance_order():
+    rng = np.random.default_rng(0)
+    relevance = rng.random(50)
+    vectors = rng.standard_normal((50, 8))
+    assert mmr(relevance, vectors, 10, 1.0).tolist() == np.argsort(-relevance)[:10].tolist()
+    # Salinan persis produk teratas tidak dipilih saat keragaman diutamakan
+    vectors[1] = vectors[np.argmax(relevance)]
+    relevance[1] = relevance.max() - 1e-6
+    assert 1 not in mmr(relevance, vectors, 5, 0.3).tolist()
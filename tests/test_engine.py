@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from recommender.engine import RESULT_COLUMNS, RecommendationEngine
+
+FILTERS = [
+    {},
+    {'filter_brand': 'wardah'},
+    {'filter_product_type': 'Serum'},
+    {'filter_brand': 'emina', 'filter_product_type': 'Toner'},
+    {'same_brand_only': True},
+    {'different_brand_only': True},
+]
+
+
+def loop_recommend(df, scores, product_idx, top_n, filter_brand=None, filter_product_type=None,
+                   same_brand_only=False, different_brand_only=False):
+    """Acuan: loop per baris seperti recommend_products sebelum vektorisasi"""
+    target_brand = df['brand'][product_idx]
+    result = []
+    for idx in sorted(range(len(df)), key=lambda i: -scores[i]):
+        brand = df['brand'][idx]
+        if idx == product_idx:
+            continue
+        if same_brand_only and brand != target_brand:
+            continue
+        if different_brand_only and brand == target_brand:
+            continue
+        if filter_brand and brand != filter_brand:
+            continue
+        if filter_product_type and df['product_type'][idx] != filter_product_type:
+            continue
+        result.append(idx)
+        if len(result) >= top_n:
+            break
+    return result
+
+
+@pytest.fixture(scope='module')
+def catalog(synthetic_catalog):
+    df, vectors = synthetic_catalog(300)
+    return df, vectors @ vectors.T
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_recommend_matches_row_loop(catalog, filters):
+    df, similarity = catalog
+    engine = RecommendationEngine(df)
+    for product_idx in [0, 17, 299]:
+        scores = similarity[product_idx]
+        result = engine.recommend(scores, product_idx, top_n=7, **filters)
+        assert list(result.columns) == RESULT_COLUMNS
+        assert result['index'].tolist() == loop_recommend(df, scores, product_idx, 7, **filters)
+        assert np.allclose(result['similarity'], scores[result['index']])
+        assert result['product_name'].tolist() == df['product_name'][result['index']].tolist()
+
+
+def test_recommend_handles_out_of_range_and_tombstones(catalog):
+    df, similarity = catalog
+    assert RecommendationEngine(df).recommend(similarity[0], len(df)) is None
+
+    live = np.ones(len(df), dtype=bool)
+    live[:50] = False
+    result = RecommendationEngine(df, live).recommend(similarity[60], 60, top_n=len(df))
+    assert len(result) == len(df) - 51
+    assert result['index'].min() >= 50
+
+
+def test_missing_product_type_column_is_na():
+    df = pd.DataFrame({'product_name': ['a', 'b', 'c'], 'brand': ['x', 'y', 'x']})
+    result = RecommendationEngine(df).recommend(np.array([1.0, 0.5, 0.9]), 0, top_n=5)
+    assert result['index'].tolist() == [2, 1]
+    assert (result['product_type'] == 'N/A').all()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from recommender.facets import SKIN_TYPES, FacetIndex, skin_types
+
+
+def expected(df, selections, live, base, exclude=None):
+    """Mask filter dengan pandas isin, per facet seperti FacetIndex.words"""
+    mask = live & base
+    for facet, values in selections.items():
+        if facet == exclude:
+            continue
+        if facet == 'skin_type':
+            mask &= df['skin_type'].map(lambda text: bool(set(skin_types(text)) & set(values))).to_numpy()
+        else:
+            mask &= df[facet].isin(values).to_numpy()
+    return mask
+
+
+def test_query_matches_pandas(synthetic_catalog):
+    df, _ = synthetic_catalog(500, seed=3)
+    df = df.copy()
+    df.loc[::7, 'skin_type'] = 'Semua jenis kulit'
+    rng = np.random.default_rng(3)
+    live = rng.random(len(df)) > 0.1
+    facets = FacetIndex(df, live=live)
+    for _ in range(50):
+        selections = {'brand': list(rng.choice(facets.values('brand'), rng.integers(1, 4))),
+                      'product_type': list(rng.choice(facets.values('product_type'), rng.integers(1, 3))),
+                      'skin_type': list(rng.choice(SKIN_TYPES, rng.integers(1, 3)))}
+        base_positions = np.flatnonzero(rng.random(len(df)) > 0.3)
+        base = np.zeros(len(df), dtype=bool)
+        base[base_positions] = True
+
+        positions, counts = facets.query(selections, facets.base_words(base_positions))
+        assert positions.tolist() == np.flatnonzero(expected(df, selections, live, base)).tolist()
+        for facet in ('brand', 'product_type'):
+            others = expected(df, selections, live, base, exclude=facet)
+            truth = df.loc[others, facet].value_counts()
+            assert counts[facet] == {value: int(truth.get(value, 0)) for value in counts[facet]}
+        others = expected(df, selections, live, base, exclude='skin_type')
+        truth = df.loc[others, 'skin_type'].map(skin_types).explode().value_counts()
+        assert counts['skin_type'] == {value: int(truth.get(value, 0)) for value in counts['skin_type']}
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from recommender.fuzzy import FuzzyMatcher
+from recommender.ingredients import IngredientIndex
+
+
+@pytest.fixture(scope='module')
+def index(shipped_df):
+    return IngredientIndex(shipped_df)
+
+
+@pytest.fixture(scope='module')
+def matcher(index):
+    return FuzzyMatcher(index)
+
+
+def test_synonyms_are_expanded_per_term(index, matcher):
+    expanded = matcher.expand_query('vit c AND niacinamide')
+    assert 'ascorbic acid' in expanded and expanded.endswith(' AND niacinamide')
+    vitamin_c = index.search(matcher.expand_query('vit c'))
+    expected = np.intersect1d(vitamin_c, index.search('niacinamide'))
+    assert len(expected) > 0
+    assert np.array_equal(index.search(expanded), expected)
+
+
+def test_fuzzy_correction_keeps_other_clauses(index, matcher):
+    corrected, others = matcher.correct_query('niacinamde AND NOT retinol', index)
+    assert corrected == 'niacinamide AND NOT retinol'
+    # Term yang sudah punya hasil tidak diganti
+    assert matcher.correct_query('niacinamide AND NOT retinol', index)[0] == \
+        'niacinamide AND NOT retinol'
+    assert isinstance(others, list)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from recommender import hybrid
+from recommender.engine import RecommendationEngine
+from recommender.hybrid import FIELDS, HybridRanker, recommend_hybrid
+
+
+@pytest.fixture(scope='module')
+def catalog(shipped_df):
+    return RecommendationEngine(shipped_df), HybridRanker.build(shipped_df)
+
+
+def field_block(ranker, field):
+    i = ranker.fields.index(field)
+    return ranker.matrix[:, ranker.offsets[i]:ranker.offsets[i + 1]]
+
+
+@pytest.mark.parametrize('field', FIELDS)
+def test_one_hot_weights_rank_like_single_field_cosine(catalog, field):
+    engine, ranker = catalog
+    weights = {f: 1.0 if f == field else 0.0 for f in FIELDS}
+    block = field_block(ranker, field)
+    for product in (0, 42, 150):
+        cosine = block @ block[product]
+        assert np.allclose(ranker.row(product, weights), cosine, atol=1e-5)
+        result = recommend_hybrid(engine, ranker, product, weights, top_n=10)
+        exact = engine.recommend(cosine, product, 10)
+        assert np.allclose(result['similarity'], exact['similarity'], atol=1e-5)
+        if field != 'skin_type':  # multi-hot jenis kulit penuh skor seri
+            assert result['index'].tolist() == exact['index'].tolist()
+
+
+def test_weights_change_only_the_fused_score(catalog, monkeypatch):
+    _, ranker = catalog
+    matrix = ranker.matrix.copy()
+
+    def rebuilt(*args, **kwargs):
+        raise AssertionError('vektor per kolom dibangun ulang')
+    monkeypatch.setattr(hybrid, 'field_vectors', rebuilt)
+
+    indices = np.arange(len(ranker))
+    per_field = ranker.field_scores(7, indices)
+    for weights in ({'ingredients': 1, 'benefits': 0, 'skin_type': 0},
+                    {'ingredients': 0.2, 'benefits': 0.5, 'skin_type': 0.3},
+                    {'ingredients': 3, 'benefits': 1, 'skin_type': 0}):
+        fused = sum(weights[f] * per_field[f] for f in FIELDS) / sum(weights.values())
+        assert np.allclose(ranker.row(7, weights), fused, atol=1e-5)
+        assert np.allclose(ranker.scores([7], weights)[0], fused, atol=1e-5)
+        for field, values in ranker.field_scores(7, indices).items():
+            assert np.array_equal(values, per_field[field])
+    assert np.array_equal(ranker.matrix, matrix)
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from PIL import Image
+
+from recommender.images import ImageIndex, ThumbnailCache, image_key
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+
+
+def write_image(path, color=(200, 30, 30), fmt=None):
+    Image.new('RGB', (40, 20), color).save(path, format=fmt)
+
+
+def test_percent_matches_underscore_file():
+    assert image_key('Niacinamide 10%') == image_key('Niacinamide 10_')
+    assert image_key(' Serum 10% + Zinc\n') == 'serum 10 + zinc'
+    index = ImageIndex(['somethinc', 'Avoskin'], ROOT)
+    path = index.resolve('Somethinc 10% Niacinamide Barrier Serum', 'somethinc')
+    assert os.path.basename(path) == 'Somethinc 10_ Niacinamide Barrier Serum.jpg'
+    name = 'Avoskin Your Skin Bae Lactic Acid 10% + Kiwi Fruit 5% + Niacinamide 2,5% High Dose Serum'
+    assert index.resolve(name, 'AVOSKIN') is not None
+
+
+def test_wardah_webp_is_resolved():
+    index = ImageIndex(['wardah'], ROOT)
+    path = index.resolve('Wardah Acnederm Acne Care Serum', 'wardah')
+    assert path is not None and path.endswith('.webp')
+    assert index.resolve('Wardah Produk Tanpa Gambar', 'wardah') is None
+
+
+def test_extension_preference_order(tmp_path):
+    (tmp_path / 'merk').mkdir()
+    for ext, fmt in (('.webp', 'WEBP'), ('.PNG', 'PNG'), ('.jpeg', 'JPEG')):
+        write_image(tmp_path / 'merk' / f'Toner A{ext}', fmt=fmt)
+    write_image(tmp_path / 'merk' / 'Toner B.webp', fmt='WEBP')
+    write_image(tmp_path / 'merk' / 'Toner B.png')
+    (tmp_path / 'merk' / 'Toner C.gif').write_bytes(b'bukan gambar terindeks')
+
+    index = ImageIndex(['merk'], str(tmp_path))
+    assert os.path.basename(index.resolve('Toner A', 'merk')) == 'Toner A.jpeg'
+    assert os.path.basename(index.resolve('Toner B', 'merk')) == 'Toner B.png'
+    assert index.resolve('Toner C', 'merk') is None
+    assert len(index) == 2
+
+
+def test_thumbnail_name_follows_source_content(tmp_path):
+    (tmp_path / 'merk').mkdir()
+    source = tmp_path / 'merk' / 'Serum.png'
+    write_image(source)
+    cache = ThumbnailCache(ImageIndex(['merk'], str(tmp_path)), str(tmp_path / 'cache'))
+    first = cache.ensure(str(source))
+    assert os.path.exists(first) and cache.thumbnail_path(str(source)) == first
+    with Image.open(first) as thumbnail:
+        assert (thumbnail.format, thumbnail.size) == ('JPEG', (320, 320))
+
+    write_image(source, color=(10, 120, 240))
+    os.utime(source, ns=(0, os.stat(source).st_mtime_ns + 10**9))
+    second = cache.ensure(str(source))
+    assert second != first and os.path.exists(second)
+    # Hash yang disimpan dipakai lagi oleh cache baru tanpa membaca ulang sumber
+    cache.save_hashes()
+    assert ThumbnailCache(cache.index, cache.cache_dir).thumbnail_path(str(source)) == second
+
+
+@pytest.mark.parametrize('blocked', ['read-only', 'file'])
+def test_ensure_returns_none_when_cache_dir_is_not_writable(tmp_path, blocked):
+    (tmp_path / 'merk').mkdir()
+    source = tmp_path / 'merk' / 'Serum.png'
+    write_image(source)
+    if blocked == 'read-only':
+        cache_dir = tmp_path / 'cache'
+        cache_dir.mkdir()
+        cache_dir.chmod(0o555)
+        if os.access(cache_dir, os.W_OK):
+            pytest.skip('root tetap bisa menulis ke folder read-only')
+    else:
+        (tmp_path / 'berkas').write_bytes(b'')
+        cache_dir = tmp_path / 'berkas' / 'cache'
+    try:
+        cache = ThumbnailCache(ImageIndex(['merk'], str(tmp_path)), str(cache_dir))
+        assert cache.ensure(str(source)) is None
+        # get() tetap mengembalikan thumbnail yang dirender di memori
+        assert cache.get('Serum', 'merk')[:2] == b'\xff\xd8'
+    finally:
+        if blocked == 'read-only':
+            cache_dir.chmod(0o755)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from recommender import ingredients
+from recommender.ingredients import IngredientIndex, normalize_text, query_spans, rewrite_terms
+
+
+@pytest.fixture(scope='module')
+def index(shipped_df):
+    return IngredientIndex(shipped_df)
+
+
+def test_operators_are_case_insensitive(index):
+    expected = index.search('niacinamide AND NOT glycerin')
+    assert np.array_equal(index.search('niacinamide and not glycerin'), expected)
+    assert np.array_equal(index.search('Niacinamide And Not Glycerin'), expected)
+    # Pengecualian benar-benar diterapkan, bukan dibaca sebagai satu term biasa
+    assert 0 < len(expected) < len(index.search('niacinamide'))
+    assert len(np.intersect1d(expected, index.search('glycerin'))) == 0
+
+
+@pytest.mark.parametrize('query', ['niacinamide AND', 'niacinamide OR', 'AND niacinamide',
+                                   'niacinamide AND NOT', '(niacinamide', 'niacinamide )'])
+def test_dangling_operators_are_ignored(index, query):
+    assert np.array_equal(index.search(query), index.search('niacinamide'))
+
+
+@pytest.mark.parametrize('query', ['NOT', 'AND', 'NOT glycerin', 'not (glycerin OR niacinamide)',
+                                   'niacinamide OR NOT glycerin', ''])
+def test_negation_only_queries_are_rejected(index, query):
+    assert len(index.search(query)) == 0
+
+
+@pytest.mark.parametrize('query', ['niacinamide ) OR retinol', ') niacinamide OR retinol',
+                                   'niacinamide )) OR (retinol'])
+def test_unmatched_close_paren_keeps_rest_of_query(index, query):
+    expected = index.search('niacinamide OR retinol')
+    assert len(expected) > len(index.search('niacinamide'))
+    assert np.array_equal(index.search(query), expected)
+
+
+@pytest.mark.parametrize('term', ['niacinamide', 'acid', 'hyaluronic acid', 'c serum', 'ide ser',
+                                  'wardah', 'x', 'tidak ada'])
+def test_term_matches_substring_scan(index, shipped_df, term):
+    names = [normalize_text(name) for name in shipped_df['product_name'].fillna('')]
+    expected = [row for row, name in enumerate(names)
+                if term in name or any(term in ingredient for ingredient in index.ingredients_of(row))]
+    assert index.term_rows(term).tolist() == expected
+
+
+def test_strength_is_part_of_the_term(index, shipped_df):
+    rows = index.search('niacinamide 10%')
+    assert len(rows) > 0
+    assert set(rows) <= set(index.search('niacinamide'))
+    for row in rows:
+        assert '10%' in shipped_df['product_name'][row].replace(' ', '') or \
+            'niacinamide (10%)' in shipped_df['active_ingredients'][row].lower()
+    assert set(rows) <= set(index.search('10%'))
+    # Konsentrasi di daftar INCI ('Glycolic Acid (0.5%)') juga bisa dicari
+    assert len(index.search('glycolic acid 0,5%')) > 0
+
+
+def test_term_cache_is_bounded(index, monkeypatch):
+    monkeypatch.setattr(ingredients, 'TERM_CACHE_SIZE', 8)
+    for i in range(20):
+        index.term_rows(f'unknown ingredient {i}')
+    assert len(index._term_cache) <= 8
+
+
+def test_rewrite_terms_keeps_operators_and_spacing():
+    query = '(vit c or niacinamide 10%) AND NOT  fragrance'
+    assert [token for _, _, token in query_spans(query)] == [
+        '(', 'vit c', 'OR', 'niacinamide 10%', ')', 'AND', 'NOT', 'fragrance']
+    assert rewrite_terms(query, str.upper) == '(VIT C or NIACINAMIDE 10%) AND NOT  FRAGRANCE'
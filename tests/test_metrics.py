@@ -0,0 +1,63 @@
+import re
+import threading
+
+from recommender.metrics import BUCKETS, Metrics, timer, trace
+
+
+def samples(text, name):
+    """{label string: nilai} untuk baris sampel `name` di teks Prometheus"""
+    pattern = re.compile(rf'^skincare_{name}(\{{.*\}})? (\S+)$')
+    return {m.group(1) or '': float(m.group(2))
+            for m in map(pattern.match, text.splitlines()) if m}
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    values = [0.0001, 0.0007, 0.003, 0.003, 0.2, 4.0, 30.0]
+    for seconds in values:
+        metrics.observe('recommend_seconds', seconds, mode='vector')
+    text = metrics.render_prometheus()
+    assert '# TYPE skincare_recommend_seconds histogram' in text
+
+    buckets = samples(text, 'recommend_seconds_bucket')
+    counts = [buckets[f'{{mode="vector",le="{bound}"}}'] for bound in BUCKETS]
+    assert counts == [sum(v <= bound for v in values) for bound in BUCKETS]
+    assert counts == sorted(counts)
+    count = samples(text, 'recommend_seconds_count')['{mode="vector"}']
+    assert buckets['{mode="vector",le="+Inf"}'] == count == len(values)
+    assert abs(samples(text, 'recommend_seconds_sum')['{mode="vector"}'] - sum(values)) < 1e-9
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.inc('cache_requests_total', result='a"b\\c\nd')
+    metrics.observe('search_seconds', 0.01, query='"x"')
+    text = metrics.render_prometheus()
+    assert 'skincare_cache_requests_total{result="a\\"b\\\\c\\nd"} 1' in text
+    assert 'skincare_search_seconds_count{query="\\"x\\""} 1' in text
+    # Newline di nilai label tidak memecah baris sampel
+    assert all(line.startswith(('#', 'skincare_')) for line in text.strip().splitlines())
+
+
+def timed_block(name):
+    with timer(name):
+        pass
+
+
+def test_trace_collects_spans_only_inside_its_block():
+    timed_block('before_seconds')
+    with trace() as spans:
+        with timer('inside_seconds', step='a'):
+            with timer('nested_seconds'):
+                pass
+        # Thread lain punya konteks sendiri
+        worker = threading.Thread(target=timed_block, args=('thread_seconds',))
+        worker.start()
+        worker.join()
+    timed_block('after_seconds')
+
+    assert [span['span'] for span in spans] == ['nested_seconds', 'inside_seconds']
+    assert spans[1]['step'] == 'a' and spans[1]['ms'] >= spans[0]['ms'] >= 0
+    with trace() as again:
+        pass
+    assert again == []
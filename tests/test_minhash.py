@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from recommender.engine import RecommendationEngine
+from recommender.ingredients import IngredientIndex
+from recommender.minhash import IngredientLSH, recommend_by_ingredients
+
+
+@pytest.fixture(scope='module')
+def catalog(synthetic_catalog):
+    df, _ = synthetic_catalog(300)
+    df = df.copy()
+    df.loc[5, 'active_ingredients'] = ''
+    index = IngredientIndex(df)
+    return df, index, IngredientLSH(index)
+
+
+def ingredient_sets(index):
+    return [set(index.ingredients_of(row)) for row in range(index.n_products)]
+
+
+def test_scores_match_brute_force(catalog):
+    _, index, lsh = catalog
+    sets = ingredient_sets(index)
+    frequency = {}
+    for names in sets:
+        for name in names:
+            frequency[name] = frequency.get(name, 0) + 1
+    idf = {name: np.log((1 + len(sets)) / (1 + count)) + 1.0 for name, count in frequency.items()}
+
+    for product in (0, 17, 123):
+        query = sets[product]
+        jaccard = [len(query & other) / len(query | other) if query | other else 0.0
+                   for other in sets]
+        weighted = [sum(idf[n] for n in query & other) / sum(idf[n] for n in query | other)
+                    if query | other else 0.0 for other in sets]
+        assert np.allclose(lsh.scores(product), jaccard)
+        assert np.allclose(lsh.scores(product, measure='weighted'), weighted)
+    with pytest.raises(ValueError):
+        lsh.scores(0, measure='cosine')
+
+
+def test_identical_sets_are_always_candidates(catalog):
+    _, index, lsh = catalog
+    sets = ingredient_sets(index)
+    for product, query in enumerate(sets):
+        if not query:
+            continue
+        twins = {other for other, names in enumerate(sets) if names == query}
+        assert twins <= set(lsh.candidates(product).tolist())
+
+
+def test_product_without_ingredients_has_no_results(catalog):
+    df, _, lsh = catalog
+    assert len(lsh.candidates(5)) == 0
+    result = recommend_by_ingredients(RecommendationEngine(df), lsh, 5, top_n=5)
+    assert len(result) == 0
+
+
+def test_few_candidates_fall_back_to_full_scan(catalog, monkeypatch):
+    df, _, lsh = catalog
+    engine = RecommendationEngine(df)
+    monkeypatch.setattr(lsh, 'candidates', lambda product_idx: np.array([1], dtype=np.int32))
+    result = recommend_by_ingredients(engine, lsh, 0, top_n=5)
+    exact = engine.recommend(lsh.scores(0), 0, 5)
+    assert result['index'].tolist() == exact['index'].tolist()
+
+
+def test_shared_ingredients_column(catalog):
+    df, index, lsh = catalog
+    sets = ingredient_sets(index)
+    result = recommend_by_ingredients(RecommendationEngine(df), lsh, 0, top_n=5)
+    assert len(result) == 5
+    for other, shared in zip(result['index'], result['shared_ingredients']):
+        assert set(shared.split(', ')) == sets[0] & sets[other]
+
+
+def test_recall_on_shipped_catalog(shipped_df):
+    # Recall top-5 LSH terhadap scan exact; turun di bawah ini berarti band / baris berubah
+    engine = RecommendationEngine(shipped_df)
+    lsh = IngredientLSH(IngredientIndex(shipped_df))
+    hits = total = 0
+    for product in range(len(shipped_df)):
+        found = recommend_by_ingredients(engine, lsh, product, top_n=5)
+        exact = engine.recommend(lsh.scores(product), product, 5)
+        exact = exact[exact['similarity'] > 0]
+        hits += len(set(found['index']) & set(exact['index']))
+        total += len(exact)
+    assert hits / total >= 0.75
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from recommender.pagination import ResultPages
+
+
+@pytest.fixture
+def pages():
+    return ResultPages(np.arange(100, 145), page_size=10)
+
+
+def test_clamp_and_page_at_the_edges(pages):
+    assert pages.n_pages == 5
+    assert [pages.clamp(page) for page in (-3, 0, 1, 5, 6, 99)] == [1, 1, 1, 5, 5, 5]
+    assert pages.page(0).tolist() == list(range(100, 110))
+    assert pages.page(3).tolist() == list(range(120, 130))
+    # Halaman terakhir berisi sisa; lewat halaman terakhir = halaman terakhir
+    assert pages.page(5).tolist() == list(range(140, 145))
+    assert pages.page(12).tolist() == pages.page(5).tolist()
+
+
+def test_empty_result_has_one_empty_page():
+    pages = ResultPages([], page_size=20)
+    assert (len(pages), pages.n_pages) == (0, 1)
+    assert [pages.clamp(page) for page in (0, 1, 3)] == [1, 1, 1]
+    assert len(pages.page(0)) == len(pages.page(2)) == 0
+    assert pages.label(1) == 'Menampilkan 0–0 dari 0 produk'
+    assert len(pages.window(0, 10)) == 0
+
+
+def test_label_text(pages):
+    assert pages.label(1) == 'Menampilkan 1–10 dari 45 produk'
+    assert pages.label(2) == 'Menampilkan 11–20 dari 45 produk'
+    assert pages.label(5) == 'Menampilkan 41–45 dari 45 produk'
+    assert pages.label(0) == pages.label(1)
+    assert pages.label(9) == pages.label(5)
+
+
+def test_window_offset_and_limit(pages):
+    assert pages.window(0, 3).tolist() == [100, 101, 102]
+    assert pages.window(43, 10).tolist() == [143, 144]
+    assert pages.window(-5, 2).tolist() == [100, 101]
+    assert len(pages.window(45, 10)) == 0
+    assert len(pages.window(10, 0)) == len(pages.window(10, -4)) == 0
+    # Tidak dibatasi ukuran halaman
+    assert len(pages.window(5, 25)) == 25
+
+
+def test_page_size_is_at_least_one():
+    pages = ResultPages(range(3), page_size=0)
+    assert (pages.page_size, pages.n_pages) == (1, 3)
+    assert pages.page(2).tolist() == [1]
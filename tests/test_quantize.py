@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+from recommender import quantize
+from recommender.catalog import SOURCE_FILE
+from recommender.quantize import QUANTIZED_FILE, load_codes
+from recommender.registry import load_frame
+from recommender.similarity import QuantizedSimilarity
+
+
+@pytest.mark.parametrize('keep_csv', [True, False])
+def test_cli_writes_codes_for_csv_or_catalog(artifact_dir, shipped_df, monkeypatch, keep_csv):
+    if not keep_csv:
+        # Deploy yang hanya membawa catalog.bin
+        load_frame(artifact_dir)
+        os.remove(os.path.join(artifact_dir, SOURCE_FILE))
+    monkeypatch.setattr(sys, 'argv', ['quantize', '--artifact-dir', artifact_dir, '--rerank', '50'])
+    quantize.main()
+
+    codes, rerank = load_codes(os.path.join(artifact_dir, QUANTIZED_FILE))
+    assert rerank == 50 and len(codes) == len(shipped_df)
+    assert not [name for name in os.listdir(artifact_dir) if name.startswith('.tmp-')]
+
+
+def test_int8_codes_keep_top_k(synthetic_catalog):
+    _, vectors = synthetic_catalog(500)
+    codes = quantize.quantize(vectors, 'int8')
+    similarity = QuantizedSimilarity(codes, vectors, rerank=50)
+    assert quantize.topk_agreement(similarity, vectors, np.arange(20), 10) == 1.0
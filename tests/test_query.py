@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from recommender.engine import RESULT_COLUMNS, RecommendationEngine
+from recommender.query import QueryEmbedder, search_by_text
+from recommender.similarity import VectorSimilarity, load_pickle
+from recommender.text import clean_query
+
+
+@pytest.fixture
+def search(artifact_dir, shipped_df):
+    embedder = QueryEmbedder(load_pickle(os.path.join(artifact_dir, 'vectorizer.pkl')),
+                             load_pickle(os.path.join(artifact_dir, 'pca_model.pkl')))
+    similarity = VectorSimilarity.from_artifacts(shipped_df, artifact_dir)
+    return RecommendationEngine(shipped_df), similarity, embedder
+
+
+def test_own_clean_text_ranks_product_first(search, shipped_df):
+    engine, similarity, embedder = search
+    for product in range(0, len(shipped_df), 97):
+        result = search_by_text(engine, similarity, embedder, shipped_df['clean_text'][product])
+        assert result['index'].iloc[0] == product
+        assert result['similarity'].iloc[0] > 0.99
+
+
+def test_out_of_vocabulary_query_returns_empty_frame(search):
+    engine, similarity, embedder = search
+    for query in ['qwxz zzkrt', '', '!!! ???']:
+        assert embedder.embed(query) is None
+        result = search_by_text(engine, similarity, embedder, query)
+        assert len(result) == 0
+        assert list(result.columns) == list(RESULT_COLUMNS)
+
+
+def test_same_clean_text_shares_one_cache_entry(search):
+    _, _, embedder = search
+    queries = ['Kulit Berminyak, jerawat!', '  kulit berminyak jerawat ', 'KULIT BERMINYAK JERAWAT']
+    assert len({clean_query(query) for query in queries}) == 1
+    vectors = [embedder.embed(query) for query in queries]
+    info = embedder.cache_info()['embed']
+    assert (info.misses, info.hits, info.currsize) == (1, 2, 1)
+    assert all(vector is vectors[0] for vector in vectors)
+    assert not vectors[0].flags.writeable
+    assert np.isclose(np.linalg.norm(vectors[0]), 1.0)
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pytest
+
+from recommender.cache import artifact_version
+from recommender.catalog import CATALOG_FILE, SOURCE_FILE
+from recommender import registry
+from recommender.registry import load_frame
+
+
+def test_missing_catalog_is_built_from_csv(artifact_dir, shipped_df):
+    version = artifact_version(artifact_dir)
+    df, vectors = load_frame(artifact_dir)
+    assert os.path.exists(os.path.join(artifact_dir, CATALOG_FILE))
+    assert df['product_name'].tolist() == shipped_df['product_name'].tolist()
+    assert vectors.shape[0] == len(shipped_df)
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    # catalog.bin turunan CSV, jadi tidak mengganti versi artefak
+    assert artifact_version(artifact_dir) == version
+
+
+def test_stale_catalog_is_rebuilt(artifact_dir, shipped_df):
+    load_frame(artifact_dir)
+    shipped_df.iloc[:-1].to_csv(os.path.join(artifact_dir, SOURCE_FILE), index=False)
+    with pytest.warns(UserWarning, match='basi'):
+        df, vectors = load_frame(artifact_dir)
+    assert len(df) == len(vectors) == len(shipped_df) - 1
+    assert not [name for name in os.listdir(artifact_dir) if name.startswith('.tmp-')]
+
+
+def test_unwritable_folder_falls_back_to_csv(artifact_dir, shipped_df, monkeypatch):
+    def read_only(*args):
+        raise PermissionError('read-only')
+    monkeypatch.setattr(registry, 'import_csv', read_only)
+    with pytest.warns(UserWarning, match='tidak bisa ditulis'):
+        df, vectors = load_frame(artifact_dir)
+    assert vectors is None and len(df) == len(shipped_df)
@@ -0,0 +1,79 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from recommender.catalog import CATALOG_FILE
+from recommender.registry import load_frame
+
+from recommender.engine import RecommendationEngine
+from recommender.ingredients import IngredientIndex
+from recommender.routine import RoutineBuilder, complete_routine
+
+
+def products():
+    rows = [
+        ('Retinol Serum', 'Serum', 'Retinol, Squalane, Niacinamide'),
+        ('Vit C Toner', 'Toner', 'Sodium Ascorbyl Phosphate, Squalane, Niacinamide'),
+        ('Plain Toner', 'Toner', 'Glycerin, Squalane'),
+        ('Ascorbyl Cream', 'Moisturizer', 'Ascorbyl Glucoside, Squalane, Niacinamide'),
+        ('Barrier Cream', 'Moisturizer', 'Ceramide NP, Squalane'),
+        ('BHA Cleanser', 'Cleanser', 'Salicylic Acid, Niacinamide'),
+        ('Gentle Cleanser', 'Cleanser', 'Glycerin, Niacinamide'),
+        ('Daily Sunscreen', 'Sunscreen', 'Zinc Oxide, Niacinamide'),
+    ]
+    return pd.DataFrame({'product_name': [r[0] for r in rows],
+                         'product_type': [r[1] for r in rows],
+                         'active_ingredients': [r[2] for r in rows],
+                         'skin_type': 'Normal', 'benefits': '', 'brand': 'uji'})
+
+
+def test_vitamin_c_derivatives_conflict_with_retinoid():
+    df = products()
+    builder = RoutineBuilder(df, IngredientIndex(df))
+    assert builder.active_groups(1) == ['vitamin_c']
+    assert builder.active_groups(3) == ['vitamin_c']
+    result, avoided = complete_routine(RecommendationEngine(df), builder, 0)
+    names = set(result['product_name'])
+    assert not names & {'Vit C Toner', 'Ascorbyl Cream', 'BHA Cleanser'}
+    assert set(result['routine_step']) == {'cleanser', 'toner', 'moisturizer', 'sunscreen'}
+    assert ('retinoid', 'vitamin_c') in avoided
+
+
+# Interpreter baru: proses pytest sendiri sudah mengimpor scipy lewat tes lain
+DEFAULT_FLOW = """
+import sys
+from streamlit.testing.v1 import AppTest
+from recommender import RecommenderService
+
+service = RecommenderService('deployment_files')
+assert len(service.recommend(0)) > 0
+assert service.routine(0) is not None
+app = AppTest.from_file(sys.argv[1], default_timeout=60).run()
+app.sidebar.radio[0].set_value("📋 Pilih dari Daftar Produk").run()
+# State yang diisi tombol "Dapatkan Rekomendasi" (AppTest tidak mendukung st.rerun dari tombol)
+app.session_state['selected_product_idx'] = 0
+app.session_state['show_recommendations'] = True
+app.session_state['search_method_used'] = 'product_list'
+app.run()
+assert not app.exception, app.exception
+assert any('Lengkapi Rutinitas' in block.value for block in app.markdown)
+assert 'scipy' not in sys.modules, service.registry.heavy_modules()
+"""
+
+
+def test_default_flow_does_not_import_scipy(artifact_dir, tmp_path):
+    pytest.importorskip('streamlit.testing.v1')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # catalog.bin dibangun lebih dulu (butuh sklearn), seperti sesudah deploy pertama
+    load_frame(artifact_dir)
+    workdir = tmp_path / 'app'
+    shutil.copytree(artifact_dir, workdir / 'deployment_files')
+    assert (workdir / 'deployment_files' / CATALOG_FILE).exists()
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run([sys.executable, '-c', DEFAULT_FLOW, os.path.join(root, 'app.py')],
+                            cwd=workdir, env=env, capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+import pytest
+
+from recommender.server import HTTPError, RecommendationServer
+
+
+@pytest.fixture
+def server(artifact_dir):
+    server = RecommendationServer(artifact_dir, threads=2, reload_interval=3600)
+    yield server
+    server.executor.shutdown()
+
+
+def dispatch(server, method, target, body=b''):
+    return asyncio.run(server.dispatch(method, target, body))
+
+
+def test_similar_and_bad_index(server):
+    result = dispatch(server, 'GET', '/products/0/similar?top_n=3')
+    assert result['product_idx'] == 0 and len(result['results']) == 3
+    with pytest.raises(HTTPError) as error:
+        dispatch(server, 'GET', '/products/x/similar')
+    assert error.value.status == 400
+
+
+def test_batch_isolates_failing_items(server, monkeypatch):
+    def broken(target='product_type'):
+        raise ImportError('No module named tensorflow')
+    monkeypatch.setattr(server.service, 'classifier', broken)
+    body = json.dumps({'requests': [
+        {'endpoint': 'similar', 'product_idx': 0, 'top_n': 2},
+        {'endpoint': 'classify', 'q': 'Wardah Acnederm Pure Foaming Cleanser'},
+        {'endpoint': 'nope'},
+    ]}).encode()
+    results = dispatch(server, 'POST', '/batch', body)['results']
+    assert [item['status'] for item in results] == [200, 500, 400]
+    assert len(results[0]['results']) == 2
+    assert 'tensorflow' in results[1]['error']
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from recommender.quantize import QUANTIZED_FILE, quantize, save_codes
+from recommender.similarity import (QuantizedSimilarity, VectorSimilarity, build_neighbor_table,
+                                    load_pickle, project_texts)
+
+
+def load_models(artifact_dir):
+    return (load_pickle(os.path.join(artifact_dir, 'vectorizer.pkl')),
+            load_pickle(os.path.join(artifact_dir, 'pca_model.pkl')))
+
+
+def shipped_vectors(artifact_dir, df):
+    """Vektor PCA mentah lewat jalur sklearn biasa (transform dense), tanpa normalisasi"""
+    vectorizer, pca = load_models(artifact_dir)
+    tfidf = vectorizer.transform(df['clean_text'].fillna('').astype(str)).toarray()
+    return pca.transform(tfidf)
+
+
+def test_rows_match_sklearn_cosine(artifact_dir, shipped_df):
+    similarity = VectorSimilarity.from_artifacts(shipped_df, artifact_dir)
+    reference = shipped_vectors(artifact_dir, shipped_df)
+    expected = cosine_similarity(reference)
+    assert similarity.shape == expected.shape
+    for product in (0, 1, 57, len(shipped_df) - 1):
+        assert np.allclose(similarity[product], expected[product], atol=1e-4)
+    assert np.allclose(similarity.rows([3, 9]) @ similarity.vectors.T, expected[[3, 9]], atol=1e-4)
+
+
+def test_project_texts_matches_dense_transform(artifact_dir, shipped_df):
+    vectorizer, pca = load_models(artifact_dir)
+    texts = shipped_df['clean_text'].fillna('').astype(str)
+    projected = project_texts(vectorizer, pca, texts, batch_size=64)
+    assert np.allclose(projected, shipped_vectors(artifact_dir, shipped_df), atol=1e-4)
+
+
+def test_neighbor_table_matches_exact_top_k(synthetic_catalog):
+    _, vectors = synthetic_catalog(700, seed=4)
+    table = build_neighbor_table(vectors, k=25, block_size=128)
+    exact = vectors @ vectors.T
+    assert table.shape == (700, 700)
+    for product in range(0, 700, 7):
+        start, end = table.indptr[product:product + 2]
+        expected = np.argsort(-exact[product], kind='stable')[:25]
+        assert table.indices[start:end].tolist() == expected.tolist()
+        assert np.allclose(table.data[start:end], exact[product, expected], atol=1e-6)
+
+    similarity = VectorSimilarity(vectors).with_neighbor_table(k=25)
+    indices, scores = similarity.candidates(10)
+    assert indices[0] == 10 and np.all(np.diff(scores) <= 0)
+
+
+def test_from_artifacts_ignores_stale_quantized_codes(artifact_dir, shipped_df):
+    vectors = VectorSimilarity.from_artifacts(shipped_df, artifact_dir, quantized=False).vectors
+    path = os.path.join(artifact_dir, QUANTIZED_FILE)
+
+    save_codes(path, quantize(vectors[:-5]))
+    similarity = VectorSimilarity.from_artifacts(shipped_df, artifact_dir)
+    assert not isinstance(similarity, QuantizedSimilarity)
+    assert len(similarity) == len(shipped_df)
+
+    save_codes(path, quantize(vectors))
+    similarity = VectorSimilarity.from_artifacts(shipped_df, artifact_dir)
+    assert isinstance(similarity, QuantizedSimilarity) and len(similarity) == len(shipped_df)
@@ -0,0 +1,17 @@
+from recommender.text import CLEAN_COLUMNS, add_clean_columns, check_parity
+
+SOURCE_COLUMNS = ['product_name', 'product_type', 'active_ingredients', 'skin_type',
+                  'benefits', 'brand']
+
+
+def test_cleaning_matches_shipped_csv(shipped_df):
+    # Stemming Sastrawi lambat; subset yang mencakup angka, satuan, '%', '+' dan '&'
+    sample = shipped_df.iloc[list(range(0, 45, 3)) + [11, 12, 32, 34, 40, 41, 60, 103]]
+    assert check_parity(sample) == {column: 1.0 for column in CLEAN_COLUMNS}
+
+
+def test_benefits_and_units(shipped_df):
+    row = shipped_df.iloc[[40, 60]][SOURCE_COLUMNS]
+    cleaned = add_clean_columns(row)
+    assert cleaned['benefits_clean'].iloc[0].startswith('mengandung ceramide dan beta glucan x')
+    assert cleaned['product_name_clean'].iloc[1] == shipped_df['product_name_clean'][60]
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from recommender.catalog import DELTA_FILE
+from recommender.service import RecommenderService
+from recommender.updates import apply_updates, compact, load_delta
+
+NEW_NAME = 'Produk Uji Niacinamide Serum'
+
+
+def recommendations(service, name, top_n=10):
+    """{nama: similarity} rekomendasi untuk produk aktif bernama `name`"""
+    live = service.live_frame()
+    position = int(live.index[live['product_name'] == name][0])
+    result = service.recommend(position, top_n)
+    return dict(zip(result['product_name'], result['similarity']))
+
+
+@pytest.fixture
+def updated(artifact_dir, shipped_df):
+    """Delta: satu produk dihapus, satu diganti, satu produk baru"""
+    source = ['product_name', 'product_type', 'active_ingredients', 'skin_type', 'benefits',
+              'brand']
+    removed = shipped_df.iloc[0]
+    replaced = shipped_df.iloc[[5]][source].copy()
+    replaced['benefits'] = 'Membersihkan wajah dan melembapkan kulit'
+    added = shipped_df.iloc[[3]][source].copy()
+    added['product_name'] = NEW_NAME
+    summary = apply_updates(artifact_dir, upserts=pd.concat([replaced, added]),
+                            removals=[(removed['brand'], removed['product_name'])],
+                            log=lambda message: None)
+    assert (summary['added'], summary['replaced'], summary['removed']) == (1, 1, 1)
+    return artifact_dir, removed['product_name'], shipped_df['product_name'][5]
+
+
+def test_delta_is_applied_without_rebuild(updated, shipped_df):
+    artifact_dir, removed, replaced = updated
+    service = RecommenderService(artifact_dir)
+    live = service.live_frame()
+    assert service.version.endswith('+1')
+    assert len(live) == len(shipped_df)
+    assert removed not in set(live['product_name'])
+    assert (live['product_name'] == replaced).sum() == 1
+    assert NEW_NAME in set(live['product_name'])
+    # Produk yang dihapus / versi lama yang diganti tidak pernah direkomendasikan
+    tombstones = load_delta(artifact_dir)['tombstones']
+    for position in np.flatnonzero(service.engine.live)[:40]:
+        result = service.recommend(int(position), 10)
+        assert not set(result['index']) & set(tombstones.tolist())
+
+
+def test_compaction_round_trip(updated):
+    artifact_dir, removed, _ = updated
+    before = RecommenderService(artifact_dir)
+    names = sorted(before.live_frame()['product_name'])
+    expected = {name: recommendations(before, name) for name in [NEW_NAME] + names[:10]}
+
+    assert compact(artifact_dir, log=lambda message: None) == len(names)
+    assert not os.path.exists(os.path.join(artifact_dir, DELTA_FILE))
+
+    after = RecommenderService(artifact_dir)
+    assert after.delta is None and len(after) == len(names)
+    assert sorted(after.live_frame()['product_name']) == names
+    for name, similar in expected.items():
+        result = recommendations(after, name)
+        assert list(result) == list(similar)
+        assert np.allclose(list(result.values()), list(similar.values()), atol=1e-5)